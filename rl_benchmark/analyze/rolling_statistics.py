@@ -0,0 +1,180 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Rolling statistics classes.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import bisect
+import math
+import numpy as np
+
+from collections import deque, OrderedDict
+
+
+class RollingWindow(object):
+    """
+    Statistics over the last `size` values, backed by a ring buffer. Mean and variance are kept as running sums
+    (O(1) per update), minimum and maximum as monotonic queues (amortized O(1) per update). For exact quantiles, the
+    window is also kept as a sorted list: updates search it in O(log n) and shift it with one O(n) memory move (a
+    few microseconds for windows of thousands of values), so quantiles are O(1) lookups that can be reported after
+    every episode. A streaming estimator (e.g. P-square) would make updates O(1), but is approximate and can't drop
+    values leaving the window.
+    """
+    def __init__(self, size):
+        self.size = int(size)
+        self.buffer = [0.0] * self.size
+        self.count = 0  # total number of values seen
+
+        self.sum = 0.0
+        self.sum_squares = 0.0
+
+        self.min_queue = deque()  # (index, value), increasing values
+        self.max_queue = deque()  # (index, value), decreasing values
+
+        self.sorted_values = list()  # values of the window, sorted
+
+    def __len__(self):
+        return min(self.count, self.size)
+
+    def update(self, value):
+        value = float(value)
+        index = self.count
+        position = index % self.size
+
+        if index >= self.size:
+            old_value = self.buffer[position]
+            self.sum -= old_value
+            self.sum_squares -= old_value * old_value
+            del self.sorted_values[bisect.bisect_left(self.sorted_values, old_value)]
+        bisect.insort(self.sorted_values, value)
+
+        self.buffer[position] = value
+        self.sum += value
+        self.sum_squares += value * value
+        self.count += 1
+
+        if position == self.size - 1:
+            # Recompute sums once per cycle to avoid accumulating floating point errors (amortized O(1))
+            self.sum = math.fsum(self.buffer)
+            self.sum_squares = math.fsum(v * v for v in self.buffer)
+
+        while self.min_queue and self.min_queue[-1][1] >= value:
+            self.min_queue.pop()
+        self.min_queue.append((index, value))
+        if self.min_queue[0][0] <= index - self.size:
+            self.min_queue.popleft()
+
+        while self.max_queue and self.max_queue[-1][1] <= value:
+            self.max_queue.pop()
+        self.max_queue.append((index, value))
+        if self.max_queue[0][0] <= index - self.size:
+            self.max_queue.popleft()
+
+    def mean(self):
+        length = len(self)
+        if length == 0:
+            return float('nan')
+        return self.sum / length
+
+    def variance(self):
+        length = len(self)
+        if length == 0:
+            return float('nan')
+        mean = self.sum / length
+        return max(0.0, self.sum_squares / length - mean * mean)
+
+    def std(self):
+        return math.sqrt(self.variance())
+
+    def min(self):
+        return self.min_queue[0][1] if self.min_queue else float('nan')
+
+    def max(self):
+        return self.max_queue[0][1] if self.max_queue else float('nan')
+
+    def values(self):
+        return self.buffer[:len(self)]
+
+    def quantile(self, q):
+        """
+        Return quantile(s) of the window, interpolated linearly between the closest values (like `np.percentile`).
+        O(1) per quantile, see class docstring.
+
+        Args:
+            q: quantile or list of quantiles in [0, 1]
+
+        Returns: quantile value, or list of quantile values
+
+        """
+        if not np.isscalar(q):
+            return [self.quantile(value) for value in q]
+
+        length = len(self)
+        if length == 0:
+            return float('nan')
+
+        position = q * (length - 1)
+        lower = int(math.floor(position))
+        upper = min(lower + 1, length - 1)
+        lower_value = self.sorted_values[lower]
+        return lower_value + (self.sorted_values[upper] - lower_value) * (position - lower)
+
+
+class RollingStatistics(object):
+    """
+    Rolling statistics of episode rewards over several window sizes.
+    """
+    def __init__(self, windows=(100, 500)):
+        self.windows = OrderedDict((int(size), RollingWindow(size)) for size in windows)
+        self.count = 0
+        self.last = float('nan')
+
+    def update(self, value):
+        self.count += 1
+        self.last = float(value)
+        for window in self.windows.values():
+            window.update(value)
+
+    def __getitem__(self, size):
+        return self.windows[size]
+
+    def summary(self, quantiles=None):
+        """
+        Return current statistics.
+
+        Args:
+            quantiles: optional list of quantiles to compute for each window
+
+        Returns: dict, e.g. `dict(count=.., last=.., mean_100=.., std_100=.., min_100=.., max_100=.., ...)`
+
+        """
+        summary = OrderedDict([('count', self.count), ('last', self.last)])
+
+        for size, window in self.windows.items():
+            summary['mean_{}'.format(size)] = window.mean()
+            summary['std_{}'.format(size)] = window.std()
+            summary['min_{}'.format(size)] = window.min()
+            summary['max_{}'.format(size)] = window.max()
+
+            if quantiles and len(window) > 0:
+                for q, value in zip(quantiles, window.quantile(quantiles)):
+                    summary['q{:g}_{}'.format(q * 100, size)] = float(value)
+
+        return summary
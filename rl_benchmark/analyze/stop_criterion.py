@@ -0,0 +1,166 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Stop criteria for early termination of experiments.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+
+from rl_benchmark.analyze.rolling_statistics import RollingWindow
+
+
+class StopCriterion(object):
+    """
+    Decides after each episode whether an experiment has converged and can be stopped. The same criterion can be
+    evaluated offline on stored episode rewards via `evaluate()`.
+    """
+    def reset(self):
+        raise NotImplementedError
+
+    def update(self, reward):
+        """
+        Update criterion with the reward of a finished episode.
+
+        Args:
+            reward: episode reward
+
+        Returns: Boolean indicating whether the criterion is met, i.e. the experiment should stop
+
+        """
+        raise NotImplementedError
+
+    def evaluate(self, rewards):
+        """
+        Evaluate criterion on a sequence of episode rewards.
+
+        Args:
+            rewards: list or np.array of episode rewards
+
+        Returns: number of episodes after which the criterion is met, or None if it is never met
+
+        """
+        self.reset()
+        for episode, reward in enumerate(rewards):
+            if self.update(reward):
+                return episode + 1
+        return None
+
+    @staticmethod
+    def from_config(config):
+        """
+        Create stop criterion from config dict, e.g. `dict(type='reward_threshold', reward_threshold=195, episodes=100)`
+        or `dict(type='plateau', window=100, patience=500, min_delta=1.0)`.
+
+        Args:
+            config: config dict or None
+
+        Returns: `StopCriterion` object or None
+
+        """
+        if not config:
+            return None
+
+        config = dict(config)
+        criterion_type = config.pop('type', 'reward_threshold')
+
+        if criterion_type not in stop_criteria:
+            raise ValueError("No such stop criterion: {}".format(criterion_type))
+
+        return stop_criteria[criterion_type](**config)
+
+
+class RewardThresholdCriterion(StopCriterion):
+    """
+    Met once the episode reward reached `reward_threshold` in `episodes` consecutive episodes.
+    """
+    def __init__(self, reward_threshold, episodes=1):
+        self.reward_threshold = reward_threshold
+        self.episodes = max(1, int(episodes))
+        self.consecutive_episodes = 0
+
+    def reset(self):
+        self.consecutive_episodes = 0
+
+    def update(self, reward):
+        if reward >= self.reward_threshold:
+            self.consecutive_episodes += 1
+        else:
+            self.consecutive_episodes = 0
+
+        return self.consecutive_episodes >= self.episodes
+
+    def evaluate(self, rewards):
+        above = np.asarray(rewards) >= self.reward_threshold
+        if len(above) < self.episodes:
+            return None
+
+        # Number of episodes above the threshold in each window of `episodes` consecutive episodes
+        counts = np.cumsum(np.concatenate([[0], above.astype(np.int64)]))
+        window_counts = counts[self.episodes:] - counts[:-self.episodes]
+
+        solved = np.flatnonzero(window_counts == self.episodes)
+        if len(solved) == 0:
+            return None
+
+        return int(solved[0]) + self.episodes
+
+
+class PlateauCriterion(StopCriterion):
+    """
+    Met once the rolling mean reward over `window` episodes did not improve by more than `min_delta` for `patience`
+    episodes. Not checked before `min_episodes` episodes have finished.
+    """
+    def __init__(self, window=100, patience=500, min_delta=0.0, min_episodes=0):
+        self.window = int(window)
+        self.patience = int(patience)
+        self.min_delta = min_delta
+        self.min_episodes = max(int(min_episodes), self.window)
+
+        self.rolling_window = None
+        self.best_mean = None
+        self.episodes_since_improvement = 0
+
+        self.reset()
+
+    def reset(self):
+        self.rolling_window = RollingWindow(self.window)
+        self.best_mean = None
+        self.episodes_since_improvement = 0
+
+    def update(self, reward):
+        self.rolling_window.update(reward)
+
+        if self.rolling_window.count < self.window:
+            return False
+
+        mean = self.rolling_window.mean()
+        if self.best_mean is None or mean > self.best_mean + self.min_delta:
+            self.best_mean = mean
+            self.episodes_since_improvement = 0
+        else:
+            self.episodes_since_improvement += 1
+
+        return self.rolling_window.count >= self.min_episodes and self.episodes_since_improvement >= self.patience
+
+
+stop_criteria = dict(
+    reward_threshold=RewardThresholdCriterion,
+    plateau=PlateauCriterion
+)
@@ -23,28 +23,47 @@ from __future__ import division
 
 import numpy as np
 
+from rl_benchmark.analyze.stop_criterion import RewardThresholdCriterion
 
-if __name__ == '__main__':
-    def solved_after(benchmark_data, reward_threshold, minimum_episodes=1, report_steps=False):
-        """
-        Return average amount of episodes after which an episode is considered solved.
 
-        Args:
-            benchmark_data: benchmark_data or experiment_data object
-            reward_threshold: reward threshold considered as solved
-            minimum_episodes: minimum consecutive episodes a reward threshold must be reached
-            report_steps: boolean whether to return timesteps instead of episodes.
+def solved_after(benchmark_data, reward_threshold, minimum_episodes=1, report_steps=False):
+    """
+    Return average amount of episodes after which an episode is considered solved.
+
+    Args:
+        benchmark_data: benchmark_data or experiment_data object
+        reward_threshold: reward threshold considered as solved
+        minimum_episodes: minimum consecutive episodes a reward threshold must be reached
+        report_steps: boolean whether to return timesteps instead of episodes.
 
-        Returns: tuple: (average episode/step count, sd)
+    Returns: tuple: (average episode/step count, sd), computed over the experiments that solved the task. (nan, nan)
+        if no experiment solved it.
 
-        """
-        # Also accept a single experiment_data object
-        if not isinstance(benchmark_data, list):
-            benchmark_data = [benchmark_data]
+    """
+    # Also accept a single experiment_data object
+    if not isinstance(benchmark_data, list):
+        benchmark_data = [benchmark_data]
 
-        array = np.array([experiment_data['results']['episode_rewards'] for experiment_data in benchmark_data])
-        # TODO: implement this..
-        raise NotImplementedError
+    # Same criterion as used for early termination in `BenchmarkRunner`
+    criterion = RewardThresholdCriterion(reward_threshold=reward_threshold, episodes=minimum_episodes)
+
+    values = list()
+    for experiment_data in benchmark_data:
+        episodes = criterion.evaluate(experiment_data['results']['episode_rewards'])
+        if episodes is None:
+            continue
+
+        if report_steps:
+            values.append(np.sum(experiment_data['results']['episode_timesteps'][:episodes]))
+        else:
+            values.append(episodes)
+
+    if len(values) == 0:
+        return float('nan'), float('nan')
+
+    array = np.array(values)
+
+    return array.mean(), array.std()
 
 
 def average_reward(benchmark_data, episodes=0):
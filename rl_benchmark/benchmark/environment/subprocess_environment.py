@@ -0,0 +1,204 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Subprocess environment class.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import logging
+import multiprocessing
+import numpy as np
+
+from functools import partial
+from multiprocessing import shared_memory
+
+
+class SharedArrayWriter(object):
+    """
+    Writes numpy arrays into shared memory buffers. Used in the environment process. One buffer is allocated per
+    result slot, shape and dtype, and reused for every following array of the same kind.
+    """
+    def __init__(self):
+        self.buffers = dict()
+
+    def write(self, slot, array):
+        key = (slot, array.shape, array.dtype.str)
+
+        if key not in self.buffers:
+            shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            self.buffers[key] = (shm, np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf))
+
+        shm, buffer = self.buffers[key]
+        buffer[...] = array
+
+        return shm.name, array.shape, array.dtype.str
+
+    def encode(self, value):
+        """
+        Encode environment method result. Arrays (or arrays contained in a result tuple) are written to shared
+        memory, everything else is sent through the pipe.
+
+        Args:
+            value: method result
+
+        Returns: encoded value
+
+        """
+        if isinstance(value, np.ndarray):
+            return 'array', self.write(0, value)
+        if isinstance(value, tuple):
+            return 'tuple', [('array', self.write(slot, item)) if isinstance(item, np.ndarray) else ('value', item)
+                             for slot, item in enumerate(value)]
+        return 'value', value
+
+    def close(self):
+        for shm, _ in self.buffers.values():
+            shm.close()
+            shm.unlink()
+        self.buffers = dict()
+
+
+def environment_worker(connection, environment_factory):
+    """
+    Environment process main loop. Creates the environment and executes commands received through the pipe.
+
+    Args:
+        connection: `multiprocessing.Connection` object
+        environment_factory: callable returning the environment object
+
+    Returns:
+
+    """
+    environment = environment_factory()
+    writer = SharedArrayWriter()
+
+    try:
+        while True:
+            command, name, args, kwargs = connection.recv()
+
+            if command == 'close':
+                try:
+                    environment.close()
+                except Exception as e:
+                    logging.warning("Could not close environment: {}".format(e))
+                connection.send(('value', None))
+                break
+
+            try:
+                if command == 'call':
+                    result = writer.encode(getattr(environment, name)(*args, **kwargs))
+                elif command == 'getattr':
+                    value = getattr(environment, name)
+                    result = ('callable', None) if callable(value) else ('value', value)
+                else:
+                    raise ValueError("No such command: {}".format(command))
+            except Exception as e:
+                result = ('error', e)
+
+            connection.send(result)
+    finally:
+        writer.close()
+        connection.close()
+
+
+class SubprocessEnvironment(object):
+    """
+    Runs an environment in a child process. Method calls and attribute lookups are forwarded to the child process.
+    Observations are returned through shared memory buffers instead of pickled messages, so large (e.g. visual)
+    observations are cheap to transfer.
+
+    The environment is created in the child process by calling `environment_factory`, which therefore must be
+    picklable (e.g. a bound `BenchmarkRunner.make_environment` method).
+    """
+    def __init__(self, environment_factory):
+        # Spawn a fresh interpreter, as forking a process with an initialized backend (e.g. TensorFlow) is unsafe
+        context = multiprocessing.get_context('spawn')
+
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=environment_worker, args=(child_connection, environment_factory))
+        self.process.daemon = True
+        self.process.start()
+        child_connection.close()
+
+        self.buffers = dict()  # shared memory name -> `SharedMemory` object
+        self.closed = False
+
+    def read(self, descriptor):
+        name, shape, dtype = descriptor
+
+        shm = self.buffers.get(name)
+        if not shm:
+            shm = shared_memory.SharedMemory(name=name)
+            self.buffers[name] = shm
+
+        # Copy, as the buffer is overwritten by the next call while the agent may still hold on to the observation
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf).copy()
+
+    def decode(self, kind, value):
+        if kind == 'array':
+            return self.read(value)
+        if kind == 'tuple':
+            return tuple(self.decode(item_kind, item_value) for item_kind, item_value in value)
+        if kind == 'error':
+            raise value
+        return value
+
+    def send_command(self, command, name=None, *args, **kwargs):
+        self.connection.send((command, name, args, kwargs))
+        return self.connection.recv()
+
+    def call(self, name, *args, **kwargs):
+        kind, value = self.send_command('call', name, *args, **kwargs)
+        return self.decode(kind, value)
+
+    def reset(self):
+        return self.call('reset')
+
+    def close(self):
+        if self.closed:
+            return
+
+        try:
+            self.send_command('close')
+        except (EOFError, OSError):
+            logging.warning("Environment process exited before it could be closed.")
+
+        for shm in self.buffers.values():
+            shm.close()
+        self.buffers = dict()
+
+        self.process.join()
+        self.connection.close()
+        self.closed = True
+
+    def __getattr__(self, item):
+        if item.startswith('__') or item in ('connection', 'process', 'buffers', 'closed'):
+            raise AttributeError(item)
+
+        kind, value = self.send_command('getattr', item)
+
+        if kind == 'error':
+            raise value
+        if kind == 'callable':
+            # Bind remote methods once, so following calls don't need an attribute lookup in the child process
+            method = partial(self.call, item)
+            self.__dict__[item] = method
+            return method
+
+        return value
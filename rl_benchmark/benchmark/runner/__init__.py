@@ -17,6 +17,15 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+from rl_benchmark.analyze.rolling_statistics import RollingStatistics, RollingWindow
+from rl_benchmark.analyze.stop_criterion import StopCriterion, RewardThresholdCriterion, PlateauCriterion
 from rl_benchmark.benchmark.runner.benchmark_runner import BenchmarkRunner
+from rl_benchmark.benchmark.runner.job_queue import JobCoordinator, JobQueue, JobWorker
+from rl_benchmark.benchmark.runner.resource_monitor import ResourceMonitor, hardware_fingerprint
+from rl_benchmark.benchmark.runner.sampling_profiler import SamplingProfiler
+from rl_benchmark.benchmark.runner.speed_benchmark import SpeedAgent, SpeedBenchmark
+from rl_benchmark.benchmark.runner.sweep_runner import SweepRunner
 
-__all__ = ['BenchmarkRunner']
+__all__ = ['BenchmarkRunner', 'JobCoordinator', 'JobQueue', 'JobWorker', 'PlateauCriterion', 'ResourceMonitor',
+           'RewardThresholdCriterion', 'RollingStatistics', 'RollingWindow', 'SamplingProfiler', 'SpeedAgent',
+           'SpeedBenchmark', 'StopCriterion', 'SweepRunner', 'hardware_fingerprint']
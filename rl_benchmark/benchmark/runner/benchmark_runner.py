@@ -18,18 +18,74 @@ from __future__ import division
 from __future__ import print_function
 
 import logging
+import multiprocessing
+import random
 import time
-import numpy as np
 import os
 import pickle
 
+import numpy as np
+
 from collections import OrderedDict
 from copy import copy
-from six.moves import xrange
+from six.moves import queue, xrange
 from tqdm import tqdm
 
 from rl_benchmark.util import load_config_file
-from rl_benchmark.data import BenchmarkData
+from rl_benchmark.analyze.rolling_statistics import RollingStatistics
+from rl_benchmark.analyze.stop_criterion import StopCriterion
+from rl_benchmark.benchmark.environment import SubprocessEnvironment
+from rl_benchmark.benchmark.runner.cpu_budget import apply_cpu_budget, available_cpus, cpu_settings, \
+    partition_cpus, pin_process, thread_environment
+from rl_benchmark.benchmark.runner.resource_monitor import ResourceMonitor, hardware_fingerprint
+from rl_benchmark.benchmark.runner.sampling_profiler import SamplingProfiler
+from rl_benchmark.benchmark.runner.speed_benchmark import SpeedBenchmark
+from rl_benchmark.data import BenchmarkData, BenchmarkFile, EpisodeLog, EpisodeStore, SpeedBenchmarkData
+
+
+# Number of experiments started in this process (experiments in warm worker processes share backend state)
+process_experiments = 0
+
+
+def initialize_worker(runner_classes, cpu_sets=None, cpu_set_timeout=5.0):
+    """
+    Initialize a worker process: import libraries and initialize their backends once, so experiments executed by
+    this worker don't pay for it. Used as `multiprocessing.Pool` initializer.
+
+    Args:
+        runner_classes: list of `BenchmarkRunner` subclasses
+        cpu_sets: optional queue of CPU lists. If given, the worker takes one and pins itself to these CPUs
+            before initializing backends. The queue holds one list per worker, so workers replacing others (e.g.
+            after a crash) find it empty and run unpinned after `cpu_set_timeout` seconds.
+        cpu_set_timeout: seconds to wait for a CPU list
+
+    Returns:
+
+    """
+    if cpu_sets is not None:
+        try:
+            # Not `get_nowait()`: the parent's queue feeder thread may not have flushed all lists yet
+            apply_cpu_budget(cpu_sets.get(timeout=cpu_set_timeout))
+        except queue.Empty:
+            logging.warning("No CPU set left for worker process {:d}, running without CPU pinning.".format(
+                os.getpid()))
+
+    for runner_class in runner_classes:
+        runner_class.initialize_backend()
+
+
+def execute_experiment_in_worker(args):
+    """
+    Run a single experiment in a worker process. Module level function, so it can be pickled by `multiprocessing`.
+
+    Args:
+        args: tuple of (`BenchmarkRunner` object, experiment number)
+
+    Returns: experiment data dict
+
+    """
+    benchmark_runner, experiment_num = args
+    return benchmark_runner.execute_experiment(experiment_num, progress=False)
 
 
 class BenchmarkRunner(object):
@@ -48,19 +104,50 @@ class BenchmarkRunner(object):
 
         self.save_history_file = None
         self.save_history_episodes = 0
+        self.history_log = None
 
         self.save_model_file = None
         self.save_model_episodes = 0
 
         self.current_run_results = None
+        self.current_speed_results = None
 
         self.report_episodes = 10
         self.progress_bar = None
-        self.limit_by_episodes = True  # if False, the run is limited by timesteps
+        self.progress_unit = 'episodes'  # or 'timesteps', 'seconds'
+        self.progress_total = 0
+        self.max_episodes = None
+        self.max_timesteps = None
+        self.max_seconds = None
+        self.experiment_start = None  # `time.perf_counter()` at the start of the current experiment
+        self.deadline = None  # `time.perf_counter()` value at which the current experiment is stopped, or None
+        self.workers = 1
+
+        # Rolling reward statistics of the current experiment
+        self.statistics_windows = (100, 500)
+        self.statistics = RollingStatistics(self.statistics_windows)
+
+        # Stop criterion of the current experiment, set from the config in `execute_experiment()`
+        self.stop_criterion = None
+        self.stopped_after_episodes = None
+
+        # Sampling profiler settings, see `run()`
+        self.profile = False
+        self.profile_interval = 0.01
 
         self.environment_domain = 'user'
         self.environment_name = None
         self.environment_callback = None
+        self.environment_backend = 'local'  # or 'subprocess'
+
+        self.seed = None  # experiment i is seeded with seed + i
+        self.cpus_per_experiment = None  # None: no CPU pinning, default thread pools
+
+    def __getstate__(self):
+        # Progress bars can't be pickled and belong to the parent process anyway
+        state = self.__dict__.copy()
+        state['progress_bar'] = None
+        return state
 
     def load_config(self, filename):
         """
@@ -109,6 +196,92 @@ class BenchmarkRunner(object):
             self.environment_domain = 'user'
             self.environment_name = environment.__name__
 
+    def set_environment_backend(self, environment_backend):
+        """
+        Set environment backend.
+
+        Args:
+            environment_backend: 'local' to create environments in the benchmark process, 'subprocess' to run each
+                environment in a child process (observations are transferred via shared memory)
+
+        Returns:
+
+        """
+        if environment_backend not in ('local', 'subprocess'):
+            raise ValueError("No such environment backend: {}".format(environment_backend))
+
+        self.environment_backend = environment_backend
+
+    @classmethod
+    def initialize_backend(cls):
+        """
+        Initialize the RL backend once per process (e.g. create the backend's runtime), before experiments run.
+
+        Returns:
+
+        """
+        pass
+
+    def reset_backend(self):
+        """
+        Release backend state of previous experiments (e.g. graphs), so each experiment starts from a fresh agent.
+        Called before each experiment.
+
+        Returns:
+
+        """
+        pass
+
+    def verify_backend_reset(self):
+        """
+        Returns: Boolean indicating whether the backend holds no state of previous experiments
+
+        """
+        return True
+
+    def seed_backend(self, seed):
+        """
+        Seed the random number generators of the RL backend. Called after `reset_backend()`.
+
+        Args:
+            seed: integer seed
+
+        Returns:
+
+        """
+        pass
+
+    def set_seed(self, seed):
+        """
+        Set random seed. Experiment i seeds Python, numpy, the backend and the environment (if it has a `seed()`
+        method) with `seed + i`.
+
+        Args:
+            seed: integer seed, or None to not seed experiments
+
+        Returns:
+
+        """
+        self.seed = seed
+
+    def set_cpu_budget(self, cpus_per_experiment):
+        """
+        Set CPU budget. Each experiment (or worker process) is pinned to `cpus_per_experiment` CPUs, and BLAS,
+        OpenMP and backend thread pools are limited to the budget, so parallel experiments don't oversubscribe the
+        machine. Thread pools of libraries imported before the run (e.g. in the benchmark process itself) can only
+        be limited by runners passing the budget to the backend.
+
+        Args:
+            cpus_per_experiment: number of CPUs, or None to not limit experiments
+
+        Returns:
+
+        """
+        if cpus_per_experiment is not None and cpus_per_experiment < 1:
+            raise ValueError("CPU budget must be at least 1, got {}".format(cpus_per_experiment))
+
+        self.cpus_per_experiment = cpus_per_experiment
+
     def make_environment(self):
         """
         Create environment.
@@ -125,6 +298,18 @@ class BenchmarkRunner(object):
 
         return environment
 
+    def create_environment(self):
+        """
+        Create environment using the configured environment backend.
+
+        Returns: environment
+
+        """
+        if self.environment_backend == 'subprocess':
+            return SubprocessEnvironment(self.make_environment)
+
+        return self.make_environment()
+
     def run_experiment(self, environment, experiment_num=0):
         """
         Learn.
@@ -138,9 +323,95 @@ class BenchmarkRunner(object):
         """
         raise NotImplementedError
 
+    def create_speed_agent(self, environment, config):
+        """
+        Create agent for a speed benchmark.
+
+        Args:
+            environment: environment
+            config: agent config (run limits removed)
+
+        Returns: `SpeedAgent` object
+
+        """
+        raise NotImplementedError
+
+    def run_speed(self, steps=10000, warmup_steps=1000, trials=5):
+        """
+        Run throughput benchmark: Drive an agent for a fixed number of steps (after warm-up) and measure act-only,
+        observe/update and end-to-end steps per second. Results are not learning curves, so they are returned as
+        a `SpeedBenchmarkData` object.
+
+        Args:
+            steps: number of timed steps of each phase per trial
+            warmup_steps: number of untimed steps before the first trial
+            trials: number of trials
+
+        Returns: `SpeedBenchmarkData` object
+
+        """
+        config = copy(self.config)
+
+        agent_config = copy(config)
+        for key in ('max_episodes', 'max_timesteps', 'max_seconds', 'max_episode_timesteps', 'stop_criterion',
+                    'num_environments'):
+            agent_config.pop(key, None)
+
+        environment = self.create_environment()
+
+        logging.info("Starting speed benchmark with {:d} trials of {:d} steps ({:d} warm-up steps)".format(
+            trials, steps, warmup_steps))
+
+        def trial_finished(trial, trial_results):
+            logging.info("Trial {:d}: act only {:.1f} steps/s, observe/update {:.1f} steps/s, "
+                         "end to end {:.1f} steps/s".format(trial + 1,
+                                                            trial_results['act_only']['steps_per_second'],
+                                                            trial_results['observe_update']['steps_per_second'],
+                                                            trial_results['end_to_end']['steps_per_second']))
+
+        start_time = int(time.time())
+        try:
+            speed_agent = self.create_speed_agent(environment, agent_config)
+            try:
+                speed_benchmark = SpeedBenchmark(speed_agent,
+                                                 max_episode_timesteps=config.get('max_episode_timesteps'))
+                results = speed_benchmark.run(steps, warmup_steps=warmup_steps, trials=trials,
+                                              trial_callback=trial_finished)
+            finally:
+                speed_agent.close()
+        finally:
+            # Also if the agent could not be created
+            if self.environment_backend == 'subprocess':
+                environment.close()
+        end_time = int(time.time())
+
+        self.current_speed_results = SpeedBenchmarkData(
+            results=results,
+            metadata=dict(
+                agent=config['type'],
+                steps=steps,
+                warmup_steps=warmup_steps,
+                trials=trials,
+                max_episode_timesteps=config.get('max_episode_timesteps', 0),
+                environment_domain=self.environment_domain,
+                environment_name=self.environment_name,
+                environment_backend=self.environment_backend,
+                rl_library=self.rl_library,
+                rl_library_version=self.rl_library_version,
+                rl_backend=self.rl_backend,
+                rl_backend_version=self.rl_backend_version,
+                start_time=start_time,
+                end_time=end_time,
+                hardware=hardware_fingerprint()
+            ),
+            config=dict(config)
+        )
+
+        return self.current_speed_results
+
     def load_history(self, history_file):
         """
-        Load benchmark history from file
+        Load benchmark history from file. Reads episode logs and (legacy) pickled history files.
 
         Args:
             history_file: path to history file
@@ -149,8 +420,13 @@ class BenchmarkRunner(object):
 
         """
         logging.info("Loading benchmark history data from {}".format(history_file))
-        with open(os.path.join(os.getcwd(), history_file), "rb") as fp:
-            self.history_data = pickle.load(fp)
+        history_path = os.path.join(os.getcwd(), history_file)
+
+        if EpisodeLog.is_episode_log(history_path):
+            self.history_data = EpisodeLog.read(history_path)
+        else:
+            with open(history_path, "rb") as fp:
+                self.history_data = pickle.load(fp)
 
     def load_model(self, model_file):
         """
@@ -167,7 +443,8 @@ class BenchmarkRunner(object):
 
     def episode_finished(self, results, runner_id):
         """
-        Callback that is called from the runner after each finished episode. Outputs result summaries and saves history.
+        Callback that is called from the runner after each finished episode. Outputs result summaries, saves history,
+        and checks the stop criterion.
 
         Args:
             results: results object (or runner object)
@@ -176,106 +453,320 @@ class BenchmarkRunner(object):
         Returns: Boolean indicating whether to continue run or not.
 
         """
+        self.statistics.update(results.episode_rewards[-1])
+
         if self.progress_bar:
-            if self.limit_by_episodes:
+            postfix = [('R', '{:8.0f}'.format(self.statistics.last))]
+            postfix += [('AR{}'.format(size), '{:8.2f}'.format(window.mean()))
+                        for size, window in self.statistics.windows.items()]
+            # Don't force a redraw here, the update below redraws the bar once its refresh interval has passed
+            self.progress_bar.set_postfix(OrderedDict(postfix), refresh=False)
+
+            if self.progress_unit == 'episodes':
                 self.progress_bar.update(1)
-            else:
+            elif self.progress_unit == 'timesteps':
                 self.progress_bar.update(results.episode_timestep)
-            self.progress_bar.set_postfix(OrderedDict([
-                ('R', '{:8.0f}'.format(results.episode_rewards[-1])),
-                ('AR100', '{:8.2f}'.format(np.mean(results.episode_rewards[-100:]))),
-                ('AR500', '{:8.2f}'.format(np.mean(results.episode_rewards[-500:])))
-            ]))
+            else:
+                elapsed_time = min(time.perf_counter() - self.experiment_start, self.max_seconds)
+                self.progress_bar.update(elapsed_time - self.progress_bar.n)
         else:
             if results.episode % self.report_episodes == 0:
                 logging.info("Finished episode {ep} after {ts} timesteps".format(ep=results.episode, ts=results.episode_timestep))
-                logging.info("Episode reward: {}".format(results.episode_rewards[-1]))
-                logging.info("Average of last 500 rewards: {:.2f}".format(np.mean(results.episode_rewards[-500:])))
-                logging.info("Average of last 100 rewards: {:.2f}".format(np.mean(results.episode_rewards[-100:])))
-
-        if self.save_history_file and self.save_history_episodes > 0:
-            if results.episode % self.save_history_episodes == 0:
-                logging.debug("Saving benchmark history to {}".format(self.save_history_file))
-                history_data = dict(
-                    episode=results.episode,
-                    timestep=results.episode_timestep,
-                    episode_rewards=copy(results.episode_rewards),
-                    episode_timesteps=copy(results.episode_timesteps),
-                    episode_end_times=copy(results.episode_times)
-                )
+                if self.progress_unit == 'seconds':
+                    logging.info("Time: {:.0f} of {:.0f} seconds".format(
+                        time.perf_counter() - self.experiment_start, self.max_seconds))
+                logging.info("Episode reward: {}".format(self.statistics.last))
+                for size, window in reversed(list(self.statistics.windows.items())):
+                    logging.info("Average of last {} rewards: {:.2f} (std {:.2f}, min {:.2f}, max {:.2f})".format(
+                        size, window.mean(), window.std(), window.min(), window.max()))
+
+        if self.history_log and results.episode % self.save_history_episodes == 0:
+            logging.debug("Saving benchmark history to {}".format(self.history_log.filename))
+            # Only appends episodes finished since the last flush
+            self.history_log.flush(results.episode_rewards, results.episode_timesteps, results.episode_times)
+
+        if self.stop_criterion and self.stop_criterion.update(self.statistics.last):
+            logging.info("Stop criterion met after {:d} episodes.".format(self.statistics.count))
+            self.stopped_after_episodes = self.statistics.count
+            return False
 
-                with open(self.save_history_file, 'wb') as fp:
-                    pickle.dump(history_data, fp)
+        if self.max_episodes and self.max_timesteps and self.statistics.count >= self.max_episodes:
+            # Library runners only enforce their primary limit (here `max_timesteps`), see `run_limits()`
+            return False
 
         return True
 
+    def run_limits(self):
+        """
+        Primary limit of the current run, to be enforced by library runners. Libraries run for `max_timesteps` if set,
+        otherwise for `max_episodes` if set, otherwise until stopped. Other limits are enforced by the benchmark
+        runner: `max_episodes` (if `max_timesteps` is set too) in `episode_finished()`, `max_seconds` by the
+        environment wrappers, which raise `StopExperiment` once a step ends after `deadline`.
+
+        Returns: dict containing `max_episodes` and `max_timesteps` (None if not enforced by the library runner)
+
+        """
+        return dict(
+            max_episodes=None if self.max_timesteps else self.max_episodes,
+            max_timesteps=self.max_timesteps
+        )
+
     def run(self,
             experiments=1,
             report_episodes=10,
             save_history_file=None,
             save_history_episodes=0,
             save_model_file=None,
-            save_model_episodes=0):
+            save_model_episodes=0,
+            workers=1,
+            progress=True,
+            profile=False,
+            profile_interval=0.01):
+        """
+        Run benchmark.
 
+        Args:
+            experiments: number of experiments to run
+            report_episodes: report progress every n episodes (if no progress bar is shown)
+            save_history_file: path to history file
+            save_history_episodes: save history every n episodes
+            save_model_file: path to model file
+            save_model_episodes: save model every n episodes
+            workers: number of worker processes. If larger than 1, experiments are distributed over a process pool.
+            progress: Boolean indicating whether to show progress bars
+            profile: Boolean indicating whether to sample Python stacks of each experiment. Profiles are written to
+                the output folder in collapsed stack (flamegraph) format and summarized in the experiment metadata.
+            profile_interval: sampling interval in seconds
+
+        Returns: `BenchmarkData` object
+
+        """
         self.report_episodes = report_episodes
         self.save_history_file = save_history_file
         self.save_history_episodes = save_history_episodes
         self.save_model_file = save_model_file
         self.save_model_episodes = save_model_episodes
+        self.profile = profile
+        self.profile_interval = profile_interval
 
         self.current_run_results = BenchmarkData()
 
-        max_episodes = self.config.get('max_episodes')
-        max_timesteps = self.config.get('max_timesteps')
+        self.max_episodes = self.config.get('max_episodes') or None
+        self.max_timesteps = self.config.get('max_timesteps') or None
+        self.max_seconds = self.config.get('max_seconds') or None
+
+        # Limits can be combined, the run stops at the first limit reached
+        assert self.max_episodes or self.max_timesteps or self.max_seconds, \
+            'Please give a limit for the run (max_episodes, max_timesteps or max_seconds)'
+
+        if self.max_seconds:
+            # Compute budget: show the time spent, as it is the limit comparable across libraries
+            self.progress_unit = 'seconds'
+            self.progress_total = float(self.max_seconds)
+        elif self.max_episodes:
+            self.progress_unit = 'episodes'
+            self.progress_total = int(self.max_episodes)
+        else:
+            self.progress_unit = 'timesteps'
+            self.progress_total = int(self.max_timesteps)
+
+        workers = max(1, min(workers, experiments))
+        self.workers = workers
+
+        if workers > 1 and self.environment_backend == 'subprocess':
+            # Pool workers are daemonic processes, which are not allowed to start environment processes
+            raise ValueError("The subprocess environment backend can't be used with more than one worker.")
+
+        if workers > 1:
+            logging.info("Running benchmark with {:d} experiments on {:d} workers".format(experiments, workers))
+
+            # Spawn fresh interpreters, as forking a process with an initialized backend (e.g. TensorFlow) is unsafe
+            # Worker processes initialize the backend once and run several experiments (see `reset_backend()`)
+            context = multiprocessing.get_context('spawn')
+
+            cpu_sets = None
+            if self.cpus_per_experiment:
+                cpu_sets = context.Queue()
+                for cpus in partition_cpus(self.cpus_per_experiment, workers):
+                    cpu_sets.put(cpus)
+
+            # Workers inherit the thread environment variables, so they apply before any library is imported
+            with thread_environment(self.cpus_per_experiment):
+                pool = context.Pool(processes=workers, initializer=initialize_worker,
+                                    initargs=([type(self)], cpu_sets))
+
+            try:
+                # imap keeps experiment order, regardless of which worker finishes first
+                jobs = pool.imap(execute_experiment_in_worker, [(self, i) for i in xrange(experiments)])
+                for experiment_data in tqdm(jobs, total=experiments, desc='Experiments', disable=not progress):
+                    self.current_run_results.append(experiment_data)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            logging.info("Running benchmark with {:d} experiments".format(experiments))
+
+            previous_cpus = available_cpus()
+            pinned = self.cpus_per_experiment and pin_process(previous_cpus[:self.cpus_per_experiment])
+            try:
+                with thread_environment(self.cpus_per_experiment):
+                    for i in xrange(experiments):
+                        self.current_run_results.append(self.execute_experiment(i, progress=progress))
+            finally:
+                if pinned:
+                    pin_process(previous_cpus)
 
-        assert bool(max_episodes) != bool(max_timesteps), 'Please limit either by episodes or by timesteps, not both'
-        assert bool(max_episodes) or bool(max_timesteps), 'Please give a time limit for the run (episodes or timesteps)'
+        return self.current_run_results
 
-        if max_episodes:
-            self.limit_by_episodes = True
-            total = int(max_episodes)
+    def execute_experiment(self, experiment_num, progress=True):
+        """
+        Create environment and run a single experiment. Expects `run()` to have set up the run parameters.
+
+        Args:
+            experiment_num: experiment number
+            progress: Boolean indicating whether to show a progress bar
+
+        Returns: experiment data dict
+
+        """
+        global process_experiments
+
+        config = copy(self.config)
+
+        # Previous experiments in this process must not leak into this one
+        self.reset_backend()
+        if not self.verify_backend_reset():
+            raise RuntimeError("Backend state of a previous experiment was not released.")
+        process_experiments += 1
+
+        experiment_seed = None
+        if self.seed is not None:
+            experiment_seed = int(self.seed) + experiment_num
+            random.seed(experiment_seed)
+            np.random.seed(experiment_seed)
+            self.seed_backend(experiment_seed)
+
+        environment = self.create_environment()
+
+        if experiment_seed is not None:
+            seed_environment = getattr(environment, 'seed', None)
+            if callable(seed_environment):
+                seed_environment(experiment_seed)
+
+        logging.info("Starting experiment {:d}".format(experiment_num + 1))
+
+        if self.save_history_file and self.save_history_episodes > 0:
+            history_file = self.save_history_file
+            if self.workers > 1:
+                # Parallel experiments must not write to the same episode log
+                history_file = '{}.{:d}'.format(history_file, experiment_num)
+            self.history_log = EpisodeLog(history_file)
+            self.history_log.start()
         else:
-            self.limit_by_episodes = False
-            total = int(max_timesteps)
-
-        logging.info("Running benchmark with {:d} experiments".format(experiments))
-
-        for i in xrange(experiments):
-            config = copy(self.config)
-
-            environment = self.make_environment()
-
-            logging.info("Starting experiment {:d}".format(i + 1))
-
-            with tqdm(total=total, desc='Experiment {:d}'.format(i + 1)) as self.progress_bar:
-                experiment_start_time = int(time.time())
-                results = self.run_experiment(environment, i)
-                experiment_end_time = int(time.time())
-
-            logging.info("Learning finished.")
-
-            experiment_data = dict(
-                results=results,
-                metadata=dict(
-                    agent=config['type'],
-                    episodes=max_episodes,
-                    timesteps=max_timesteps,
-                    max_episode_timesteps=config.get('max_episode_timesteps', 0),
-                    environment_domain=self.environment_domain,
-                    environment_name=self.environment_name,
-                    rl_library=self.rl_library,
-                    rl_library_version=self.rl_library_version,
-                    rl_backend=self.rl_backend,
-                    rl_backend_version=self.rl_backend_version,
-                    start_time=experiment_start_time,
-                    end_time=experiment_end_time
-                ),
-                config=dict(config)  # make sure this is a dict
-            )
-
-            self.current_run_results.append(experiment_data)
+            self.history_log = None
+
+        self.statistics = RollingStatistics(self.statistics_windows)
+        self.stop_criterion = StopCriterion.from_config(config.get('stop_criterion'))
+        self.stopped_after_episodes = None
+
+        if self.profile:
+            profiler = SamplingProfiler(interval=self.profile_interval)
+            profiler.start()
+
+        resource_monitor = ResourceMonitor()
+        resource_monitor.start()
+
+        experiment_start_time = int(time.time())
+        self.experiment_start = time.perf_counter()
+        self.deadline = self.experiment_start + self.max_seconds if self.max_seconds else None
+        try:
+            if progress:
+                bar_format = None
+                if self.progress_unit == 'seconds':
+                    bar_format = '{l_bar}{bar}| {n:.0f}/{total:.0f}s [{elapsed}<{remaining}{postfix}]'
+                with tqdm(total=self.progress_total, desc='Experiment {:d}'.format(experiment_num + 1),
+                          bar_format=bar_format) as self.progress_bar:
+                    results = self.run_experiment(environment, experiment_num)
+                self.progress_bar = None
+            else:
+                results = self.run_experiment(environment, experiment_num)
+        finally:
+            if self.environment_backend == 'subprocess':
+                # Stop the environment process and release its shared memory
+                environment.close()
+            # Also stop the sampling threads if the experiment failed, they would distort later experiments in this
+            # process
+            resource_usage = resource_monitor.stop()
+            if self.profile:
+                profiler.stop()
+        experiment_end_time = int(time.time())
+
+        # Store episode results as typed arrays, also if the library runner recorded them in lists
+        results.update(EpisodeStore.from_results(results).get_results())
+
+        logging.info("Learning finished.")
+
+        profile_info = None
+        if self.profile:
+            profile_info = self.save_profile(profiler, experiment_start_time, experiment_num)
+
+        experiment_data = dict(
+            results=results,
+            metadata=dict(
+                agent=config['type'],
+                episodes=config.get('max_episodes'),
+                timesteps=config.get('max_timesteps'),
+                seconds=config.get('max_seconds'),
+                max_episode_timesteps=config.get('max_episode_timesteps', 0),
+                environment_domain=self.environment_domain,
+                environment_name=self.environment_name,
+                rl_library=self.rl_library,
+                rl_library_version=self.rl_library_version,
+                rl_backend=self.rl_backend,
+                rl_backend_version=self.rl_backend_version,
+                start_time=experiment_start_time,
+                end_time=experiment_end_time,
+                stopped_after_episodes=self.stopped_after_episodes,
+                seed=experiment_seed,
+                profile=profile_info,
+                hardware=hardware_fingerprint(),
+                resources=resource_usage,
+                cpu=cpu_settings(self.cpus_per_experiment),
+                worker=dict(
+                    pid=os.getpid(),
+                    process_experiments=process_experiments  # 1 for the first experiment in this process
+                )
+            ),
+            config=dict(config)  # make sure this is a dict
+        )
 
-        return self.current_run_results
+        return experiment_data
+
+    def save_profile(self, profiler, experiment_start_time, experiment_num):
+        """
+        Write profile of an experiment to the output folder.
+
+        Args:
+            profiler: stopped `SamplingProfiler` object
+            experiment_start_time: experiment start timestamp
+            experiment_num: experiment number
+
+        Returns: dict containing the profile file path and profile summary
+
+        """
+        if not os.path.isdir(self.output_folder):
+            os.makedirs(self.output_folder)
+
+        profile_file = os.path.join(self.output_folder, 'profile_{}_{}_{:d}_{:d}.collapsed'.format(
+            self.rl_library, str(self.environment_name).replace(os.sep, '_'), experiment_start_time, experiment_num))
+
+        logging.info("Saving profile to {}".format(profile_file))
+        profiler.write_collapsed(profile_file)
+
+        profile_info = profiler.summary()
+        profile_info['file'] = os.path.abspath(profile_file)
+
+        return profile_info
 
     def save_results_db(self, db):
         """
@@ -290,9 +781,21 @@ class BenchmarkRunner(object):
         benchmark_data = self.current_run_results
         return db.save_benchmark(benchmark_data)
 
+    def save_speed_results_db(self, db):
+        """
+        Save speed benchmark results to database.
+
+        Args:
+            db: `Database` object
+
+        Returns: dict containing returned information on save status
+
+        """
+        return db.save_speed_benchmark(self.current_speed_results)
+
     def save_results_file(self, output_file, append=False, force=False):
         """
-        Save results to file.
+        Save results to a benchmark file (see `BenchmarkFile`). Existing pickle files are converted when appending.
 
         Args:
             output_file: path to output file (relative to `self.output_folder` or absolute path)
@@ -311,14 +814,12 @@ class BenchmarkRunner(object):
                 return False
             if append:
                 logging.info("Loading data from existing output file")
-                with open(output_file_path, 'rb') as fp:
-                    old_benchmark_data = pickle.load(fp)
-                    benchmark_data = old_benchmark_data + self.current_run_results
+                old_benchmark_data = BenchmarkData.from_file(output_file_path)
+                benchmark_data = old_benchmark_data + self.current_run_results
             elif force:
                 logging.warning("Overwriting existing benchmark file.")
 
         logging.info("Saving benchmark data to {}".format(output_file_path))
-        with open(output_file_path, 'wb') as fp:
-            pickle.dump(benchmark_data, fp)
+        BenchmarkFile.write(output_file_path, benchmark_data)
 
         return True
\ No newline at end of file
@@ -0,0 +1,165 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+CPU budget helpers: CPU pinning and thread pool sizes of parallel experiments.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import logging
+import multiprocessing
+import os
+
+from contextlib import contextmanager
+
+from rl_benchmark.util import backend_threads
+
+
+# Read by BLAS/OpenMP libraries (and TensorFlow) when they are loaded, so they must be set before the import
+blas_thread_variables = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS',
+                         'NUMEXPR_NUM_THREADS')
+backend_thread_variables = ('TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS')
+
+
+def available_cpus():
+    """
+    Returns: sorted list of CPUs this process may run on
+
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(multiprocessing.cpu_count()))
+
+
+def thread_variables(cpus):
+    """
+    Args:
+        cpus: number of CPUs
+
+    Returns: dict of environment variables limiting BLAS/OpenMP and backend thread pools
+
+    """
+    threads = backend_threads(cpus)
+    variables = dict((name, str(cpus)) for name in blas_thread_variables)
+    variables['TF_NUM_INTRAOP_THREADS'] = str(threads['intra_op_threads'])
+    variables['TF_NUM_INTEROP_THREADS'] = str(threads['inter_op_threads'])
+    return variables
+
+
+@contextmanager
+def thread_environment(cpus):
+    """
+    Set thread environment variables (e.g. while starting worker processes, which inherit them), and restore the
+    previous values afterwards. Does nothing if `cpus` is None.
+
+    Args:
+        cpus: number of CPUs, or None
+
+    Returns:
+
+    """
+    if not cpus:
+        yield
+        return
+
+    previous_values = dict()
+    for name, value in thread_variables(cpus).items():
+        previous_values[name] = os.environ.get(name)
+        os.environ[name] = value
+
+    try:
+        yield
+    finally:
+        for name, value in previous_values.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def partition_cpus(cpus_per_worker, workers, cpus=None):
+    """
+    Assign disjoint sets of CPUs to workers. If there are not enough CPUs, sets wrap around and overlap.
+
+    Args:
+        cpus_per_worker: number of CPUs per worker
+        workers: number of workers
+        cpus: list of CPUs to distribute (defaults to the CPUs available to this process)
+
+    Returns: list of CPU lists, one per worker
+
+    """
+    cpus = cpus or available_cpus()
+    cpus_per_worker = min(cpus_per_worker, len(cpus))
+
+    if cpus_per_worker * workers > len(cpus):
+        logging.warning("{:d} workers with {:d} CPUs each oversubscribe the {:d} available CPUs.".format(
+            workers, cpus_per_worker, len(cpus)))
+
+    return [[cpus[(worker * cpus_per_worker + i) % len(cpus)] for i in range(cpus_per_worker)]
+            for worker in range(workers)]
+
+
+def pin_process(cpus):
+    """
+    Pin the current process to CPUs.
+
+    Args:
+        cpus: list of CPUs
+
+    Returns: Boolean indicating whether the process was pinned (False if not supported by the platform)
+
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        logging.warning("CPU pinning is not supported on this platform.")
+        return False
+
+    os.sched_setaffinity(0, cpus)
+    return True
+
+
+def apply_cpu_budget(cpus):
+    """
+    Pin the current process and set its thread environment variables. Environment variables only affect libraries
+    imported afterwards.
+
+    Args:
+        cpus: list of CPUs
+
+    Returns:
+
+    """
+    pin_process(cpus)
+    os.environ.update(thread_variables(len(cpus)))
+
+
+def cpu_settings(cpus_per_experiment):
+    """
+    Effective CPU settings of the current process, as recorded in experiment metadata.
+
+    Args:
+        cpus_per_experiment: CPU budget per experiment, or None
+
+    Returns: dict containing the budget, the CPUs the process is pinned to and thread pool settings
+
+    """
+    return dict(
+        budget=cpus_per_experiment,
+        cpus=available_cpus() if hasattr(os, 'sched_getaffinity') else None,
+        threads=dict((name, os.environ.get(name)) for name in blas_thread_variables + backend_thread_variables)
+    )
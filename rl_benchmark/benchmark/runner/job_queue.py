@@ -0,0 +1,554 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Distributed job queue classes: a coordinator handing out sweep jobs over TCP and workers executing them.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import binascii
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+
+from collections import deque
+from multiprocessing.connection import Client, Listener
+
+from six.moves import queue, xrange
+
+from rl_benchmark.benchmark.runner.benchmark_runner import initialize_worker
+from rl_benchmark.benchmark.runner.cpu_budget import apply_cpu_budget, partition_cpus
+from rl_benchmark.benchmark.runner.sweep_runner import execute_job
+from rl_benchmark.libraries import libraries
+from rl_benchmark.util import load_config_file
+
+
+DEFAULT_PORT = 6280
+
+
+def generate_authkey():
+    """
+    Returns: random authkey (bytes of 32 hex digits, so it can be passed on the command line)
+
+    """
+    return binascii.hexlify(os.urandom(16))
+
+
+class JobQueue(object):
+    """
+    Thread-safe queue of sweep jobs with leases. A worker leases a job and renews the lease with heartbeats. Jobs
+    whose lease expires (e.g. because the worker died) or whose worker reports a failure are requeued, up to
+    `max_attempts` leases per job. The first result reported for a job wins.
+    """
+    def __init__(self, jobs, lease_timeout=60.0, max_attempts=3):
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+
+        self.jobs = dict((job['job_id'], job) for job in jobs)
+        self.pending = deque(job['job_id'] for job in jobs)
+        self.leases = dict()  # job id -> (worker id, expiry time)
+        self.attempts = dict.fromkeys(self.jobs, 0)
+        self.done = set()
+        self.failed = set()
+
+        self.lock = threading.Lock()
+
+    def lease(self, worker_id):
+        """
+        Lease next pending job.
+
+        Args:
+            worker_id: ID of the leasing worker
+
+        Returns: job dict, or None if no job is pending
+
+        """
+        with self.lock:
+            while self.pending:
+                job_id = self.pending.popleft()
+                if job_id in self.done or job_id in self.failed or job_id in self.leases:
+                    continue
+
+                self.attempts[job_id] += 1
+                self.leases[job_id] = (worker_id, time.monotonic() + self.lease_timeout)
+                return self.jobs[job_id]
+
+            return None
+
+    def renew(self, worker_id, job_id):
+        """
+        Renew lease (heartbeat).
+
+        Args:
+            worker_id: ID of the worker
+            job_id: ID of the leased job
+
+        Returns: Boolean indicating whether the worker still holds the lease
+
+        """
+        with self.lock:
+            lease = self.leases.get(job_id)
+            if lease is None or lease[0] != worker_id:
+                return False
+
+            self.leases[job_id] = (worker_id, time.monotonic() + self.lease_timeout)
+            return True
+
+    def complete(self, worker_id, job_id):
+        """
+        Mark job as done. Results of workers whose lease expired are still accepted if no other result arrived yet
+        and the job has not failed for good.
+
+        Args:
+            worker_id: ID of the worker
+            job_id: ID of the job
+
+        Returns: Boolean indicating whether the result should be stored (False if the job is already done or failed)
+
+        """
+        with self.lock:
+            if job_id not in self.jobs or job_id in self.done or job_id in self.failed:
+                return False
+
+            lease = self.leases.get(job_id)
+            if lease is not None and lease[0] == worker_id:
+                del self.leases[job_id]
+
+            self.done.add(job_id)
+            return True
+
+    def fail(self, worker_id, job_id):
+        """
+        Report job failure. The job is requeued unless it has reached the maximum number of attempts.
+
+        Args:
+            worker_id: ID of the worker
+            job_id: ID of the job
+
+        Returns: Boolean indicating whether the job failed for good (False if requeued or ignored)
+
+        """
+        with self.lock:
+            lease = self.leases.get(job_id)
+            if lease is None or lease[0] != worker_id:
+                # Lease expired and the job was already requeued
+                return False
+
+            del self.leases[job_id]
+            return self.requeue(job_id)
+
+    def release(self, worker_id):
+        """
+        Requeue all jobs leased by a worker, e.g. after its connection was lost.
+
+        Args:
+            worker_id: ID of the worker
+
+        Returns: list of ids of jobs that failed for good
+
+        """
+        with self.lock:
+            job_ids = [job_id for job_id, (lease_worker_id, _) in self.leases.items() if lease_worker_id == worker_id]
+            for job_id in job_ids:
+                del self.leases[job_id]
+            return [job_id for job_id in job_ids if self.requeue(job_id)]
+
+    def expire(self):
+        """
+        Requeue all jobs with expired leases.
+
+        Returns: list of tuples (job id, Boolean indicating whether the job failed for good)
+
+        """
+        now = time.monotonic()
+        with self.lock:
+            job_ids = [job_id for job_id, (_, expiry_time) in self.leases.items() if expiry_time < now]
+            for job_id in job_ids:
+                del self.leases[job_id]
+            return [(job_id, self.requeue(job_id)) for job_id in job_ids]
+
+    def requeue(self, job_id):
+        # Call with lock held. Returns True if the job failed for good.
+        if job_id in self.done:
+            return False
+
+        if self.attempts[job_id] >= self.max_attempts:
+            self.failed.add(job_id)
+            return True
+
+        self.pending.append(job_id)
+        return False
+
+    def finished(self):
+        """
+        Returns: Boolean indicating whether every job is done or failed for good
+
+        """
+        with self.lock:
+            return len(self.done) + len(self.failed) == len(self.jobs)
+
+
+class JobCoordinator(object):
+    """
+    Hands out the pending jobs of a `SweepRunner` to workers connecting over TCP (see `JobWorker`). Workers send
+    heartbeats while running a job. Jobs of workers that stop sending heartbeats or disconnect are requeued. Finished
+    experiments are streamed back and stored in the sweep's database and ledger by the coordinator only, so workers
+    need no database access and no config files.
+
+    Connections are authenticated with `authkey`, but not encrypted, and messages are pickles: anyone knowing the
+    authkey can run code on the coordinator. If no authkey is given, a random one is generated (see `authkey`). The
+    coordinator listens on localhost unless another address is given.
+    """
+    def __init__(self, sweep_runner, address=('127.0.0.1', DEFAULT_PORT), authkey=None, lease_timeout=120.0,
+                 heartbeat_interval=10.0, max_attempts=3, poll_interval=5.0):
+        self.sweep_runner = sweep_runner
+        self.address = address
+        self.authkey = authkey or generate_authkey()
+        self.lease_timeout = lease_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+
+        self.job_queue = None
+        self.config_data = dict()
+        self.listener = None
+        self.events = queue.Queue()
+        self.stop_event = threading.Event()
+
+    def start(self):
+        """
+        Resolve configs of the pending jobs and start accepting worker connections.
+
+        Returns: address the coordinator listens on
+
+        """
+        jobs = self.sweep_runner.pending_jobs()
+        for config in set(job['config'] for job in jobs):
+            config_data = load_config_file(config, config_folder=self.sweep_runner.config_folder)
+            if not config_data:
+                raise ValueError("Config not found: {}".format(config))
+            self.config_data[config] = config_data
+
+        self.job_queue = JobQueue(jobs, lease_timeout=self.lease_timeout, max_attempts=self.max_attempts)
+
+        self.listener = Listener(self.address, authkey=self.authkey)
+        self.address = self.listener.address
+
+        accept_thread = threading.Thread(target=self.accept_connections, name='accept-connections')
+        accept_thread.daemon = True
+        accept_thread.start()
+
+        logging.info("Coordinator listening on {}:{:d} with {:d} pending jobs".format(
+            self.address[0], self.address[1], len(jobs)))
+
+        return self.address
+
+    def stop(self):
+        if self.stop_event.is_set():
+            return
+
+        self.stop_event.set()
+        try:
+            # Unblock `accept()` of the accept thread
+            Client(self.address, authkey=self.authkey).close()
+        except (OSError, EOFError, multiprocessing.AuthenticationError):
+            pass
+        self.listener.close()
+
+    def accept_connections(self):
+        while not self.stop_event.is_set():
+            try:
+                connection = self.listener.accept()
+            except (OSError, EOFError, multiprocessing.AuthenticationError) as e:
+                if self.stop_event.is_set():
+                    break
+                logging.warning("Rejected worker connection: {}".format(e))
+                continue
+
+            if self.stop_event.is_set():
+                connection.close()
+                break
+
+            handler_thread = threading.Thread(target=self.handle_worker, args=(connection,))
+            handler_thread.daemon = True
+            handler_thread.start()
+
+    def handle_worker(self, connection):
+        worker_id = None
+        try:
+            while True:
+                message = connection.recv()
+                command = message[0]
+
+                if command == 'hello':
+                    worker_id = message[1]
+                    logging.info("Worker {} connected".format(worker_id))
+
+                elif command == 'request':
+                    if self.stop_event.is_set() or self.job_queue.finished():
+                        connection.send(('shutdown',))
+                        break
+
+                    job = self.job_queue.lease(worker_id)
+                    if job is None:
+                        # Remaining jobs are leased, but might be requeued
+                        connection.send(('wait', self.poll_interval))
+                    else:
+                        connection.send(('job', dict(job, config_data=self.config_data[job['config']]),
+                                         self.heartbeat_interval))
+
+                elif command == 'heartbeat':
+                    if not self.job_queue.renew(worker_id, message[1]):
+                        logging.warning("Heartbeat of worker {} for job {} without lease".format(worker_id, message[1]))
+
+                elif command == 'result':
+                    _, job_id, experiment_data = message
+                    if self.job_queue.complete(worker_id, job_id):
+                        self.events.put(('done', job_id, experiment_data))
+                    connection.send(('ack',))
+
+                elif command == 'error':
+                    _, job_id, error = message
+                    logging.warning("Job {} failed on worker {}:\n{}".format(job_id, worker_id, error))
+                    if self.job_queue.fail(worker_id, job_id):
+                        self.events.put(('failed', job_id, error))
+                    connection.send(('ack',))
+
+                else:
+                    logging.warning("Ignoring unknown command from worker {}: {}".format(worker_id, command))
+
+        except (EOFError, OSError):
+            logging.warning("Lost connection to worker {}".format(worker_id))
+        finally:
+            connection.close()
+            if worker_id is not None:
+                for job_id in self.job_queue.release(worker_id):
+                    self.events.put(('failed', job_id, "Lost connection to worker {}".format(worker_id)))
+
+    def serve(self):
+        """
+        Store results until every job is done or failed for good, then stop accepting workers. Workers asking
+        for jobs afterwards are told to shut down.
+
+        Returns: dict containing lists of completed and failed job ids
+
+        """
+        if self.job_queue is None:
+            self.start()
+
+        completed_jobs = list()
+        failed_jobs = list()
+        # Every job yields at least one event, the first one settles it
+        settled_jobs = set()
+
+        try:
+            while len(settled_jobs) < len(self.job_queue.jobs):
+                for job_id, failed in self.job_queue.expire():
+                    logging.warning("Lease of job {} expired".format(job_id))
+                    if failed:
+                        self.events.put(('failed', job_id, "Lease expired"))
+
+                try:
+                    status, job_id, data = self.events.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+
+                if job_id in settled_jobs:
+                    logging.warning("Ignoring {} event of settled job {}".format(status, job_id))
+                    continue
+
+                job = self.job_queue.jobs[job_id]
+                if status == 'done':
+                    # Only the coordinator writes to the database
+                    self.sweep_runner.save_result(job, data)
+                    completed_jobs.append(job_id)
+                    logging.info("Job {} done ({:d}/{:d})".format(job_id, len(completed_jobs),
+                                                                 len(self.job_queue.jobs)))
+                else:
+                    logging.error("Job {} ({}, {}, {}) failed:\n{}".format(
+                        job_id, job['config'], job['gym_id'], job['rl_library'], data))
+                    self.sweep_runner.ledger.record(job, 'failed', error=data)
+                    failed_jobs.append(job_id)
+
+                settled_jobs.add(job_id)
+        finally:
+            self.stop()
+
+        return dict(completed_jobs=completed_jobs, failed_jobs=failed_jobs)
+
+
+class JobWorker(object):
+    """
+    Connects to a `JobCoordinator`, runs leased jobs with the library's `BenchmarkRunner` and sends back the
+    experiment data. Library backends are initialized once per worker. The worker exits when the coordinator has no
+    jobs left or closes the connection.
+
+    With a CPU budget, the worker pins itself to `cpus_per_experiment` CPUs selected by `worker_index`, so workers on
+    the same host with different indices run on disjoint CPUs (see `partition_cpus()`).
+    """
+    def __init__(self, address, authkey, config_folder=None, output_folder='/tmp', worker_id=None,
+                 connect_timeout=60.0, retry_interval=2.0, cpus_per_experiment=None, worker_index=0):
+        self.address = tuple(address)
+        self.authkey = authkey
+        self.config_folder = config_folder
+        self.output_folder = output_folder
+        self.worker_id = worker_id or '{}:{:d}'.format(socket.gethostname(), os.getpid())
+        self.connect_timeout = connect_timeout
+        self.retry_interval = retry_interval
+        self.cpus_per_experiment = cpus_per_experiment
+        self.worker_index = worker_index
+
+        self.initialized_libraries = set()
+        self.send_lock = threading.Lock()
+
+    def connect(self):
+        # Retry, as workers may start before the coordinator
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                return Client(self.address, authkey=self.authkey)
+            except (OSError, EOFError):
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(self.retry_interval)
+
+    def send(self, connection, message):
+        with self.send_lock:
+            connection.send(message)
+
+    def send_heartbeats(self, connection, job_id, interval, stop_event):
+        while not stop_event.wait(interval):
+            try:
+                self.send(connection, ('heartbeat', job_id))
+            except (OSError, EOFError):
+                break
+
+    def execute(self, job):
+        rl_library = job['rl_library']
+        if rl_library not in self.initialized_libraries:
+            self.initialized_libraries.add(rl_library)
+            # Failures are reported by `execute_job`
+            if rl_library in libraries:
+                initialize_worker([libraries[rl_library]])
+
+        return execute_job(job, config_folder=self.config_folder, output_folder=self.output_folder,
+                           cpus_per_experiment=self.cpus_per_experiment)
+
+    def run(self):
+        """
+        Run jobs until the coordinator shuts down.
+
+        Returns: number of executed jobs
+
+        """
+        if self.cpus_per_experiment:
+            # Before backends are initialized, so their thread pools are limited too
+            apply_cpu_budget(partition_cpus(self.cpus_per_experiment, self.worker_index + 1)[self.worker_index])
+
+        connection = self.connect()
+        executed_jobs = 0
+
+        try:
+            self.send(connection, ('hello', self.worker_id))
+            while True:
+                self.send(connection, ('request',))
+                reply = connection.recv()
+
+                if reply[0] == 'shutdown':
+                    break
+
+                if reply[0] == 'wait':
+                    time.sleep(reply[1])
+                    continue
+
+                _, job, heartbeat_interval = reply
+                job_id = job['job_id']
+
+                stop_event = threading.Event()
+                heartbeat_thread = threading.Thread(target=self.send_heartbeats,
+                                                    args=(connection, job_id, heartbeat_interval, stop_event))
+                heartbeat_thread.daemon = True
+                heartbeat_thread.start()
+
+                try:
+                    message = ('result', job_id, self.execute(job))
+                except Exception:
+                    message = ('error', job_id, traceback.format_exc())
+                finally:
+                    stop_event.set()
+                    heartbeat_thread.join()
+
+                self.send(connection, message)
+                connection.recv()  # ack
+                executed_jobs += 1
+
+        except (EOFError, OSError):
+            logging.info("Coordinator closed connection")
+        finally:
+            connection.close()
+
+        return executed_jobs
+
+
+def run_worker(address, authkey, config_folder=None, output_folder='/tmp', cpus_per_experiment=None, worker_index=0):
+    """
+    Run `JobWorker` until the coordinator shuts down (e.g. as process target).
+
+    Returns: number of executed jobs
+
+    """
+    return JobWorker(address, authkey=authkey, config_folder=config_folder, output_folder=output_folder,
+                     cpus_per_experiment=cpus_per_experiment, worker_index=worker_index).run()
+
+
+def run_local(sweep_runner, workers=1, **kwargs):
+    """
+    Run sweep with a coordinator and worker processes on localhost, e.g. to test a distributed setup.
+
+    Args:
+        sweep_runner: `SweepRunner` object
+        workers: number of worker processes
+        **kwargs: keyword arguments passed to `JobCoordinator` (a random authkey is generated if none is given)
+
+    Returns: dict containing lists of completed and failed job ids
+
+    """
+    authkey = kwargs.pop('authkey', None) or generate_authkey()
+    coordinator = JobCoordinator(sweep_runner, address=('127.0.0.1', 0), authkey=authkey, **kwargs)
+    address = coordinator.start()
+
+    # Spawn fresh interpreters, as in `SweepRunner.run()`
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=run_worker, args=(address, authkey, sweep_runner.config_folder,
+                                                          sweep_runner.output_folder, sweep_runner.cpus_per_experiment,
+                                                          worker_index))
+                 for worker_index in xrange(workers)]
+    for process in processes:
+        process.start()
+
+    try:
+        return coordinator.serve()
+    finally:
+        for process in processes:
+            process.join(timeout=coordinator.poll_interval + 5.0)
+            if process.is_alive():
+                process.terminate()
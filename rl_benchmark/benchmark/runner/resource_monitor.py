@@ -0,0 +1,190 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Hardware fingerprint and resource usage monitoring.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import platform
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None  # not available on Windows
+
+from rl_benchmark.benchmark.runner.cpu_budget import backend_thread_variables, blas_thread_variables
+from rl_benchmark.util import hash_object
+
+
+def read_proc_file(filename):
+    try:
+        with open(filename, 'r') as fp:
+            return fp.read()
+    except (IOError, OSError):
+        return ''
+
+
+def get_cpu_model():
+    for line in read_proc_file('/proc/cpuinfo').splitlines():
+        if line.startswith('model name'):
+            return line.split(':', 1)[1].strip()
+    return platform.processor() or platform.machine()
+
+
+def get_memory_total():
+    for line in read_proc_file('/proc/meminfo').splitlines():
+        if line.startswith('MemTotal:'):
+            return int(line.split()[1]) * 1024
+    return None
+
+
+def get_affinity():
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return None
+
+
+def hardware_fingerprint():
+    """
+    Describe the machine (and thread settings) an experiment runs on.
+
+    Returns: dict. `hardware_hash` identifies the machine class (CPU model, core count, memory, architecture).
+
+    """
+    fingerprint = dict(
+        cpu_model=get_cpu_model(),
+        cpu_count=os.cpu_count(),
+        cpu_affinity=get_affinity(),
+        memory_total=get_memory_total(),
+        machine=platform.machine(),
+        system=platform.system(),
+        platform=platform.platform(),
+        python_version=platform.python_version(),
+        thread_settings={name: os.environ.get(name) for name in blas_thread_variables + backend_thread_variables}
+    )
+
+    fingerprint['hardware_hash'] = hash_object([
+        fingerprint['cpu_model'],
+        fingerprint['cpu_count'],
+        fingerprint['memory_total'],
+        fingerprint['machine']
+    ])
+
+    return fingerprint
+
+
+def get_rss():
+    """
+    Returns: current resident set size of this process in bytes (from /proc/self/statm), or None
+
+    """
+    statm = read_proc_file('/proc/self/statm').split()
+    if len(statm) < 2:
+        return None
+    return int(statm[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+class ResourceMonitor(object):
+    """
+    Records CPU time and peak RSS of an experiment, and samples the RSS periodically from a background thread.
+    The timeline has a fixed maximum length: when it is full, every other sample is dropped and the sampling
+    interval is doubled.
+    """
+    def __init__(self, interval=1.0, max_samples=512):
+        self.interval = interval
+        self.max_samples = max_samples
+
+        self.rss_timeline = list()  # list of (seconds since start, rss in bytes)
+
+        self.start_time = None
+        self.start_usage = None
+        self.start_children_usage = None
+        self.results = None
+
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        if resource:
+            self.start_usage = resource.getrusage(resource.RUSAGE_SELF)
+            self.start_children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+        self.rss_timeline = list()
+        self.stop_event.clear()
+
+        self.thread = threading.Thread(target=self.sample_loop, name='ResourceMonitor')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def sample(self):
+        rss = get_rss()
+        if rss is None:
+            return
+
+        self.rss_timeline.append((time.perf_counter() - self.start_time, rss))
+
+        if len(self.rss_timeline) >= self.max_samples:
+            self.rss_timeline = self.rss_timeline[::2]
+            self.interval *= 2
+
+    def sample_loop(self):
+        self.sample()
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        """
+        Stop monitoring.
+
+        Returns: dict containing wall time, user/system CPU time (of this process and of waited-for child
+            processes), peak RSS, and the RSS timeline
+
+        """
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        self.sample()
+
+        wall_time = time.perf_counter() - self.start_time
+        peak_rss = max(rss for _, rss in self.rss_timeline) if self.rss_timeline else None
+
+        self.results = dict(
+            wall_time=wall_time,
+            peak_rss=peak_rss,
+            rss_timeline=self.rss_timeline
+        )
+
+        if resource:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+            self.results.update(dict(
+                user_time=usage.ru_utime - self.start_usage.ru_utime,
+                system_time=usage.ru_stime - self.start_usage.ru_stime,
+                children_user_time=children_usage.ru_utime - self.start_children_usage.ru_utime,
+                children_system_time=children_usage.ru_stime - self.start_children_usage.ru_stime,
+                # Peak RSS of the whole process (ru_maxrss is in kilobytes on Linux, bytes on macOS)
+                process_peak_rss=usage.ru_maxrss * (1 if platform.system() == 'Darwin' else 1024)
+            ))
+
+        return self.results
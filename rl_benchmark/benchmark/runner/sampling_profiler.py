@@ -0,0 +1,143 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Sampling profiler class.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import sys
+import threading
+import time
+
+from collections import Counter
+
+
+def frame_label(code):
+    return '{} ({}:{:d})'.format(code.co_name, code.co_filename, code.co_firstlineno)
+
+
+class SamplingProfiler(object):
+    """
+    Samples the Python stack of one thread at a fixed interval from a background thread. Stacks are counted by code
+    object, so taking a sample only walks the frame chain; labels are built when writing the results.
+
+    Results are written in the collapsed stack format (`frame;frame;frame count` per line), which can be rendered
+    with flamegraph.pl or speedscope.
+    """
+    def __init__(self, interval=0.01, max_depth=128):
+        self.interval = interval
+        self.max_depth = max_depth
+
+        self.stacks = Counter()
+        self.samples = 0
+        self.sample_time = 0.0  # time spent taking samples
+
+        self.thread_id = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.start_time = None
+        self.duration = 0.0
+
+    def start(self, thread_id=None):
+        """
+        Start sampling.
+
+        Args:
+            thread_id: id of the thread to sample. Defaults to the calling thread.
+
+        Returns:
+
+        """
+        self.thread_id = thread_id or threading.get_ident()
+        self.stop_event.clear()
+        self.start_time = time.perf_counter()
+
+        self.thread = threading.Thread(target=self.sample_loop, name='SamplingProfiler')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        self.duration = time.perf_counter() - self.start_time
+
+    def sample_loop(self):
+        while not self.stop_event.wait(self.interval):
+            start_time = time.perf_counter()
+
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = list()
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            del frame
+
+            # Root first
+            self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+            self.sample_time += time.perf_counter() - start_time
+
+    def write_collapsed(self, filename):
+        """
+        Write collapsed stacks to file.
+
+        Args:
+            filename: path to output file
+
+        Returns: number of written stacks
+
+        """
+        with open(filename, 'w') as fp:
+            for stack, count in self.stacks.most_common():
+                fp.write('{} {:d}\n'.format(';'.join(frame_label(code) for code in stack), count))
+
+        return len(self.stacks)
+
+    def summary(self, top=20):
+        """
+        Summarize profile.
+
+        Args:
+            top: number of functions to report
+
+        Returns: dict containing sample statistics and the top functions by self time (samples in which the
+            function was the innermost frame)
+
+        """
+        self_samples = Counter()
+        for stack, count in self.stacks.items():
+            self_samples[stack[-1]] += count
+
+        return dict(
+            samples=self.samples,
+            interval=self.interval,
+            duration=self.duration,
+            sampling_overhead=self.sample_time / self.duration if self.duration > 0 else 0.0,
+            top_functions=[dict(
+                function=frame_label(code),
+                self_samples=count,
+                self_fraction=count / self.samples
+            ) for code, count in self_samples.most_common(top)]
+        )
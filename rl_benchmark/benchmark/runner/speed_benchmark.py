@@ -0,0 +1,249 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Throughput (speed) benchmark classes.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import time
+
+import numpy as np
+
+from six.moves import xrange
+
+
+speed_modes = ('act_only', 'observe_update', 'end_to_end')
+
+
+class SpeedAgent(object):
+    """
+    Minimal interface to drive an agent and its environment step by step. Implemented by each library, so the
+    `SpeedBenchmark` can time acting, environment steps and observing (including updates) separately.
+    """
+    def reset(self):
+        """
+        Reset environment.
+
+        Returns: initial state
+
+        """
+        raise NotImplementedError
+
+    def act(self, state, learn=True):
+        """
+        Get action for state.
+
+        Args:
+            state: environment state
+            learn: Boolean indicating whether the action will be observed. If False, the agent acts without
+                exploration and does not record the action for learning.
+
+        Returns: action
+
+        """
+        raise NotImplementedError
+
+    def step(self, action):
+        """
+        Execute action in environment.
+
+        Args:
+            action: action
+
+        Returns: tuple of next state, reward, terminal
+
+        """
+        raise NotImplementedError
+
+    def observe(self, reward, terminal, next_state):
+        """
+        Observe the result of the last action and update the agent if its update schedule says so.
+
+        Args:
+            reward: reward
+            terminal: Boolean indicating whether the episode ended
+            next_state: next environment state
+
+        Returns:
+
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SpeedBenchmark(object):
+    """
+    Measures the throughput of an agent for a fixed step budget. After `warmup_steps` untimed steps (graph building,
+    memory filling, caches), each trial runs `steps` steps without learning (act only) and `steps` steps with
+    learning (end to end). Reported figures:
+
+    * `act_only`: actions per second (time spent in `act` only)
+    * `observe_update`: observations per second, including agent updates (time spent in `observe` only)
+    * `end_to_end`: environment steps per second of the complete loop (wall time)
+    """
+    def __init__(self, speed_agent, max_episode_timesteps=None):
+        self.speed_agent = speed_agent
+        self.max_episode_timesteps = max_episode_timesteps
+
+        self.state = None
+        self.episode_timestep = 0
+
+    def run_steps(self, steps, learn=True):
+        """
+        Run steps and time their components. Episodes continue across calls.
+
+        Args:
+            steps: number of steps
+            learn: Boolean indicating whether the agent observes and updates
+
+        Returns: dict containing step count, wall time, act/environment/observe/reset time and finished episodes
+
+        """
+        speed_agent = self.speed_agent
+        act_time = environment_time = observe_time = reset_time = 0.0
+        episodes = 0
+
+        start_time = time.perf_counter()
+
+        if self.state is None:
+            self.state = speed_agent.reset()
+            self.episode_timestep = 0
+            reset_time += time.perf_counter() - start_time
+
+        for _ in xrange(steps):
+            time_0 = time.perf_counter()
+            action = speed_agent.act(self.state, learn=learn)
+            time_1 = time.perf_counter()
+            next_state, reward, terminal = speed_agent.step(action)
+            time_2 = time.perf_counter()
+
+            self.episode_timestep += 1
+            if self.max_episode_timesteps and self.episode_timestep >= self.max_episode_timesteps:
+                terminal = True
+
+            act_time += time_1 - time_0
+            environment_time += time_2 - time_1
+
+            if learn:
+                speed_agent.observe(reward, terminal, next_state)
+                observe_time += time.perf_counter() - time_2
+
+            if terminal:
+                episodes += 1
+                time_3 = time.perf_counter()
+                self.state = speed_agent.reset()
+                self.episode_timestep = 0
+                reset_time += time.perf_counter() - time_3
+            else:
+                self.state = next_state
+
+        return dict(
+            steps=steps,
+            wall_time=time.perf_counter() - start_time,
+            act_time=act_time,
+            environment_time=environment_time,
+            observe_time=observe_time,
+            reset_time=reset_time,
+            episodes=episodes
+        )
+
+    def run_trial(self, steps):
+        """
+        Run one trial.
+
+        Args:
+            steps: number of steps of each phase
+
+        Returns: dict containing throughput figures of each speed mode and the raw timing of both phases
+
+        """
+        act_phase = self.run_steps(steps, learn=False)
+        learn_phase = self.run_steps(steps, learn=True)
+
+        return dict(
+            act_only=throughput(steps, act_phase['act_time']),
+            observe_update=throughput(steps, learn_phase['observe_time']),
+            end_to_end=throughput(steps, learn_phase['wall_time']),
+            act_phase=act_phase,
+            learn_phase=learn_phase
+        )
+
+    def run(self, steps, warmup_steps=0, trials=1, trial_callback=None):
+        """
+        Run speed benchmark.
+
+        Args:
+            steps: number of timed steps of each phase per trial
+            warmup_steps: number of untimed steps before the first trial
+            trials: number of trials
+            trial_callback: optional function called with the trial number and results after each trial
+
+        Returns: dict containing the results of each trial and a summary over all trials
+
+        """
+        if warmup_steps > 0:
+            self.run_steps(warmup_steps, learn=True)
+
+        trial_results = list()
+        for trial in xrange(trials):
+            trial_results.append(self.run_trial(steps))
+            if trial_callback:
+                trial_callback(trial, trial_results[-1])
+
+        return dict(
+            trials=trial_results,
+            summary=summarize_trials(trial_results)
+        )
+
+
+def throughput(steps, seconds):
+    return dict(
+        steps=steps,
+        time=seconds,
+        steps_per_second=steps / seconds if seconds > 0 else float('nan')
+    )
+
+
+def summarize_trials(trial_results):
+    """
+    Summarize throughput over trials.
+
+    Args:
+        trial_results: list of trial result dicts
+
+    Returns: dict containing mean, std, median, min and max steps per second of each speed mode
+
+    """
+    summary = dict()
+    for mode in speed_modes:
+        steps_per_second = np.array([trial[mode]['steps_per_second'] for trial in trial_results], dtype=np.float64)
+        if len(steps_per_second) == 0:
+            continue
+
+        summary[mode] = dict(
+            mean=float(np.mean(steps_per_second)),
+            std=float(np.std(steps_per_second)),
+            median=float(np.median(steps_per_second)),
+            min=float(np.min(steps_per_second)),
+            max=float(np.max(steps_per_second))
+        )
+
+    return summary
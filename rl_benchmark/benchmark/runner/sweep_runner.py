@@ -0,0 +1,333 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Sweep runner class.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+
+from six.moves import xrange
+from tqdm import tqdm
+
+from rl_benchmark.benchmark.runner.benchmark_runner import initialize_worker
+from rl_benchmark.benchmark.runner.cpu_budget import partition_cpus, thread_environment
+from rl_benchmark.data import BenchmarkData
+from rl_benchmark.libraries import libraries
+from rl_benchmark.util import hash_object, load_config_file
+
+
+def make_job(config, gym_id, rl_library, experiment_num, seed=None, config_hash=None):
+    """
+    Create sweep job dict.
+
+    Args:
+        config: config name (resolved via `load_config_file`) or config file path
+        gym_id: ID of the gym environment
+        rl_library: name of a library in `rl_benchmark.libraries.libraries`
+        experiment_num: experiment number within the (config, gym_id, rl_library) combination
+        seed: random seed of the experiment, or None
+        config_hash: hash of the config content, so editing a config changes the job id, or None
+
+    Returns: job dict
+
+    """
+    job = dict(
+        config=config,
+        gym_id=gym_id,
+        rl_library=rl_library,
+        experiment=experiment_num
+    )
+    if seed is not None:
+        # Only part of the job (and job id) if set, so ledgers of unseeded sweeps stay valid
+        job['seed'] = seed
+    if config_hash is not None:
+        job['config_hash'] = config_hash
+    job['job_id'] = hash_object(job)
+    return job
+
+
+def execute_job(job, config_folder=None, output_folder='/tmp', cpus_per_experiment=None):
+    """
+    Run a single sweep job (one experiment) and return its experiment data.
+
+    Args:
+        job: job dict as created by `make_job()`
+        config_folder: folder to look up config files in
+        output_folder: output folder passed to the benchmark runner
+        cpus_per_experiment: CPU budget of the experiment, or None
+
+    Returns: experiment data dict
+
+    """
+    if job['rl_library'] not in libraries:
+        raise ValueError("No such library: {}".format(job['rl_library']))
+
+    benchmark_runner = libraries[job['rl_library']](
+        config_folder=config_folder,
+        output_folder=output_folder
+    )
+
+    # Jobs from a remote coordinator carry the resolved config
+    if not benchmark_runner.load_config(job.get('config_data') or job['config']):
+        raise ValueError("Config not found: {}".format(job['config']))
+
+    benchmark_runner.set_environment('openai_gym', job['gym_id'])
+    benchmark_runner.set_seed(job.get('seed'))
+    benchmark_runner.set_cpu_budget(cpus_per_experiment)
+
+    benchmark_data = benchmark_runner.run(experiments=1, progress=False)
+
+    return benchmark_data[0]
+
+
+def initialize_sweep_worker(rl_libraries, cpu_sets=None):
+    """
+    Import libraries of the sweep and initialize their backends once per worker process.
+
+    Args:
+        rl_libraries: list of library names
+        cpu_sets: optional queue of CPU lists to pin workers to (see `initialize_worker()`)
+
+    Returns:
+
+    """
+    runner_classes = list()
+    for rl_library in rl_libraries:
+        try:
+            runner_classes.append(libraries[rl_library])
+        except (KeyError, ImportError):
+            # Reported by the jobs using this library
+            logging.exception("Could not import library {}".format(rl_library))
+
+    initialize_worker(runner_classes, cpu_sets)
+
+
+def execute_job_in_worker(args):
+    """
+    Run sweep job in a worker process. Exceptions are caught and returned, so a failing job does not abort the sweep.
+
+    Args:
+        args: tuple of (job dict, config folder, output folder, CPU budget)
+
+    Returns: tuple of (job dict, experiment data dict or None, error string or None)
+
+    """
+    job, config_folder, output_folder, cpus_per_experiment = args
+    try:
+        return job, execute_job(job, config_folder=config_folder, output_folder=output_folder,
+                                cpus_per_experiment=cpus_per_experiment), None
+    except Exception:
+        return job, None, traceback.format_exc()
+
+
+class JobLedger(object):
+    """
+    Append-only ledger of finished sweep jobs. Each line is a JSON object, so a ledger of a killed sweep stays
+    readable (an incomplete last line is ignored).
+    """
+    def __init__(self, ledger_file):
+        self.ledger_file = ledger_file
+        self.entries = dict()
+
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.ledger_file):
+            return False
+
+        with open(self.ledger_file, 'r') as fp:
+            for line in fp:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logging.warning("Ignoring corrupt ledger line in {}".format(self.ledger_file))
+                    continue
+                self.entries[entry['job_id']] = entry
+
+        return True
+
+    def is_done(self, job_id):
+        entry = self.entries.get(job_id)
+        return bool(entry) and entry['status'] == 'done'
+
+    def record(self, job, status, **kwargs):
+        entry = dict(job, status=status, time=int(time.time()), **kwargs)
+        self.entries[job['job_id']] = entry
+
+        with open(self.ledger_file, 'a') as fp:
+            fp.write(json.dumps(entry, sort_keys=True) + '\n')
+            fp.flush()
+            os.fsync(fp.fileno())
+
+
+class SweepRunner(object):
+    """
+    Runs every (config, gym_id, rl_library) combination on a bounded pool of worker processes and stores each
+    finished experiment in a database. Finished jobs are written to a ledger, so an interrupted sweep can be
+    resumed without re-running completed experiments.
+    """
+    def __init__(self, configs, gym_ids, rl_libraries, db, ledger_file, experiments=1, config_folder=None,
+                 output_folder='/tmp', seed=None, cpus_per_experiment=None):
+        self.configs = configs
+        self.gym_ids = gym_ids
+        self.rl_libraries = rl_libraries
+        self.db = db
+        self.experiments = experiments
+        self.seed = seed  # experiment i of each combination is seeded with seed + i
+        self.cpus_per_experiment = cpus_per_experiment  # workers are pinned to this many CPUs each
+        self.config_folder = config_folder
+        self.output_folder = output_folder
+
+        self.ledger = JobLedger(ledger_file)
+
+    def jobs(self):
+        """
+        Returns: list of all job dicts of this sweep
+
+        """
+        # Configs that can't be loaded get no hash, their jobs fail when executed
+        config_hashes = dict()
+        for config in self.configs:
+            config_data = load_config_file(config, config_folder=self.config_folder)
+            config_hashes[config] = hash_object(config_data) if config_data else None
+
+        return [make_job(config, gym_id, rl_library, experiment_num,
+                         seed=self.seed + experiment_num if self.seed is not None else None,
+                         config_hash=config_hashes[config])
+                for config, gym_id, rl_library, experiment_num
+                in itertools.product(self.configs, self.gym_ids, self.rl_libraries, xrange(self.experiments))]
+
+    def pending_jobs(self):
+        """
+        Returns: list of job dicts that have not been completed yet
+
+        """
+        return [job for job in self.jobs() if not self.ledger.is_done(job['job_id']) and not self.recover_job(job)]
+
+    def recover_job(self, job):
+        """
+        Complete the ledger entry of a job whose experiment was stored in the database, but which was not marked
+        done (e.g. because the sweep was killed in between, see `save_result()`).
+
+        Args:
+            job: job dict
+
+        Returns: Boolean indicating whether the job was recovered
+
+        """
+        entry = self.ledger.entries.get(job['job_id'])
+        if not entry or entry['status'] != 'saving':
+            return False
+
+        if not all(self.db.get_experiment(experiment_hash) for experiment_hash in entry['experiment_hashes']):
+            return False
+
+        logging.info("Recovered job {} from database".format(job['job_id']))
+        self.ledger.record(job, 'done', benchmark_hash=entry['benchmark_hash'],
+                           experiment_hashes=entry['experiment_hashes'])
+        return True
+
+    def save_result(self, job, experiment_data):
+        """
+        Store the experiment of a finished job in the database and mark the job done. The experiment hash is written
+        to the ledger before the database, so a job that was stored but not marked done is not run (and stored)
+        again on resume.
+
+        Args:
+            job: job dict
+            experiment_data: experiment data dict
+
+        Returns: dict as returned by `save_benchmark()`
+
+        """
+        benchmark_data = BenchmarkData([experiment_data])
+        experiment_hash, benchmark_hash, _ = benchmark_data[0].hash()
+        self.ledger.record(job, 'saving', benchmark_hash=benchmark_hash, experiment_hashes=[experiment_hash])
+
+        save_info = self.db.save_benchmark(benchmark_data)
+        self.ledger.record(job, 'done',
+                           benchmark_hash=save_info['benchmark_hashes'][0],
+                           experiment_hashes=save_info['added_experiment_hashes'])
+        return save_info
+
+    def run(self, workers=1):
+        """
+        Run all pending jobs.
+
+        Args:
+            workers: number of worker processes
+
+        Returns: dict containing lists of completed and failed job ids
+
+        """
+        jobs = self.pending_jobs()
+
+        completed_jobs = list()
+        failed_jobs = list()
+
+        logging.info("Running sweep with {:d} pending jobs ({:d} total) on {:d} workers".format(
+            len(jobs), len(self.jobs()), workers))
+
+        if len(jobs) == 0:
+            return dict(completed_jobs=completed_jobs, failed_jobs=failed_jobs)
+
+        # Spawn fresh interpreters, as forking a process with an initialized backend (e.g. TensorFlow) is unsafe.
+        # Worker processes are kept alive and initialize the libraries' backends once, so imports and backend
+        # initialization are paid once per worker, not per job. Runners reset the backend before each experiment.
+        context = multiprocessing.get_context('spawn')
+        workers = max(1, min(workers, len(jobs)))
+
+        cpu_sets = None
+        if self.cpus_per_experiment:
+            cpu_sets = context.Queue()
+            for cpus in partition_cpus(self.cpus_per_experiment, workers):
+                cpu_sets.put(cpus)
+
+        # Workers inherit the thread environment variables, so they apply before any library is imported
+        with thread_environment(self.cpus_per_experiment):
+            pool = context.Pool(processes=workers, initializer=initialize_sweep_worker,
+                                initargs=(sorted(set(job['rl_library'] for job in jobs)), cpu_sets))
+
+        try:
+            results = pool.imap_unordered(execute_job_in_worker,
+                                          [(job, self.config_folder, self.output_folder, self.cpus_per_experiment)
+                                           for job in jobs])
+            for job, experiment_data, error in tqdm(results, total=len(jobs), desc='Sweep'):
+                if error:
+                    logging.error("Job {} ({}, {}, {}) failed:\n{}".format(
+                        job['job_id'], job['config'], job['gym_id'], job['rl_library'], error))
+                    self.ledger.record(job, 'failed', error=error)
+                    failed_jobs.append(job['job_id'])
+                    continue
+
+                # Only the parent process writes to the database
+                self.save_result(job, experiment_data)
+                completed_jobs.append(job['job_id'])
+        finally:
+            pool.close()
+            pool.join()
+
+        return dict(completed_jobs=completed_jobs, failed_jobs=failed_jobs)
@@ -21,8 +21,12 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import division
 
-from rl_benchmark.benchmark.wrapper.environment_wrapper import EnvironmentWrapper
+from rl_benchmark.benchmark.wrapper.environment_wrapper import EnvironmentWrapper, StopExperiment
 from rl_benchmark.benchmark.wrapper.results_wrapper import ResultsWrapper
+from rl_benchmark.benchmark.wrapper.step_timer import LatencyHistogram, StepTimer
+from rl_benchmark.benchmark.wrapper.vectorized_results_wrapper import SubEnvironmentWrapper, \
+    VectorizedResultsWrapper
 
 
-__all__ = ['EnvironmentWrapper', 'ResultsWrapper']
+__all__ = ['EnvironmentWrapper', 'LatencyHistogram', 'ResultsWrapper', 'StepTimer', 'StopExperiment',
+           'SubEnvironmentWrapper', 'VectorizedResultsWrapper']
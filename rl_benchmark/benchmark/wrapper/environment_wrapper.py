@@ -21,9 +21,19 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import division
 
+
+class StopExperiment(Exception):
+    """
+    Raised from within an environment step when an episode end callback requested to stop the experiment. Used for
+    libraries whose runners don't support stopping from a callback.
+    """
+    pass
+
+
 class EnvironmentWrapper(object):
     """
-    Wraps around an environment to enable additional metrics for external libraries.
+    Wraps around an environment to enable additional metrics for external libraries. Attributes not defined by the
+    wrapper are forwarded to the wrapped environment.
     """
     def __init__(self, env):
         self.env = env
@@ -39,8 +49,31 @@ class EnvironmentWrapper(object):
         self.episode_end_callbacks.append((callback, args, kwargs))
 
     def call_episode_end_callbacks(self):
+        """
+        Call episode end callbacks.
+
+        Returns: Boolean indicating whether to continue, i.e. False if any callback returned False
+
+        """
+        continue_run = True
         for (callback, args, kwargs) in self.episode_end_callbacks:
-            callback(*args, **kwargs)
+            if callback(*args, **kwargs) is False:
+                continue_run = False
+        return continue_run
 
     def __getattr__(self, item):
-        return self.env.__getattribute__(item)
+        # Only called if the normal lookup failed, i.e. for attributes of the wrapped environment
+        if item == 'env':
+            # Not yet set (e.g. during unpickling)
+            raise AttributeError(item)
+
+        # Use getattr, so environments forwarding attributes themselves (e.g. `SubprocessEnvironment`) work, too
+        value = getattr(self.env, item)
+
+        if callable(value) and not isinstance(value, type) and not item.startswith('__'):
+            # Bind methods once: later lookups find them in the instance dict and don't reach `__getattr__`. Nested
+            # wrappers cache the innermost bound method, so forwarded calls cost the same as on the raw environment.
+            # Other attributes (e.g. properties) are forwarded on every access, as their value may change.
+            self.__dict__[item] = value
+
+        return value
@@ -24,37 +24,89 @@ from __future__ import division
 import time
 
 from rl_benchmark.benchmark.wrapper.environment_wrapper import EnvironmentWrapper
+from rl_benchmark.benchmark.wrapper.step_timer import StepTimer
+from rl_benchmark.data.episode_store import EpisodeStore
 
 
 class ResultsWrapper(EnvironmentWrapper):
+    """
+    Records episode results (in an `EpisodeStore`) and step timing. Subclasses call `timed_step()` in their step
+    method and `finish_episode()` when an episode ends.
+    """
     def __init__(self, env):
         super(ResultsWrapper, self).__init__(env)
 
         self.episode = 1
         self.timestep = 0
 
-        self.episode_rewards = list()
-        self.episode_timesteps = list()
-        self.episode_times = list()
+        self.episode_store = EpisodeStore()
 
-        self.episode_start_time = time.time()
+        self.episode_start_time = time.perf_counter()
         self.episode_timestep = 0
         self.episode_reward = 0
 
+        self.timer = StepTimer()
+        # Bound once, so timed steps don't pay for an extra call (see `timed_step()`)
+        self.timed_step = self.timer.step
+
+        # `time.perf_counter()` value after which the experiment is stopped (wall-clock limit), or None
+        self.deadline = None
+
+    @property
+    def episode_rewards(self):
+        return self.episode_store.rewards
+
+    @property
+    def episode_timesteps(self):
+        return self.episode_store.timesteps
+
+    @property
+    def episode_times(self):
+        return self.episode_store.times
+
     def reset(self):
         # Only reset episode statistics:
-        self.episode_start_time = time.time()
+        self.episode_start_time = time.perf_counter()
         self.episode_timestep = 0
         self.episode_reward = 0
 
-        return super(ResultsWrapper, self).reset()
+        return self.timer.reset(super(ResultsWrapper, self).reset)
+
+    def timed_step(self, method, *args, **kwargs):
+        # Shadowed by the timer's bound `step` method in `__init__`
+        return self.timer.step(method, *args, **kwargs)
+
+    def finish_episode(self):
+        """
+        Record results of the finished episode and call episode end callbacks.
+
+        Returns: Boolean indicating whether to continue
+
+        """
+        # Reuse the end time of the last step instead of reading the clock again
+        time_passed = self.timer.last_step_end_time - self.episode_start_time
+
+        self.episode_store.append(self.episode_reward, self.episode_timestep, time_passed)
+        self.timer.finish_episode()
+
+        continue_run = self.timer.callbacks(self.call_episode_end_callbacks)
+        self.episode += 1
+
+        return continue_run
+
+    def deadline_passed(self):
+        """
+        Returns: Boolean indicating whether the last step ended after the deadline. Uses the step end time recorded
+            by the timer, so checking the deadline doesn't read the clock again.
+
+        """
+        return self.deadline is not None and self.timer.last_step_end_time >= self.deadline
+
+    def get_timing_results(self):
+        return self.timer.get_results()
 
     def get_results(self):
-        results = dict(
-            initial_reset_time=0,
-            episode_rewards=self.episode_rewards,
-            episode_timesteps=self.episode_timesteps,
-            episode_end_times=self.episode_times
-        )
+        results = self.episode_store.get_results()
+        results.update(self.get_timing_results())
 
         return results
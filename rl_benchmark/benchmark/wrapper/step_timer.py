@@ -0,0 +1,278 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Step timing classes.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import math
+import time
+
+import numpy as np
+
+
+class LatencyHistogram(object):
+    """
+    Fixed-memory histogram of latencies with logarithmically spaced buckets. Recording a value is O(1), percentiles
+    are accurate up to the bucket resolution (`buckets_per_decade` buckets per factor of 10). Recorded values are
+    buffered and sorted into buckets in batches of `buffer_size`, so recording only appends to a list. Counts and
+    totals include buffered values after `flush()` (called by `percentile()` and `summary()`).
+    """
+    def __init__(self, min_value=1e-7, max_value=1e3, buckets_per_decade=20, buffer_size=4096):
+        self.min_value = min_value
+        self.buckets_per_decade = buckets_per_decade
+        self.buffer_size = buffer_size
+
+        self.log_min_value = math.log(min_value)
+        self.scale = buckets_per_decade / math.log(10)
+
+        # First bucket collects values <= min_value, last bucket values >= max_value
+        self.num_buckets = int(math.ceil(math.log10(max_value / min_value) * buckets_per_decade)) + 2
+        self.counts = np.zeros(self.num_buckets, dtype=np.int64)
+        self.buffer = list()
+
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        buffer = self.buffer
+        buffer.append(value)
+        if len(buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+
+        values = np.array(self.buffer, dtype=np.float64)
+        del self.buffer[:]
+
+        indices = np.minimum(((np.log(np.maximum(values, self.min_value)) - self.log_min_value) * self.scale)
+                             .astype(np.int64) + 1, self.num_buckets - 1)
+        indices[values <= self.min_value] = 0
+
+        self.counts += np.bincount(indices, minlength=self.num_buckets)
+        self.count += len(values)
+        self.total += float(np.sum(values))
+        self.max = max(self.max, float(np.max(values)))
+
+    def bucket_upper_bound(self, index):
+        return self.min_value * 10 ** (index / self.buckets_per_decade)
+
+    def percentile(self, q):
+        """
+        Return approximate percentile (upper bound of the bucket containing it).
+
+        Args:
+            q: percentile in [0, 100]
+
+        Returns: latency in seconds
+
+        """
+        self.flush()
+        if self.count == 0:
+            return float('nan')
+
+        target = q / 100 * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if count > 0 and cumulative >= target:
+                return min(self.bucket_upper_bound(index), self.max)
+
+        return self.max
+
+    def summary(self):
+        self.flush()
+        return dict(
+            count=self.count,
+            mean=self.total / self.count if self.count > 0 else float('nan'),
+            p50=self.percentile(50),
+            p90=self.percentile(90),
+            p99=self.percentile(99),
+            max=self.max
+        )
+
+
+class StepTimer(object):
+    """
+    Decomposes the time of a run into time spent in the environment (`step`/`execute` calls), time spent between
+    environment steps (the agent acting, observing and updating), time spent in episode end callbacks, and time
+    spent resetting the environment.
+
+    Each step reads `time.perf_counter()` once, at its end, so step time (environment and agent time together) is
+    exact. Only every `sample_interval`-th step also reads the clock at its start: these sampled steps are recorded in
+    the latency histograms and determine how step time is split into environment and agent time. The split is an
+    estimate (from the sampled steps of the episode, or of the run if the episode has none), unless `sample_interval`
+    is 1, which costs a second clock read and histogram updates on every step.
+    """
+    def __init__(self, sample_interval=16):
+        self.sample_interval = sample_interval
+
+        self.environment_time = 0.0
+        self.agent_time = 0.0
+        self.callback_time = 0.0
+        self.reset_time = 0.0
+
+        self.initial_reset_time = 0.0
+        self.resets = 0
+
+        self.environment_latency = LatencyHistogram()
+        self.agent_latency = LatencyHistogram()
+
+        # Sampled environment and agent time of finished episodes
+        self.sampled_environment_time = 0.0
+        self.sampled_agent_time = 0.0
+
+        # Timing of the current episode
+        self.episode_step_time = 0.0
+        self.episode_sampled_environment_time = 0.0
+        self.episode_sampled_agent_time = 0.0
+
+        # Timing of finished episodes
+        self.episode_environment_times = list()
+        self.episode_agent_times = list()
+
+        self.last_step_end_time = None
+        # The first step is sampled, so `last_step_end_time` is set before unsampled steps use it
+        self.steps_until_sample = 1
+
+    def reset(self, method, *args, **kwargs):
+        start_time = time.perf_counter()
+        result = method(*args, **kwargs)
+        end_time = time.perf_counter()
+
+        reset_time = end_time - start_time
+        if self.resets == 0:
+            self.initial_reset_time = reset_time
+        self.resets += 1
+        self.reset_time += reset_time
+
+        self.close_episode()
+        self.last_step_end_time = end_time
+
+        return result
+
+    def step(self, method, *args, **kwargs):
+        self.steps_until_sample -= 1
+        if not self.steps_until_sample:
+            return self.sampled_step(method, *args, **kwargs)
+
+        result = method(*args, **kwargs)
+
+        end_time = time.perf_counter()
+        self.episode_step_time += end_time - self.last_step_end_time
+        self.last_step_end_time = end_time
+
+        return result
+
+    def sampled_step(self, method, *args, **kwargs):
+        self.steps_until_sample = self.sample_interval
+
+        start_time = time.perf_counter()
+
+        agent_time = 0.0
+        if self.last_step_end_time is not None:
+            agent_time = start_time - self.last_step_end_time
+            self.agent_latency.record(agent_time)
+
+        result = method(*args, **kwargs)
+
+        end_time = time.perf_counter()
+        environment_time = end_time - start_time
+        self.environment_latency.record(environment_time)
+
+        self.episode_step_time += agent_time + environment_time
+        self.episode_sampled_environment_time += environment_time
+        self.episode_sampled_agent_time += agent_time
+        self.last_step_end_time = end_time
+
+        return result
+
+    def callbacks(self, method, *args, **kwargs):
+        start_time = time.perf_counter()
+        result = method(*args, **kwargs)
+        end_time = time.perf_counter()
+
+        self.callback_time += end_time - start_time
+        # Don't count callback time as agent time
+        self.last_step_end_time = end_time
+
+        return result
+
+    def episode_times(self):
+        """
+        Returns: tuple of (estimated) environment and agent time of the current episode
+
+        """
+        sampled_environment_time = self.episode_sampled_environment_time
+        sampled_time = sampled_environment_time + self.episode_sampled_agent_time
+        if sampled_time <= 0.0:
+            sampled_environment_time = self.sampled_environment_time
+            sampled_time = sampled_environment_time + self.sampled_agent_time
+        if sampled_time <= 0.0:
+            return self.episode_step_time, 0.0
+
+        environment_time = self.episode_step_time * sampled_environment_time / sampled_time
+        return environment_time, self.episode_step_time - environment_time
+
+    def close_episode(self):
+        """
+        Add the time of the current episode to the totals and start a new episode.
+
+        Returns: tuple of (estimated) environment and agent time of the episode
+
+        """
+        environment_time, agent_time = self.episode_times()
+        self.environment_time += environment_time
+        self.agent_time += agent_time
+        self.sampled_environment_time += self.episode_sampled_environment_time
+        self.sampled_agent_time += self.episode_sampled_agent_time
+
+        self.episode_step_time = 0.0
+        self.episode_sampled_environment_time = 0.0
+        self.episode_sampled_agent_time = 0.0
+
+        return environment_time, agent_time
+
+    def finish_episode(self):
+        environment_time, agent_time = self.close_episode()
+        self.episode_environment_times.append(environment_time)
+        self.episode_agent_times.append(agent_time)
+
+    def get_results(self):
+        # Include the unfinished episode
+        environment_time, agent_time = self.episode_times()
+
+        return dict(
+            initial_reset_time=self.initial_reset_time,
+            episode_environment_times=self.episode_environment_times,
+            episode_agent_times=self.episode_agent_times,
+            timing=dict(
+                environment_time=self.environment_time + environment_time,
+                agent_time=self.agent_time + agent_time,
+                callback_time=self.callback_time,
+                reset_time=self.reset_time,
+                resets=self.resets,
+                sample_interval=self.sample_interval,
+                environment_step_latency=self.environment_latency.summary(),
+                agent_step_latency=self.agent_latency.summary()
+            )
+        )
@@ -0,0 +1,192 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Vectorized results wrapper class.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import time
+import numpy as np
+
+from six.moves import xrange
+
+from rl_benchmark.benchmark.wrapper.environment_wrapper import EnvironmentWrapper, StopExperiment
+from rl_benchmark.benchmark.wrapper.step_timer import StepTimer
+from rl_benchmark.data.episode_store import EpisodeStore
+
+
+class SubEnvironmentWrapper(EnvironmentWrapper):
+    """
+    View on a single sub-environment of a `VectorizedResultsWrapper`. Steps and resets are recorded by the parent
+    wrapper, so libraries that step their environments one by one still get per-environment episode accounting.
+    """
+    def __init__(self, vectorized_wrapper, index):
+        super(SubEnvironmentWrapper, self).__init__(vectorized_wrapper.environments[index])
+        self.vectorized_wrapper = vectorized_wrapper
+        self.index = index
+
+    def reset(self):
+        return self.vectorized_wrapper.reset_environment(self.index)
+
+    def step(self, *args, **kwargs):
+        return self.vectorized_wrapper.step_environment(self.index, *args, **kwargs)
+
+
+class VectorizedResultsWrapper(EnvironmentWrapper):
+    """
+    Steps K copies of an environment in a batch and records episode results for each of them.
+
+    Episode results are kept per sub-environment (`environment_episode_rewards`, etc.) and merged in order of episode
+    completion (`episode_rewards`, etc.), so the merged lists can be used like the ones of a `ResultsWrapper`.
+    Episode end callbacks are called once for every finished episode of any sub-environment. If a callback returns
+    False, `StopExperiment` is raised.
+    """
+    def __init__(self, environments):
+        # Attribute lookups (e.g. state and action spaces) are forwarded to the first environment
+        super(VectorizedResultsWrapper, self).__init__(environments[0])
+
+        self.environments = list(environments)
+        self.num_environments = len(self.environments)
+
+        self.episode = 1
+        self.timestep = 0
+
+        # Results merged over all sub-environments, in order of episode completion
+        self.episode_store = EpisodeStore()
+        self.episode_environments = list()
+
+        # Results of each sub-environment
+        self.environment_episode_rewards = [list() for _ in xrange(self.num_environments)]
+        self.environment_episode_timesteps = [list() for _ in xrange(self.num_environments)]
+        self.environment_episode_times = [list() for _ in xrange(self.num_environments)]
+
+        # Statistics of the currently running episode of each sub-environment
+        self.environment_episode_start_time = [time.perf_counter()] * self.num_environments
+        self.environment_episode_timestep = [0] * self.num_environments
+        self.environment_episode_reward = [0] * self.num_environments
+
+        # Statistics of the last finished episode
+        self.episode_timestep = 0
+        self.episode_reward = 0
+
+        # Step timing over all sub-environments
+        self.timer = StepTimer()
+
+        # `time.perf_counter()` value after which the experiment is stopped (wall-clock limit), or None
+        self.deadline = None
+
+    @property
+    def episode_rewards(self):
+        return self.episode_store.rewards
+
+    @property
+    def episode_timesteps(self):
+        return self.episode_store.timesteps
+
+    @property
+    def episode_times(self):
+        return self.episode_store.times
+
+    def sub_environments(self):
+        """
+        Returns: list of `SubEnvironmentWrapper` objects, one for each sub-environment
+
+        """
+        return [SubEnvironmentWrapper(self, index) for index in xrange(self.num_environments)]
+
+    def reset_environment(self, index):
+        self.environment_episode_start_time[index] = time.perf_counter()
+        self.environment_episode_timestep[index] = 0
+        self.environment_episode_reward[index] = 0
+
+        return self.timer.reset(self.environments[index].reset)
+
+    def reset(self):
+        return np.stack([self.reset_environment(index) for index in xrange(self.num_environments)])
+
+    def step_environment(self, index, *args, **kwargs):
+        state, reward, terminal, info = self.timer.step(self.environments[index].step, *args, **kwargs)
+
+        self.timestep += 1
+        self.environment_episode_timestep[index] += 1
+        self.environment_episode_reward[index] += reward
+
+        if terminal:
+            time_passed = self.timer.last_step_end_time - self.environment_episode_start_time[index]
+            episode_timestep = self.environment_episode_timestep[index]
+            episode_reward = self.environment_episode_reward[index]
+
+            self.environment_episode_timesteps[index].append(episode_timestep)
+            self.environment_episode_rewards[index].append(episode_reward)
+            self.environment_episode_times[index].append(time_passed)
+
+            self.episode_store.append(episode_reward, episode_timestep, time_passed)
+            self.episode_environments.append(index)
+
+            self.episode_timestep = episode_timestep
+            self.episode_reward = episode_reward
+
+            continue_run = self.timer.callbacks(self.call_episode_end_callbacks)
+            self.episode += 1
+
+            if not continue_run:
+                raise StopExperiment()
+
+        # The step end time is recorded by the timer anyway, so the deadline check doesn't read the clock again
+        if self.deadline is not None and self.timer.last_step_end_time >= self.deadline:
+            raise StopExperiment()
+
+        return state, reward, terminal, info
+
+    def step(self, actions):
+        """
+        Step all sub-environments.
+
+        Args:
+            actions: batch of actions, one for each sub-environment
+
+        Returns: tuple of stacked states, rewards, terminals, and list of infos
+
+        """
+        states, rewards, terminals, infos = list(), list(), list(), list()
+
+        for index in xrange(self.num_environments):
+            state, reward, terminal, info = self.step_environment(index, actions[index])
+            states.append(state)
+            rewards.append(reward)
+            terminals.append(terminal)
+            infos.append(info)
+
+        return np.stack(states), np.asarray(rewards), np.asarray(terminals), infos
+
+    def close(self):
+        for environment in self.environments:
+            environment.close()
+
+    def get_results(self):
+        results = self.episode_store.get_results()
+        results['episode_environments'] = self.episode_environments
+
+        timing_results = self.timer.get_results()
+        # Episodes of sub-environments overlap, so time is only decomposed for the whole run, not per episode
+        timing_results.pop('episode_environment_times')
+        timing_results.pop('episode_agent_times')
+        results.update(timing_results)
+
+        return results
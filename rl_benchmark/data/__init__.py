@@ -17,8 +17,14 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+from rl_benchmark.data.episode_store import EpisodeStore
 from rl_benchmark.data.experiment_data import ExperimentData
+from rl_benchmark.data.benchmark_file import BenchmarkFile
 from rl_benchmark.data.benchmark_data import BenchmarkData
+from rl_benchmark.data.benchmark_matrix import BenchmarkMatrix
+from rl_benchmark.data.episode_log import EpisodeLog
+from rl_benchmark.data.speed_benchmark_data import SpeedBenchmarkData
 
 
-__all__ = ['ExperimentData', 'BenchmarkData']
+__all__ = ['ExperimentData', 'BenchmarkData', 'BenchmarkFile', 'BenchmarkMatrix', 'EpisodeLog', 'EpisodeStore',
+           'SpeedBenchmarkData']
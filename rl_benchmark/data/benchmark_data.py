@@ -17,27 +17,79 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import itertools
 import numpy as np
 import os
 import pickle
 
 from rl_benchmark.data import ExperimentData
+from rl_benchmark.data.benchmark_file import BenchmarkFile
+from rl_benchmark.data.benchmark_matrix import BenchmarkMatrix
+
+
+def to_experiment_data(item):
+    if isinstance(item, ExperimentData):
+        return item
+    return ExperimentData(item)
 
 
 class BenchmarkData(list):
-    def __iter__(self):
-        for item in super(BenchmarkData, self).__iter__():
-            yield ExperimentData(item)
+    """
+    List of `ExperimentData` objects. Items are converted once when they are added (`ExperimentData` objects are
+    stored as they are), so access returns the stored objects and their cached columns are kept. Concatenation and
+    slicing share the items instead of copying them.
+    """
+    def __init__(self, iterable=()):
+        super(BenchmarkData, self).__init__(to_experiment_data(item) for item in iterable)
 
     def __getitem__(self, item):
-        return ExperimentData(super(BenchmarkData, self).__getitem__(item))
+        if isinstance(item, slice):
+            return BenchmarkData(super(BenchmarkData, self).__getitem__(item))
+        return super(BenchmarkData, self).__getitem__(item)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = [to_experiment_data(item) for item in value]
+        else:
+            value = to_experiment_data(value)
+        super(BenchmarkData, self).__setitem__(index, value)
+
+    def __add__(self, other):
+        return BenchmarkData(itertools.chain(self, other))
+
+    def __radd__(self, other):
+        # Also called for `list + BenchmarkData` (e.g. when appending to a pickled list)
+        return BenchmarkData(itertools.chain(other, self))
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def append(self, item):
+        super(BenchmarkData, self).append(to_experiment_data(item))
+
+    def insert(self, index, item):
+        super(BenchmarkData, self).insert(index, to_experiment_data(item))
+
+    def extend(self, iterable):
+        super(BenchmarkData, self).extend(to_experiment_data(item) for item in iterable)
 
     def min_x(self, var):
         values = list()
         for experiment_data in self:
-            values.append(np.max(experiment_data.extended_results()[var]))
+            values.append(np.max(experiment_data.column(var)))
         return np.min(values)
 
+    def as_matrix(self):
+        """
+        Pack the episode results of all experiments into padded matrices, for vectorized statistics across
+        experiments.
+
+        Returns: `BenchmarkMatrix` object
+
+        """
+        return BenchmarkMatrix.from_benchmark_data(self)
+
     @staticmethod
     def from_file_or_hash(benchmark_lookup, db=None):
         """
@@ -72,7 +124,8 @@ class BenchmarkData(list):
     @staticmethod
     def from_file(filename):
         """
-        Load benchmark data from file.
+        Load benchmark data from file. Reads benchmark files (see `BenchmarkFile`, result columns are memory-mapped)
+        and (legacy) pickle files. Only load pickle files from trusted sources.
 
         Args:
             filename: string of filename or file object
@@ -80,8 +133,23 @@ class BenchmarkData(list):
         Returns: BenchmarkData object
 
         """
+        if BenchmarkFile.is_benchmark_file(filename):
+            return BenchmarkData(BenchmarkFile.read(filename))
+
         if hasattr(filename, 'readline'):
             return BenchmarkData(pickle.load(filename))
         else:
             with open(filename, 'rb') as fp:
                 return BenchmarkData(pickle.load(fp))
+
+    def to_file(self, filename):
+        """
+        Write benchmark data to a benchmark file (see `BenchmarkFile`).
+
+        Args:
+            filename: path to file
+
+        Returns: number of written experiments
+
+        """
+        return BenchmarkFile.write(filename, self)
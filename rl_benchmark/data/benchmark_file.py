@@ -0,0 +1,212 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Benchmark file class.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import io
+import json
+import os
+
+import numpy as np
+
+from rl_benchmark.data.episode_store import EpisodeStore
+from rl_benchmark.util import json_default
+
+
+class BenchmarkFile(object):
+    """
+    Binary benchmark file. The file starts with a fixed header (magic, version, size of the JSON header), followed by
+    a JSON header containing metadata, config and non-array results of each experiment. Typed result arrays (e.g.
+    episode rewards) follow as little-endian column blocks, aligned to `ALIGNMENT` bytes. The JSON header states dtype,
+    shape and offset (relative to the first column block) of each column.
+
+    Columns are read with `np.memmap`, so only the pages of accessed columns are read from disk. Unlike pickle files,
+    benchmark files contain no code and are safe to load from untrusted sources.
+    """
+    MAGIC = b'RLBENCHF'
+    VERSION = 1
+
+    HEADER_DTYPE = np.dtype([('magic', 'S8'), ('version', '<u4'), ('json_size', '<u8')])
+    ALIGNMENT = 64
+
+    # Per-episode results stored as columns also if they are lists, with their dtypes (other arrays keep theirs)
+    COLUMN_DTYPES = dict(
+        episode_rewards=EpisodeStore.REWARD_DTYPE,
+        episode_timesteps=EpisodeStore.TIMESTEP_DTYPE,
+        episode_end_times=EpisodeStore.TIME_DTYPE,
+        episode_environment_times=np.float64,
+        episode_agent_times=np.float64
+    )
+
+    @staticmethod
+    def align(offset):
+        return -(-offset // BenchmarkFile.ALIGNMENT) * BenchmarkFile.ALIGNMENT
+
+    @staticmethod
+    def is_benchmark_file(filename):
+        """
+        Check whether a file is a benchmark file.
+
+        Args:
+            filename: path to file or file object (read position is restored)
+
+        Returns: boolean
+
+        """
+        if hasattr(filename, 'readline'):
+            position = filename.tell()
+            magic = filename.read(len(BenchmarkFile.MAGIC))
+            filename.seek(position)
+            return magic == BenchmarkFile.MAGIC
+
+        with open(filename, 'rb') as fp:
+            return fp.read(len(BenchmarkFile.MAGIC)) == BenchmarkFile.MAGIC
+
+    @staticmethod
+    def write(filename, benchmark_data):
+        """
+        Write experiments to a benchmark file. The file is written to a temporary file first and then replaced, so
+        memory-mapped readers of an existing file (e.g. when appending to it) are not affected.
+
+        Args:
+            filename: path to benchmark file
+            benchmark_data: `BenchmarkData` object or list of experiment data dicts
+
+        Returns: number of written experiments
+
+        """
+        experiments = list()
+        columns = list()
+        offset = 0
+        for experiment_data in benchmark_data:
+            results = dict()
+            experiment_columns = dict()
+            for name, value in experiment_data.get('results', dict()).items():
+                if name in BenchmarkFile.COLUMN_DTYPES:
+                    value = np.asarray(value, dtype=BenchmarkFile.COLUMN_DTYPES[name])
+                elif not isinstance(value, np.ndarray) or value.dtype.kind not in 'biuf':
+                    results[name] = value
+                    continue
+
+                value = np.ascontiguousarray(value, dtype=value.dtype.newbyteorder('<'))
+                offset = BenchmarkFile.align(offset)
+                experiment_columns[name] = dict(dtype=value.dtype.str, shape=value.shape, offset=offset)
+                columns.append((offset, value))
+                offset += value.nbytes
+
+            experiments.append(dict(
+                metadata=experiment_data.get('metadata', dict()),
+                config=experiment_data.get('config', dict()),
+                results=results,
+                columns=experiment_columns
+            ))
+
+        json_header = json.dumps(dict(experiments=experiments), sort_keys=True, default=json_default).encode('utf8')
+        header = np.array([(BenchmarkFile.MAGIC, BenchmarkFile.VERSION, len(json_header))],
+                          dtype=BenchmarkFile.HEADER_DTYPE)
+        data_start = BenchmarkFile.align(header.nbytes + len(json_header))
+
+        temp_filename = '{}.tmp'.format(filename)
+        with open(temp_filename, 'wb') as fp:
+            fp.write(header.tobytes())
+            fp.write(json_header)
+            for column_offset, value in columns:
+                fp.write(b'\0' * (data_start + column_offset - fp.tell()))
+                fp.write(value.data)
+        os.replace(temp_filename, filename)
+
+        return len(experiments)
+
+    @staticmethod
+    def read(filename):
+        """
+        Read a benchmark file. Result columns are read-only memory-mapped arrays.
+
+        Args:
+            filename: path to benchmark file or file object
+
+        Returns: list of experiment data dicts
+
+        """
+        if hasattr(filename, 'readline'):
+            fp = filename
+            fp.seek(0)
+            return BenchmarkFile.read_file(fp)
+
+        with open(filename, 'rb') as fp:
+            return BenchmarkFile.read_file(fp)
+
+    @staticmethod
+    def read_file(fp):
+        header_size = BenchmarkFile.HEADER_DTYPE.itemsize
+
+        header = np.frombuffer(fp.read(header_size), dtype=BenchmarkFile.HEADER_DTYPE)
+        if len(header) != 1 or header['magic'][0] != BenchmarkFile.MAGIC:
+            raise ValueError("Not a benchmark file: {}".format(getattr(fp, 'name', fp)))
+        if header['version'][0] != BenchmarkFile.VERSION:
+            raise ValueError("Unsupported benchmark file version: {}".format(header['version'][0]))
+
+        json_size = int(header['json_size'][0])
+        json_header = json.loads(fp.read(json_size).decode('utf8'))
+        data_start = BenchmarkFile.align(header_size + json_size)
+
+        # The mapping stays open as long as any column references it
+        data = None
+        experiments = list()
+        for experiment in json_header['experiments']:
+            results = experiment['results']
+            for name, column in experiment['columns'].items():
+                dtype = np.dtype(column['dtype'])
+                shape = tuple(column['shape'])
+                size = int(np.prod(shape)) * dtype.itemsize
+                if size == 0:
+                    results[name] = np.empty(shape, dtype=dtype)
+                    continue
+
+                if data is None:
+                    data = BenchmarkFile.map_data(fp)
+                start = data_start + column['offset']
+                results[name] = data[start:start + size].view(dtype).reshape(shape)
+
+            experiments.append(dict(
+                metadata=experiment['metadata'],
+                config=experiment['config'],
+                results=results
+            ))
+
+        return experiments
+
+    @staticmethod
+    def map_data(fp):
+        """
+        Args:
+            fp: file object
+
+        Returns: read-only np.memmap (uint8) of the file, or an array of its contents for in-memory file objects
+
+        """
+        try:
+            fp.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            fp.seek(0)
+            return np.frombuffer(fp.read(), dtype=np.uint8)
+
+        return np.memmap(fp, dtype=np.uint8, mode='r')
@@ -0,0 +1,170 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Benchmark matrix class.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+
+
+class BenchmarkMatrix(object):
+    """
+    Episode results of all experiments of a benchmark, packed into 2-D arrays (experiments x episodes) padded to the
+    longest run. Padding is NaN, so statistics across experiments are NaN-aware reductions over axis 0 and only count
+    the experiments that ran that long.
+
+    Matrices: `rewards`, `timesteps` (cumulative episode lengths) and `seconds` (cumulative episode durations).
+    `lengths` contains the number of episodes of each experiment, `mask` is True where matrices hold values.
+    """
+    variables = ('rewards', 'timesteps', 'seconds')
+
+    def __init__(self, rewards, timesteps, seconds, lengths):
+        self.rewards = rewards
+        self.timesteps = timesteps
+        self.seconds = seconds
+        self.lengths = lengths
+        self.mask = np.arange(rewards.shape[1]) < lengths[:, np.newaxis]
+
+    @staticmethod
+    def from_benchmark_data(benchmark_data):
+        """
+        Pack the result columns of experiments.
+
+        Args:
+            benchmark_data: `BenchmarkData` object or list of `ExperimentData` objects
+
+        Returns: `BenchmarkMatrix` object
+
+        """
+        lengths = np.array([len(experiment_data.column('rewards')) for experiment_data in benchmark_data],
+                           dtype=np.int64)
+        shape = (len(lengths), int(lengths.max()) if len(lengths) else 0)
+
+        matrices = dict((var, np.full(shape, np.nan)) for var in BenchmarkMatrix.variables)
+        for i, experiment_data in enumerate(benchmark_data):
+            for var, matrix in matrices.items():
+                matrix[i, :lengths[i]] = experiment_data.column(var)
+
+        return BenchmarkMatrix(lengths=lengths, **matrices)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    @property
+    def shape(self):
+        return self.rewards.shape
+
+    def matrix(self, var):
+        """
+        Args:
+            var: `rewards`, `timesteps` or `seconds`
+
+        Returns: padded matrix of the variable
+
+        """
+        if var not in self.variables:
+            raise KeyError("No such variable: {}".format(var))
+        return getattr(self, var)
+
+    def count(self):
+        """
+        Returns: number of experiments that ran each episode
+
+        """
+        return self.mask.sum(axis=0)
+
+    def mean(self, var='rewards'):
+        """
+        Returns: mean across experiments for each episode
+
+        """
+        return np.nanmean(self.matrix(var), axis=0)
+
+    def std(self, var='rewards'):
+        """
+        Returns: standard deviation across experiments for each episode
+
+        """
+        return np.nanstd(self.matrix(var), axis=0)
+
+    def quantile(self, q, var='rewards'):
+        """
+        Args:
+            q: quantile or list of quantiles (between 0 and 1)
+
+        Returns: quantiles across experiments for each episode (one row per quantile if `q` is a list)
+
+        """
+        return np.nanquantile(self.matrix(var), q, axis=0)
+
+    def last(self, var):
+        """
+        Args:
+            var: `rewards`, `timesteps` or `seconds`
+
+        Returns: last value of each experiment (NaN for experiments without episodes)
+
+        """
+        values = np.full(len(self), np.nan)
+        finished = self.lengths > 0
+        values[finished] = self.matrix(var)[finished, self.lengths[finished] - 1]
+        return values
+
+    def min_x(self, var):
+        """
+        Same as `BenchmarkData.min_x`: the extent of the shortest experiment. Raises a ValueError if there are no
+        experiments or an experiment has no episodes.
+
+        Args:
+            var: `episodes`, `timesteps` or `seconds`
+
+        Returns: last episode number, total timesteps (integers) or total seconds of the shortest experiment
+
+        """
+        if not len(self) or not self.lengths.all():
+            raise ValueError("Can't determine the extent of experiments without episodes.")
+
+        if var == 'episodes':
+            return self.lengths.min() - 1
+        if var == 'timesteps':
+            # Padded matrices are float, timesteps are integers
+            return np.min(self.last(var)).astype(np.int64)
+        return np.min(self.last(var))
+
+    def truncate(self, episodes=None):
+        """
+        Cut matrices to a number of episodes (views, no copies).
+
+        Args:
+            episodes: number of episodes to keep (default: episodes of the shortest experiment, so the truncated
+                matrices have no padding)
+
+        Returns: `BenchmarkMatrix` object
+
+        """
+        if episodes is None:
+            episodes = self.lengths.min()
+
+        return BenchmarkMatrix(
+            rewards=self.rewards[:, :episodes],
+            timesteps=self.timesteps[:, :episodes],
+            seconds=self.seconds[:, :episodes],
+            lengths=np.minimum(self.lengths, episodes)
+        )
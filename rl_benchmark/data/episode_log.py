@@ -0,0 +1,139 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Episode log class.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import numpy as np
+
+
+class EpisodeLog(object):
+    """
+    Append-only binary log of episode results. The file consists of a short header followed by one fixed-size
+    record (reward, timesteps, time) per episode. Flushing only appends the episodes finished since the last flush,
+    and a record cut off by a crash is ignored when reading the log.
+    """
+    MAGIC = b'RLBEPLOG'
+    VERSION = 1
+
+    HEADER_DTYPE = np.dtype([('magic', 'S8'), ('version', '<u4')])
+    RECORD_DTYPE = np.dtype([('reward', '<f8'), ('timesteps', '<i8'), ('time', '<f8')])
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.written_episodes = 0
+
+    def start(self):
+        """
+        Create (or truncate) the log file and write the header.
+
+        Returns: boolean
+
+        """
+        header = np.array([(self.MAGIC, self.VERSION)], dtype=self.HEADER_DTYPE)
+        with open(self.filename, 'wb') as fp:
+            fp.write(header.tobytes())
+
+        self.written_episodes = 0
+        return True
+
+    def flush(self, episode_rewards, episode_timesteps, episode_times):
+        """
+        Append all episodes that have not been written yet.
+
+        Args:
+            episode_rewards: list of all episode rewards of the run
+            episode_timesteps: list of all episode lengths of the run
+            episode_times: list of all episode times of the run
+
+        Returns: number of appended episodes
+
+        """
+        if self.written_episodes == 0 and not os.path.exists(self.filename):
+            self.start()
+
+        start = self.written_episodes
+        num_episodes = len(episode_rewards) - start
+
+        if num_episodes <= 0:
+            return 0
+
+        records = np.empty(num_episodes, dtype=self.RECORD_DTYPE)
+        records['reward'] = episode_rewards[start:]
+        records['timesteps'] = episode_timesteps[start:start + num_episodes]
+        records['time'] = episode_times[start:start + num_episodes]
+
+        with open(self.filename, 'ab') as fp:
+            fp.write(records.tobytes())
+
+        self.written_episodes += num_episodes
+        return num_episodes
+
+    @staticmethod
+    def is_episode_log(filename):
+        """
+        Check whether a file is an episode log.
+
+        Args:
+            filename: path to file
+
+        Returns: boolean
+
+        """
+        with open(filename, 'rb') as fp:
+            return fp.read(len(EpisodeLog.MAGIC)) == EpisodeLog.MAGIC
+
+    @staticmethod
+    def read(filename):
+        """
+        Read episode log into a history dict (as saved by `BenchmarkRunner.episode_finished`).
+
+        Args:
+            filename: path to episode log file
+
+        Returns: history dict
+
+        """
+        header_size = EpisodeLog.HEADER_DTYPE.itemsize
+        record_size = EpisodeLog.RECORD_DTYPE.itemsize
+
+        with open(filename, 'rb') as fp:
+            header = np.frombuffer(fp.read(header_size), dtype=EpisodeLog.HEADER_DTYPE)
+            if len(header) != 1 or header['magic'][0] != EpisodeLog.MAGIC:
+                raise ValueError("Not an episode log file: {}".format(filename))
+            if header['version'][0] != EpisodeLog.VERSION:
+                raise ValueError("Unsupported episode log version: {}".format(header['version'][0]))
+
+            data = fp.read()
+
+        # Ignore incomplete trailing record (e.g. if the process was killed during a flush)
+        num_episodes = len(data) // record_size
+        records = np.frombuffer(data[:num_episodes * record_size], dtype=EpisodeLog.RECORD_DTYPE)
+
+        episode_timesteps = records['timesteps'].tolist()
+
+        return dict(
+            episode=num_episodes,
+            timestep=episode_timesteps[-1] if num_episodes > 0 else 0,
+            episode_rewards=records['reward'].tolist(),
+            episode_timesteps=episode_timesteps,
+            episode_end_times=records['time'].tolist()
+        )
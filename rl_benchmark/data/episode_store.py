@@ -0,0 +1,157 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Episode store class.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+
+
+class EpisodeStore(object):
+    """
+    Growable, typed storage of episode results: rewards (float64), episode lengths (int32) and episode durations
+    (float64). Values are stored in preallocated arrays whose capacity doubles when full, so appends are amortized
+    O(1). `rewards`, `timesteps` and `times` are NumPy views on the stored values (no copies).
+    """
+    __slots__ = ['size', 'reward_buffer', 'timestep_buffer', 'time_buffer']
+
+    REWARD_DTYPE = np.float64
+    TIMESTEP_DTYPE = np.int32
+    TIME_DTYPE = np.float64
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.reward_buffer = np.empty(capacity, dtype=self.REWARD_DTYPE)
+        self.timestep_buffer = np.empty(capacity, dtype=self.TIMESTEP_DTYPE)
+        self.time_buffer = np.empty(capacity, dtype=self.TIME_DTYPE)
+
+    def __len__(self):
+        return self.size
+
+    def __getstate__(self):
+        # Don't pickle unused capacity
+        return self.rewards, self.timesteps, self.times
+
+    def __setstate__(self, state):
+        rewards, timesteps, times = state
+        self.size = len(rewards)
+        self.reward_buffer = np.asarray(rewards, dtype=self.REWARD_DTYPE)
+        self.timestep_buffer = np.asarray(timesteps, dtype=self.TIMESTEP_DTYPE)
+        self.time_buffer = np.asarray(times, dtype=self.TIME_DTYPE)
+
+    @property
+    def capacity(self):
+        return len(self.reward_buffer)
+
+    @property
+    def rewards(self):
+        return self.reward_buffer[:self.size]
+
+    @property
+    def timesteps(self):
+        return self.timestep_buffer[:self.size]
+
+    @property
+    def times(self):
+        return self.time_buffer[:self.size]
+
+    def resize(self, capacity):
+        """
+        Change capacity. Existing views keep referencing the old buffers.
+
+        Args:
+            capacity: new capacity (at least the number of stored episodes)
+
+        Returns:
+
+        """
+        capacity = max(capacity, self.size)
+        for name in ('reward_buffer', 'timestep_buffer', 'time_buffer'):
+            old_buffer = getattr(self, name)
+            new_buffer = np.empty(capacity, dtype=old_buffer.dtype)
+            new_buffer[:self.size] = old_buffer[:self.size]
+            setattr(self, name, new_buffer)
+
+    def compact(self):
+        """
+        Release unused capacity, e.g. before handing out views that outlive the store.
+
+        Returns:
+
+        """
+        if self.capacity > self.size:
+            self.resize(self.size)
+
+    def append(self, reward, timesteps, time):
+        index = self.size
+        if index == len(self.reward_buffer):
+            self.resize(max(2 * index, 16))
+
+        self.reward_buffer[index] = reward
+        self.timestep_buffer[index] = timesteps
+        self.time_buffer[index] = time
+        self.size = index + 1
+
+    def extend(self, rewards, timesteps, times):
+        num_episodes = len(rewards)
+        if len(timesteps) != num_episodes or len(times) != num_episodes:
+            raise ValueError("Episode rewards, timesteps and times must have the same length.")
+
+        end = self.size + num_episodes
+        if end > len(self.reward_buffer):
+            self.resize(max(2 * len(self.reward_buffer), end))
+
+        self.reward_buffer[self.size:end] = rewards
+        self.timestep_buffer[self.size:end] = timesteps
+        self.time_buffer[self.size:end] = times
+        self.size = end
+
+    def get_results(self):
+        """
+        Returns: dict containing `episode_rewards`, `episode_timesteps` and `episode_end_times` arrays (as stored
+            in experiment results)
+
+        """
+        self.compact()
+        return dict(
+            episode_rewards=self.rewards,
+            episode_timesteps=self.timesteps,
+            episode_end_times=self.times
+        )
+
+    @staticmethod
+    def from_results(results):
+        """
+        Create episode store from experiment results. Arrays of the stored dtypes are used without copying.
+
+        Args:
+            results: results dict containing `episode_rewards`, `episode_timesteps` and `episode_end_times`
+
+        Returns: `EpisodeStore` object
+
+        """
+        episode_store = EpisodeStore.__new__(EpisodeStore)
+        episode_store.__setstate__((
+            results['episode_rewards'],
+            results['episode_timesteps'],
+            results['episode_end_times']
+        ))
+
+        return episode_store
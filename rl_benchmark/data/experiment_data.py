@@ -17,38 +17,131 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import hashlib
+
 import numpy as np
 
+from rl_benchmark.data.episode_store import EpisodeStore
 from rl_benchmark.util import hash_object
 
 
+def get_benchmark_hash(config_hash, metadata):
+    """
+    Benchmark hash identifies runs on the same config, environment and RL library/backend version.
+
+    Args:
+        config_hash: hash of the config
+        metadata: metadata dict
+
+    Returns: benchmark_hash
+
+    """
+    return hash_object([
+        config_hash,
+        metadata['environment_domain'],
+        metadata['environment_name'],
+        metadata['rl_library'],
+        metadata['rl_library_version'],
+        metadata['rl_backend'],
+        metadata['rl_backend_version']
+    ])
+
+
 class ExperimentData(dict):
+    """
+    Results, metadata and config of an experiment. A dict, as stored in pickled files and the database, with typed
+    column access to the episode results: `column()` returns NumPy arrays, and derived columns (cumulative timesteps
+    and seconds, episode numbers) are computed once on first access and cached.
+
+    Columns are read-only. Setting items resets the cache (also of hashes), changing the results dict in place does
+    not.
+    """
+    # Columns taken from the episode results, and columns derived from other columns
+    result_columns = ('rewards', 'episode_timesteps', 'episode_seconds')
+    derived_columns = ('timesteps', 'seconds', 'episodes')
+
+    # Current experiment hash version, see `hash()`
+    hash_version = 2
+
+    def __init__(self, *args, **kwargs):
+        super(ExperimentData, self).__init__(*args, **kwargs)
+        self.columns = dict()
+        self.hashes = dict()
+
+    def __reduce__(self):
+        # Pickle as plain dict contents, without cached columns
+        return ExperimentData, (dict(self),)
+
+    def __setitem__(self, key, value):
+        super(ExperimentData, self).__setitem__(key, value)
+        self.reset_columns()
+
+    def __delitem__(self, key):
+        super(ExperimentData, self).__delitem__(key)
+        self.reset_columns()
+
+    def update(self, *args, **kwargs):
+        super(ExperimentData, self).update(*args, **kwargs)
+        self.reset_columns()
+
+    def reset_columns(self):
+        """
+        Drop cached columns and hashes, e.g. after the results dict was changed in place.
+
+        Returns:
+
+        """
+        self.columns = dict()
+        self.hashes = dict()
 
-    def hash(self):
+    def hash(self, version=None):
         """
         Calculate experiment_hash, benchmark_hash, and config_hash to enable quick lookup of equal or similar
-        benchmarks.
+        benchmarks. Hashes are cached.
+
+        The config hash and benchmark hash are computed from canonical (sorted) JSON. The experiment hash also covers
+        the episode results, depending on the hash version:
+
+        - Version 1 hashes the JSON of the result lists. Databases written before version 2 store these hashes.
+        - Version 2 (current) streams the raw little-endian bytes of the typed result columns into the hasher, with
+          their dtypes and lengths, without building a JSON string.
+
+        Args:
+            version: experiment hash version (default: `hash_version`)
 
         Returns: tuple of experiment_hash, benchmark_hash, and config_hash
 
+        """
+        version = version or self.hash_version
+
+        hashes = self.hashes.get(version)
+        if hashes is None:
+            if version == 1:
+                hashes = self.hash_v1()
+            elif version == 2:
+                hashes = self.hash_v2()
+            else:
+                raise ValueError("No such experiment hash version: {}".format(version))
+            self.hashes[version] = hashes
+
+        return hashes
+
+    def benchmark_hashes(self):
+        """
+        Returns: tuple of benchmark_hash and config_hash (the same for all hash versions)
+
         """
         # Hash configuration to quickly find benchmarks with equal configurations
-        config = self['config']
-        config_hash = hash_object(config)
+        config_hash = hash_object(self['config'])
 
         # Benchmark hash identifies runs on the same config, environment and RL library/backend version
-        metadata = self['metadata']
-        results = self['results']
+        benchmark_hash = get_benchmark_hash(config_hash, self['metadata'])
 
-        benchmark_hash = hash_object([
-            config_hash,
-            metadata['environment_domain'],
-            metadata['environment_name'],
-            metadata['rl_library'],
-            metadata['rl_library_version'],
-            metadata['rl_backend'],
-            metadata['rl_backend_version']
-        ])
+        return benchmark_hash, config_hash
+
+    def hash_v1(self):
+        benchmark_hash, config_hash = self.benchmark_hashes()
+        results = self['results']
 
         # Experiment hash identifies a specific benchmark run
         experiment_hash = hash_object([
@@ -61,19 +154,67 @@ class ExperimentData(dict):
 
         return experiment_hash, benchmark_hash, config_hash
 
+    def hash_v2(self):
+        benchmark_hash, config_hash = self.benchmark_hashes()
 
-    def extended_results(self):
-        rewards = np.array(self['results']['episode_rewards'])  # turn rewards into numpy array
+        # Experiment hash identifies a specific benchmark run
+        hasher = hashlib.sha1(b'experiment_hash:2\n')
+        hasher.update('{}\n{}\n'.format(config_hash, benchmark_hash).encode('utf8'))
+        for name in self.result_columns:
+            column = self.column(name)
+            column = np.ascontiguousarray(column, dtype=column.dtype.newbyteorder('<'))
+            hasher.update('{}:{}:{:d}\n'.format(name, column.dtype.str, len(column)).encode('utf8'))
+            hasher.update(column.data)
 
-        episode_timesteps = np.array(self['results']['episode_timesteps'])  # episode lengths
-        timesteps = np.cumsum(episode_timesteps)  # cumulative episode lengths as timesteps
+        return hasher.hexdigest(), benchmark_hash, config_hash
 
-        seconds = np.cumsum(self['results']['episode_end_times'])  # cumulative times in seconds
+    def episodes(self):
+        """
+        Returns: `EpisodeStore` object containing the episode results (arrays are not copied if already typed)
 
-        return dict(
-            rewards=rewards,
-            episode_timesteps=episode_timesteps,
-            timesteps=timesteps,
-            seconds=seconds,
-            episodes=np.arange(len(rewards))
-        )
+        """
+        return EpisodeStore.from_results(self['results'])
+
+    def column(self, name):
+        """
+        Get a typed column of the episode results. Columns are computed on first access and cached.
+
+        Args:
+            name: one of `rewards`, `episode_timesteps` (episode lengths), `episode_seconds` (episode durations),
+                `timesteps` (cumulative episode lengths), `seconds` (cumulative durations) or `episodes` (episode
+                numbers)
+
+        Returns: read-only np.array
+
+        """
+        column = self.columns.get(name)
+        if column is None:
+            if name in self.result_columns:
+                episodes = self.episodes()
+                columns = zip(self.result_columns, (episodes.rewards, episodes.timesteps, episodes.times))
+            elif name == 'timesteps':
+                columns = [(name, np.cumsum(self.column('episode_timesteps')))]
+            elif name == 'seconds':
+                columns = [(name, np.cumsum(self.column('episode_seconds')))]
+            elif name == 'episodes':
+                columns = [(name, np.arange(len(self.column('rewards'))))]
+            else:
+                raise KeyError("No such column: {}".format(name))
+
+            for column_name, values in columns:
+                # Read-only view, so the cache can't be changed and result arrays stay writable
+                values = values.view()
+                values.flags.writeable = False
+                self.columns[column_name] = values
+
+            column = self.columns[name]
+
+        return column
+
+    def extended_results(self):
+        """
+        Returns: dict containing the `rewards`, `episode_timesteps`, `timesteps`, `seconds` and `episodes` columns
+
+        """
+        return dict((name, self.column(name))
+                    for name in ('rewards', 'episode_timesteps', 'timesteps', 'seconds', 'episodes'))
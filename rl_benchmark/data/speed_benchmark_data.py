@@ -0,0 +1,52 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from rl_benchmark.data.experiment_data import get_benchmark_hash
+from rl_benchmark.util import hash_object
+
+
+class SpeedBenchmarkData(dict):
+    """
+    Results of a throughput benchmark. Like `ExperimentData`, contains `config`, `metadata` and `results` keys, but
+    results contain throughput trials instead of learning curves.
+    """
+
+    def hash(self):
+        """
+        Calculate speed_hash, benchmark_hash, and config_hash. The benchmark_hash is the same as for learning
+        benchmarks on the same config, environment and RL library/backend version.
+
+        Returns: tuple of speed_hash, benchmark_hash, and config_hash
+
+        """
+        config = self['config']
+        config_hash = hash_object(config)
+
+        metadata = self['metadata']
+        benchmark_hash = get_benchmark_hash(config_hash, metadata)
+
+        # Speed hash identifies a specific speed benchmark run
+        speed_hash = hash_object([
+            config_hash,
+            benchmark_hash,
+            metadata.get('start_time'),
+            self['results']['trials']
+        ])
+
+        return speed_hash, benchmark_hash, config_hash
@@ -100,3 +100,42 @@ class BenchmarkDatabase(object):
 
         """
         raise NotImplementedError
+
+    def search_by_hardware(self, hardware_hash=None, cpu_model=None):
+        """
+        Search for experiments run on a machine class.
+
+        Args:
+            hardware_hash: `hardware_hash` of the hardware fingerprint stored in the experiment metadata
+            cpu_model: CPU model name
+
+        Returns: `BenchmarkData` object
+
+        """
+        raise NotImplementedError
+
+    def save_speed_benchmark(self, speed_data):
+        """
+        Save speed benchmark to database.
+
+        Args:
+            speed_data: `SpeedBenchmarkData` object
+
+        Returns: dict containing returned information on save status
+
+        """
+        raise NotImplementedError
+
+    def get_speed_benchmarks(self, config_hash=None, environment_name=None, rl_library=None):
+        """
+        Get speed benchmarks from database. All arguments are optional filters.
+
+        Args:
+            config_hash: config_hash of the benchmarked config
+            environment_name: environment name
+            rl_library: RL library
+
+        Returns: list of `SpeedBenchmarkData` objects, ordered by start time
+
+        """
+        raise NotImplementedError
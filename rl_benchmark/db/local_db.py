@@ -25,7 +25,24 @@ import sqlite3
 from distutils.dir_util import mkpath
 
 from rl_benchmark.db.db import BenchmarkDatabase
-from rl_benchmark.data import ExperimentData, BenchmarkData
+from rl_benchmark.data import ExperimentData, BenchmarkData, SpeedBenchmarkData
+from rl_benchmark.util import json_default
+
+# Columns added after the initial schema, as (name, type)
+added_columns = [
+    ('md_hardware_hash', 'text'),
+    ('md_cpu_model', 'text'),
+    ('md_cpu_count', 'integer'),
+    ('hash_version', 'integer')  # experiment hash version, NULL for version 1
+]
+
+speed_benchmarks_schema = ("speed_hash text, config_hash text, benchmark_hash text, md_agent text, "
+                           "md_environment_domain text, md_environment_name text, "
+                           "md_rl_library text, md_rl_library_version text, md_rl_backend text, "
+                           "md_rl_backend_version text, md_steps integer, md_warmup_steps integer, md_trials integer, "
+                           "md_hardware_hash text, start_time integer, end_time integer, "
+                           "metadata text, config text, results text")
+
 
 def result_to_experiment(result):
     """
@@ -118,6 +135,39 @@ class LocalDatabase(BenchmarkDatabase):
 
         return dict(config_hash=config_hash, metadata=json.loads(metadata_txt), config=json.loads(config_txt))
 
+    def find_experiment_hash(self, experiment_data):
+        """
+        Look up an experiment by its hash. If the database contains experiments of the same benchmark stored with an
+        older experiment hash version, the experiment is also looked up by the hashes of these versions.
+
+        Args:
+            experiment_data: `ExperimentData` object
+
+        Returns: hash the experiment is stored with, or None if it is not in the database
+
+        """
+        experiment_hash, benchmark_hash, config_hash = experiment_data.hash()
+
+        conn, cursor = self.connect_db()
+
+        cursor.execute("SELECT experiment_hash FROM experiments WHERE experiment_hash=?", (experiment_hash,))
+        found = cursor.fetchone()
+
+        if not found:
+            cursor.execute("SELECT DISTINCT COALESCE(hash_version, 1) FROM experiments "
+                           "WHERE benchmark_hash=? AND COALESCE(hash_version, 1)<?",
+                           (benchmark_hash, experiment_data.hash_version))
+            for version, in cursor.fetchall():
+                cursor.execute("SELECT experiment_hash FROM experiments WHERE experiment_hash=?",
+                               (experiment_data.hash(version)[0],))
+                found = cursor.fetchone()
+                if found:
+                    break
+
+        self.close_db()
+
+        return found[0] if found else None
+
     def save_benchmark(self, benchmark_data):
         if not isinstance(benchmark_data, BenchmarkData):
             benchmark_data = BenchmarkData(benchmark_data)
@@ -135,10 +185,11 @@ class LocalDatabase(BenchmarkDatabase):
             benchmark_hashes.append(benchmark_hash)
 
             # check if experiment already exists
-            if (self.get_experiment(experiment_hash)):
-                logging.warning("Experiment with hash {} already exists, ignoring.".format(experiment_hash))
+            existing_hash = self.find_experiment_hash(experiment_data)
+            if existing_hash:
+                logging.warning("Experiment with hash {} already exists, ignoring.".format(existing_hash))
                 duplicate_experiments.append(i)
-                duplicate_experiment_hashes.append(experiment_hash)
+                duplicate_experiment_hashes.append(existing_hash)
                 continue
 
             added_experiments.append(i)
@@ -147,6 +198,7 @@ class LocalDatabase(BenchmarkDatabase):
             config = experiment_data.get('config', dict())
             metadata = experiment_data.get('metadata', dict())
             results = experiment_data.get('results', dict())
+            hardware = metadata.get('hardware') or dict()
 
             vars.append((
                 experiment_hash,
@@ -164,9 +216,13 @@ class LocalDatabase(BenchmarkDatabase):
                 metadata.get('rl_backend_version'),
                 metadata.get('start_time', 0),
                 metadata.get('end_time', 0),
-                json.dumps(metadata, sort_keys=True),
+                hardware.get('hardware_hash'),
+                hardware.get('cpu_model'),
+                hardware.get('cpu_count'),
+                experiment_data.hash_version,
+                json.dumps(metadata, sort_keys=True, default=json_default),
                 json.dumps(config, sort_keys=True),
-                json.dumps(results, sort_keys=True)
+                json.dumps(results, sort_keys=True, default=json_default)
             ))
 
         if len(vars) > 0:
@@ -176,8 +232,9 @@ class LocalDatabase(BenchmarkDatabase):
                                "md_agent, md_max_episodes, md_max_timesteps, md_max_episode_timesteps, "
                                "md_environment_domain, md_environment_name, "
                                "md_rl_library, md_rl_library_version, md_rl_backend, md_rl_backend_version, "
-                               "start_time, end_time, metadata, config, results) VALUES "
-                               "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", vars)
+                               "start_time, end_time, md_hardware_hash, md_cpu_model, md_cpu_count, hash_version, "
+                               "metadata, config, results) VALUES "
+                               "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", vars)
             conn.commit()
 
             self.close_db()
@@ -192,9 +249,106 @@ class LocalDatabase(BenchmarkDatabase):
             duplicate_experiment_hashes=duplicate_experiment_hashes
         )
 
+    def save_speed_benchmark(self, speed_data):
+        if not isinstance(speed_data, SpeedBenchmarkData):
+            speed_data = SpeedBenchmarkData(speed_data)
+
+        speed_hash, benchmark_hash, config_hash = speed_data.hash()
+
+        conn, cursor = self.connect_db()
+
+        cursor.execute("SELECT speed_hash FROM speed_benchmarks WHERE speed_hash=?", (speed_hash,))
+        if cursor.fetchone():
+            self.close_db()
+            logging.warning("Speed benchmark {} already exists in database.".format(speed_hash))
+            return dict(speed_hash=speed_hash, benchmark_hash=benchmark_hash, added=False)
+
+        config = speed_data.get('config', dict())
+        metadata = speed_data.get('metadata', dict())
+        results = speed_data.get('results', dict())
+        hardware = metadata.get('hardware') or dict()
+
+        cursor.execute("INSERT INTO speed_benchmarks (speed_hash, config_hash, benchmark_hash, md_agent, "
+                       "md_environment_domain, md_environment_name, "
+                       "md_rl_library, md_rl_library_version, md_rl_backend, md_rl_backend_version, "
+                       "md_steps, md_warmup_steps, md_trials, md_hardware_hash, start_time, end_time, "
+                       "metadata, config, results) VALUES "
+                       "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+                            speed_hash,
+                            config_hash,
+                            benchmark_hash,
+                            metadata.get('agent'),
+                            metadata.get('environment_domain'),
+                            metadata.get('environment_name'),
+                            metadata.get('rl_library'),
+                            metadata.get('rl_library_version'),
+                            metadata.get('rl_backend'),
+                            metadata.get('rl_backend_version'),
+                            metadata.get('steps'),
+                            metadata.get('warmup_steps'),
+                            metadata.get('trials'),
+                            hardware.get('hardware_hash'),
+                            metadata.get('start_time', 0),
+                            metadata.get('end_time', 0),
+                            json.dumps(metadata, sort_keys=True, default=json_default),
+                            json.dumps(config, sort_keys=True),
+                            json.dumps(results, sort_keys=True, default=json_default)
+                       ))
+        conn.commit()
+
+        self.close_db()
+
+        return dict(speed_hash=speed_hash, benchmark_hash=benchmark_hash, added=True)
+
+    def get_speed_benchmarks(self, config_hash=None, environment_name=None, rl_library=None):
+        conditions = list()
+        vars = list()
+        for column, value in (('config_hash', config_hash),
+                              ('md_environment_name', environment_name),
+                              ('md_rl_library', rl_library)):
+            if value is not None:
+                conditions.append("{}=?".format(column))
+                vars.append(value)
+
+        query = "SELECT metadata, config, results FROM speed_benchmarks"
+        if conditions:
+            query += " WHERE {}".format(" AND ".join(conditions))
+        query += " ORDER BY start_time"
+
+        conn, cursor = self.connect_db()
+        cursor.execute(query, tuple(vars))
+        results = cursor.fetchall()
+
+        self.close_db()
+
+        return [SpeedBenchmarkData(dict(
+            metadata=json.loads(metadata_txt),
+            config=json.loads(config_txt),
+            results=json.loads(results_txt)
+        )) for metadata_txt, config_txt, results_txt in results]
+
     def search_by_config(self, config):
         pass
 
+    def search_by_hardware(self, hardware_hash=None, cpu_model=None):
+        if hardware_hash:
+            vars = (hardware_hash,)
+            condition = "md_hardware_hash=?"
+        elif cpu_model:
+            vars = (cpu_model,)
+            condition = "md_cpu_model=?"
+        else:
+            raise ValueError("Please state a hardware hash or CPU model to search for.")
+
+        conn, cursor = self.connect_db()
+        cursor.execute("SELECT experiment_hash, benchmark_hash, config_hash, metadata, config, results "
+                       " FROM experiments WHERE {}".format(condition), vars)
+        results = cursor.fetchall()
+
+        self.close_db()
+
+        return BenchmarkData([result_to_experiment(result) for result in results])
+
     def connect_db(self):
         if not self.db_conn or not self.db_cursor:
             self.db_conn = sqlite3.connect(self.path)
@@ -211,7 +365,7 @@ class LocalDatabase(BenchmarkDatabase):
 
     def init_db(self):
         if os.path.exists(self.path):
-            return False
+            return self.migrate_db()
 
         logging.info("Creating local database at {}".format(self.path))
 
@@ -226,7 +380,9 @@ class LocalDatabase(BenchmarkDatabase):
                        "md_max_episode_timesteps integer, md_environment_domain text, "
                        "md_environment_name text, md_rl_library text, md_rl_library_version text, "
                        "md_rl_backend text, md_rl_backend_version text, start_time integer, end_time integer, "
+                       "md_hardware_hash text, md_cpu_model text, md_cpu_count integer, hash_version integer, "
                        "metadata text, config text, results text)")
+        cursor.execute("CREATE TABLE speed_benchmarks ({})".format(speed_benchmarks_schema))
 
         conn.commit()
 
@@ -234,4 +390,33 @@ class LocalDatabase(BenchmarkDatabase):
 
         self.close_db()
 
+    def migrate_db(self):
+        """
+        Add tables and columns introduced after the database was created.
+
+        Returns: boolean indicating whether the schema was changed
+
+        """
+        conn, cursor = self.connect_db()
+
+        cursor.execute("PRAGMA table_info(experiments)")
+        columns = set(row[1] for row in cursor.fetchall())
+
+        migrated = False
+        for column, column_type in added_columns:
+            if column not in columns:
+                logging.info("Adding column {} to local database".format(column))
+                cursor.execute("ALTER TABLE experiments ADD COLUMN {} {}".format(column, column_type))
+                migrated = True
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='speed_benchmarks'")
+        if not cursor.fetchone():
+            logging.info("Adding table speed_benchmarks to local database")
+            cursor.execute("CREATE TABLE speed_benchmarks ({})".format(speed_benchmarks_schema))
+            migrated = True
+
+        conn.commit()
+
+        self.close_db()
 
+        return migrated
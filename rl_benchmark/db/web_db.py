@@ -25,6 +25,7 @@ from six.moves import urllib
 
 from rl_benchmark.db import Cache
 from rl_benchmark.db.db import BenchmarkDatabase
+from rl_benchmark.util import json_default
 
 API_VERSION = 'api/v1'
 
@@ -71,6 +72,8 @@ class WebDatabase(BenchmarkDatabase):
         return result.json()
 
     def save_benchmark(self, benchmark_data):
+        # Episode results may be numpy arrays, which `requests` can't serialize
+        benchmark_data = json.loads(json.dumps(benchmark_data, default=json_default))
         result = self.call_api('/experiment', method='post', json=benchmark_data)
         if result.status_code >= 400:
             return False
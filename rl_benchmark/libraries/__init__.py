@@ -17,12 +17,27 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
-from rl_benchmark.libraries.rlgraph import RLgraphBenchmarkRunner
-from rl_benchmark.libraries.tensorforce import TensorForceBenchmarkRunner
+from rl_benchmark.libraries.registry import LibraryRegistry
 
-__all__ = ['RLgraphBenchmarkRunner', 'TensorForceBenchmarkRunner']
+__all__ = ['LibraryRegistry', 'NullBenchmarkRunner', 'RLgraphBenchmarkRunner', 'TensorForceBenchmarkRunner',
+           'libraries']
 
-libraries = dict(
-    rlgraph=RLgraphBenchmarkRunner,
-    tensorforce=TensorForceBenchmarkRunner
+# Runner modules are imported on first lookup, see `LibraryRegistry`
+libraries = LibraryRegistry([
+    ('rlgraph', 'rl_benchmark.libraries.rlgraph:RLgraphBenchmarkRunner'),
+    ('tensorforce', 'rl_benchmark.libraries.tensorforce:TensorForceBenchmarkRunner'),
+    ('null', 'rl_benchmark.libraries.null:NullBenchmarkRunner')
+])
+
+runner_class_names = dict(
+    NullBenchmarkRunner='null',
+    RLgraphBenchmarkRunner='rlgraph',
+    TensorForceBenchmarkRunner='tensorforce'
 )
+
+
+def __getattr__(name):
+    # Import runner classes only when accessed
+    if name in runner_class_names:
+        return libraries[runner_class_names[name]]
+    raise AttributeError("module {} has no attribute {}".format(__name__, name))
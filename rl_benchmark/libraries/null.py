@@ -0,0 +1,244 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Null library: a synthetic environment and a random agent that do (almost) no work, to measure the overhead of the
+benchmark harness itself (wrappers, callbacks, progress bars, history saving).
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import itertools
+import logging
+import sys
+import time
+
+import numpy as np
+
+from six.moves import xrange
+
+from rl_benchmark import __version__ as rl_benchmark_version
+from rl_benchmark.benchmark.runner.benchmark_runner import BenchmarkRunner
+from rl_benchmark.benchmark.runner.speed_benchmark import SpeedAgent
+from rl_benchmark.benchmark.wrapper.environment_wrapper import StopExperiment
+from rl_benchmark.benchmark.wrapper.results_wrapper import ResultsWrapper
+
+
+class NullEnvironment(object):
+    """
+    Synthetic environment returning the same (zero) observation on every step and a reward of 1 per step. Episodes
+    end after `episode_length` steps.
+    """
+    def __init__(self, observation_shape=(4,), episode_length=200, num_actions=2, dtype='float32'):
+        self.observation = np.zeros(observation_shape, dtype=dtype)
+        self.episode_length = episode_length
+        self.num_actions = num_actions
+        self.timestep = 0
+
+    def reset(self):
+        self.timestep = 0
+        return self.observation
+
+    def step(self, action):
+        self.timestep += 1
+        return self.observation, 1.0, self.timestep >= self.episode_length, None
+
+    def seed(self, seed):
+        pass
+
+    def close(self):
+        pass
+
+
+class NullAgent(object):
+    """
+    Agent acting randomly without looking at states, and not learning. Actions are drawn from NumPy's random number
+    generator in advance (so they follow the experiment seed) and cycled through.
+    """
+    def __init__(self, num_actions, buffer_size=4096):
+        self.actions = itertools.cycle(np.random.randint(num_actions, size=buffer_size).tolist())
+
+    def act(self, state):
+        return next(self.actions)
+
+    def observe(self, reward, terminal):
+        pass
+
+
+class NullEnvironmentWrapper(ResultsWrapper):
+    """
+    Records episode results and calls episode end callbacks, like the wrappers of the other libraries. If a callback
+    returns False or the deadline has passed, `StopExperiment` is raised.
+    """
+    def step(self, action):
+        state, reward, terminal, info = self.timed_step(self.env.step, action)
+
+        self.timestep += 1
+        self.episode_timestep += 1
+        self.episode_reward += reward
+
+        if terminal and not self.finish_episode():
+            raise StopExperiment()
+
+        # Same as `deadline_passed()`, inlined as this is the only per-step check
+        if self.deadline is not None and self.timer.last_step_end_time >= self.deadline:
+            raise StopExperiment()
+
+        return state, reward, terminal, info
+
+
+class NullSpeedAgent(SpeedAgent):
+    """
+    Drives the null agent for speed benchmarks.
+    """
+    def __init__(self, agent, environment):
+        self.agent = agent
+        self.environment = environment
+
+    def reset(self):
+        return self.environment.reset()
+
+    def act(self, state, learn=True):
+        return self.agent.act(state)
+
+    def step(self, action):
+        state, reward, terminal, _ = self.environment.step(action)
+        return state, reward, terminal
+
+    def observe(self, reward, terminal, next_state):
+        self.agent.observe(reward, terminal)
+
+
+class NullBenchmarkRunner(BenchmarkRunner):
+    """
+    Runs the null agent on the null environment. The environment is configured by the `null_environment` config item
+    (keyword arguments of `NullEnvironment`), the environment name (e.g. gym ID) is only used as a label.
+
+    Experiment results contain an `overhead` dict: the run is repeated as a bare act/step loop without the harness,
+    and the difference is reported as the harness overhead per step and per episode.
+    """
+    rl_library = 'null'
+    rl_library_version = rl_benchmark_version
+    rl_backend = 'none'
+    rl_backend_version = rl_benchmark_version
+
+    def make_environment(self):
+        (environment_class, environment_args, environment_kwargs) = self.environment_callback
+
+        if isinstance(environment_class, str):
+            return NullEnvironment(**(self.config.get('null_environment') or dict()))
+
+        return environment_class(*environment_args, **environment_kwargs)
+
+    def create_speed_agent(self, environment, config):
+        return NullSpeedAgent(NullAgent(environment.num_actions), environment)
+
+    def run_experiment(self, environment, experiment_num=0):
+        agent = NullAgent(environment.num_actions)
+
+        environment = NullEnvironmentWrapper(environment)
+        environment.add_episode_end_callback(self.episode_finished, environment, runner_id=1)
+        environment.deadline = self.deadline
+
+        # Primary limit, other limits are checked in `episode_finished` or by the wrapper
+        limits = self.run_limits()
+        max_timesteps = int(limits['max_timesteps'] or sys.maxsize)
+        max_episodes = limits['max_episodes']
+
+        start_time = time.perf_counter()
+        try:
+            run_loop(agent, environment, max_timesteps, max_episodes)
+        except StopExperiment:
+            logging.info("Stopping experiment after {:d} episodes.".format(len(environment.episode_rewards)))
+        run_time = time.perf_counter() - start_time
+
+        results = environment.get_results()
+        results['overhead'] = self.measure_overhead(agent, environment, run_time)
+
+        return results
+
+    def measure_overhead(self, agent, environment, run_time):
+        """
+        Time the steps of a finished run as a bare loop and compare.
+
+        Args:
+            agent: `NullAgent` object
+            environment: `NullEnvironmentWrapper` object of the finished run
+            run_time: wall time of the run
+
+        Returns: dict containing step and episode counts, run and bare loop times and throughput, and the harness
+            overhead per step (wrappers and loop) and per episode (episode end callbacks: statistics, progress bar,
+            history)
+
+        """
+        timesteps = environment.timestep
+        episodes = len(environment.episode_rewards)
+
+        start_time = time.perf_counter()
+        run_loop(agent, environment.env, timesteps, None)
+        baseline_time = time.perf_counter() - start_time
+
+        callback_time = environment.timer.callback_time
+
+        overhead = dict(
+            timesteps=timesteps,
+            episodes=episodes,
+            run_time=run_time,
+            baseline_time=baseline_time,
+            steps_per_second=timesteps / run_time if run_time > 0 else float('nan'),
+            baseline_steps_per_second=timesteps / baseline_time if baseline_time > 0 else float('nan'),
+            step_overhead=(run_time - baseline_time - callback_time) / timesteps if timesteps else float('nan'),
+            episode_overhead=callback_time / episodes if episodes else float('nan')
+        )
+
+        logging.info("Harness overhead: {:.0f} ns per step, {:.1f} us per episode ({:.0f} steps/s, bare loop "
+                     "{:.0f} steps/s)".format(overhead['step_overhead'] * 1e9, overhead['episode_overhead'] * 1e6,
+                                              overhead['steps_per_second'], overhead['baseline_steps_per_second']))
+
+        return overhead
+
+
+def run_loop(agent, environment, max_timesteps, max_episodes=None):
+    """
+    Act and step until `max_timesteps` steps or `max_episodes` episodes have run.
+
+    Args:
+        agent: `NullAgent` object
+        environment: environment (or wrapper) with `reset()` and `step()`
+        max_timesteps: maximum number of steps
+        max_episodes: maximum number of episodes, or None
+
+    Returns: number of finished episodes
+
+    """
+    act = agent.act
+    observe = agent.observe
+    step = environment.step
+
+    episodes = 0
+    state = environment.reset()
+    for _ in xrange(max_timesteps):
+        state, reward, terminal, _ = step(act(state))
+        observe(reward, terminal)
+
+        if terminal:
+            episodes += 1
+            if max_episodes and episodes >= max_episodes:
+                break
+            state = environment.reset()
+
+    return episodes
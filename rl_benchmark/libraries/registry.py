@@ -0,0 +1,158 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Library registry class.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import importlib
+import logging
+
+from collections import OrderedDict
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+
+ENTRY_POINT_GROUP = 'rl_benchmark.libraries'
+
+
+def load_object(path):
+    """
+    Import object from path.
+
+    Args:
+        path: string of the form `package.module:attribute`
+
+    Returns: object
+
+    """
+    module_name, _, attribute = path.partition(':')
+    if not attribute:
+        raise ValueError("Expected `module:attribute`, got {}".format(path))
+
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute)
+
+
+def iter_entry_points(group):
+    """
+    Iterate over installed entry points of a group.
+
+    Args:
+        group: entry point group
+
+    Returns: generator of (name, entry point) tuples. Entry points have a `load()` method.
+
+    """
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        try:
+            import pkg_resources
+        except ImportError:
+            return
+        for entry_point in pkg_resources.iter_entry_points(group):
+            yield entry_point.name, entry_point
+        return
+
+    installed_entry_points = entry_points()
+    if hasattr(installed_entry_points, 'select'):
+        group_entry_points = installed_entry_points.select(group=group)
+    else:
+        group_entry_points = installed_entry_points.get(group, [])
+
+    for entry_point in group_entry_points:
+        yield entry_point.name, entry_point
+
+
+class LibraryRegistry(Mapping):
+    """
+    Maps RL library names to `BenchmarkRunner` classes. Runner modules (and with them the RL library and its backend)
+    are only imported when a library is looked up, so listing or checking library names is cheap and does not fail
+    if a library is not installed.
+
+    Third-party packages can register runners via the `rl_benchmark.libraries` entry point group, e.g. in setup.py:
+    `entry_points={'rl_benchmark.libraries': ['mylib = mypackage.runner:MyBenchmarkRunner']}`.
+    """
+    def __init__(self, libraries=None):
+        self.library_paths = OrderedDict(libraries or dict())
+        self.entry_points = OrderedDict()
+        self.runner_classes = dict()
+        self.entry_points_loaded = False
+
+    def register(self, name, runner_class):
+        """
+        Register library.
+
+        Args:
+            name: library name
+            runner_class: `BenchmarkRunner` subclass, or path of the form `package.module:RunnerClass`
+
+        Returns:
+
+        """
+        self.runner_classes.pop(name, None)
+        if isinstance(runner_class, str):
+            self.library_paths[name] = runner_class
+        else:
+            self.library_paths[name] = None
+            self.runner_classes[name] = runner_class
+
+    def load_entry_points(self):
+        if self.entry_points_loaded:
+            return
+
+        self.entry_points_loaded = True
+        for name, entry_point in iter_entry_points(ENTRY_POINT_GROUP):
+            if name in self.library_paths:
+                logging.warning("Ignoring entry point for library {}, which is already registered.".format(name))
+                continue
+            self.entry_points[name] = entry_point
+
+    def names(self):
+        self.load_entry_points()
+        return list(self.library_paths.keys()) + list(self.entry_points.keys())
+
+    def __contains__(self, name):
+        # Don't import the library, as `Mapping.__contains__` would
+        return name in self.names()
+
+    def __iter__(self):
+        return iter(self.names())
+
+    def __len__(self):
+        return len(self.names())
+
+    def __getitem__(self, name):
+        if name in self.runner_classes:
+            return self.runner_classes[name]
+
+        if name in self.library_paths:
+            runner_class = load_object(self.library_paths[name])
+        else:
+            self.load_entry_points()
+            if name not in self.entry_points:
+                raise KeyError(name)
+            runner_class = self.entry_points[name].load()
+
+        self.runner_classes[name] = runner_class
+        return runner_class
@@ -22,7 +22,7 @@ from __future__ import print_function
 from __future__ import division
 
 import logging
-import time
+import sys
 
 from tensorflow import __version__ as tensorflow_version
 
@@ -30,7 +30,11 @@ from rlgraph import __version__ as rlgraph_version
 from copy import copy
 
 from rl_benchmark.benchmark.runner.benchmark_runner import BenchmarkRunner
+from rl_benchmark.benchmark.runner.speed_benchmark import SpeedAgent
+from rl_benchmark.benchmark.wrapper.environment_wrapper import StopExperiment
 from rl_benchmark.benchmark.wrapper.results_wrapper import ResultsWrapper
+from rl_benchmark.benchmark.wrapper.vectorized_results_wrapper import VectorizedResultsWrapper
+from rl_benchmark.libraries import tensorflow_backend
 
 from rlgraph.agents import Agent
 from rlgraph.environments import OpenAIGymEnv
@@ -40,26 +44,59 @@ from rlgraph.execution.single_threaded_worker import SingleThreadedWorker
 class RLgraphEnvironmentWrapper(ResultsWrapper):
     """
     RLgraph's environment don't support end-of-episode callbacks by default, so we introduce them by wrapping
-    the environment objects.
+    the environment objects. If a callback returns False or the deadline has passed, `StopExperiment` is raised to
+    stop the worker.
     """
     def step(self, *args, **kwargs):
-        state, reward, terminal, info = self.env.step(*args, **kwargs)
+        state, reward, terminal, info = self.timed_step(self.env.step, *args, **kwargs)
 
+        self.timestep += 1
         self.episode_timestep += 1
         self.episode_reward += reward
 
-        if terminal:
-            time_passed = time.monotonic() - self.episode_start_time
+        if terminal and not self.finish_episode():
+            raise StopExperiment()
 
-            self.episode_timesteps.append(self.episode_timestep)
-            self.episode_rewards.append(self.episode_reward)
-            self.episode_times.append(time_passed)
-
-            self.call_episode_end_callbacks()
+        if self.deadline_passed():
+            raise StopExperiment()
 
         return state, reward, terminal, info
 
 
+class RLgraphSpeedAgent(SpeedAgent):
+    """
+    Drives an RLgraph agent step by step for speed benchmarks. Updates follow the agent's update spec, as
+    implemented by the worker.
+    """
+    def __init__(self, agent, environment):
+        self.agent = agent
+        self.environment = environment
+        self.worker = SingleThreadedWorker(agent=agent, environment=environment)
+
+        self.preprocessed_state = None
+        self.action = None
+
+    def reset(self):
+        return self.environment.reset()
+
+    def act(self, state, learn=True):
+        self.action, self.preprocessed_state = self.agent.get_action(
+            states=state, use_exploration=learn, extra_returns='preprocessed_states')
+        return self.action
+
+    def step(self, action):
+        state, reward, terminal, _ = self.environment.step(action)
+        return state, reward, terminal
+
+    def observe(self, reward, terminal, next_state):
+        self.agent.observe(preprocessed_states=self.preprocessed_state, actions=self.action, internals=[],
+                           rewards=reward, next_states=next_state, terminals=terminal)
+        self.worker.update_if_necessary()
+
+    def close(self):
+        self.agent.terminate()
+
+
 class RLgraphBenchmarkRunner(BenchmarkRunner):
     rl_library = 'rlgraph'
     rl_library_version = rlgraph_version
@@ -71,6 +108,9 @@ class RLgraphBenchmarkRunner(BenchmarkRunner):
 
         self.environment_callback = None
 
+        # Sessions of agents created since the last backend reset, see `verify_backend_reset()`
+        self.agent_sessions = list()
+
         # This file is WIP
 
     def make_environment(self):
@@ -92,42 +132,128 @@ class RLgraphBenchmarkRunner(BenchmarkRunner):
 
         return environment
 
-    def run_experiment(self, environment, experiment_num=0):
-        environment = RLgraphEnvironmentWrapper(environment)
-        environment.add_episode_end_callback(self.episode_finished, environment, runner_id=1)
+    @classmethod
+    def initialize_backend(cls):
+        tensorflow_backend.initialize_backend()
 
-        config = copy(self.config)
+    def reset_backend(self):
+        tensorflow_backend.reset_backend()
 
-        max_episodes = config.pop('max_episodes', None)
-        max_timesteps = config.pop('max_timesteps', None)
-        max_episode_timesteps = config.pop('max_episode_timesteps')
+    def verify_backend_reset(self):
+        sessions, self.agent_sessions = self.agent_sessions, list()
+        return tensorflow_backend.verify_backend_reset(sessions)
+
+    def seed_backend(self, seed):
+        tensorflow_backend.seed_backend(seed)
 
+    def limit_agent_threads(self, config):
+        """
+        Limit the agent's session thread pools to the CPU budget, unless the config sets them.
+
+        Args:
+            config: agent config
+
+        Returns: agent config
+
+        """
+        if not self.cpus_per_experiment:
+            return config
+
+        execution_spec = dict(config.get('execution_spec') or dict())
+        execution_spec['session_config'] = dict(tensorflow_backend.session_config(self.cpus_per_experiment),
+                                                **(execution_spec.get('session_config') or dict()))
+        config['execution_spec'] = execution_spec
+        return config
+
+    def create_speed_agent(self, environment, config):
         agent = Agent.from_spec(
-            spec=config,
+            spec=self.limit_agent_threads(copy(config)),
             state_space=environment.state_space,
             action_space=environment.action_space,
         )
 
-        if experiment_num == 0 and self.load_model_file:
-            logging.info("Loading model data from file: {}".format(self.load_model))
-            agent.load_model(self.load_model_file)
-
-        runner = SingleThreadedWorker(
-            agent=agent,
-            environment=environment
-        )
-
-        environment.reset()
-        agent.reset_buffers()
+        return RLgraphSpeedAgent(agent, environment)
 
-        if max_timesteps:
-            runner.execute_timesteps(num_timesteps=max_timesteps, max_timesteps_per_episode=max_episode_timesteps)
-        else:
-            runner.execute_episodes(num_episodes=max_episodes, max_timesteps_per_episode=max_episode_timesteps)
+    def run_experiment(self, environment, experiment_num=0):
+        config = copy(self.config)
 
-        return dict(
-            initial_reset_time=0,
-            episode_rewards=runner.episode_rewards,
-            episode_timesteps=runner.episode_steps,
-            episode_end_times=runner.episode_durations
-        )
+        # The worker enforces the primary limit, other limits are checked in `episode_finished` or by the wrapper
+        for key in ('max_episodes', 'max_timesteps', 'max_seconds'):
+            config.pop(key, None)
+        limits = self.run_limits()
+        max_episode_timesteps = config.pop('max_episode_timesteps')
+        num_environments = config.pop('num_environments', 1)
+        config.pop('stop_criterion', None)
+
+        # Environments created here, the first one is closed by `execute_experiment()`
+        extra_environments = [self.create_environment() for _ in range(num_environments - 1)]
+        try:
+            if num_environments > 1:
+                # The worker steps all environments and passes the batched states to the agent
+                environment = VectorizedResultsWrapper([environment] + extra_environments)
+            else:
+                environment = RLgraphEnvironmentWrapper(environment)
+
+            environment.add_episode_end_callback(self.episode_finished, environment, runner_id=1)
+            environment.deadline = self.deadline
+
+            agent = Agent.from_spec(
+                spec=self.limit_agent_threads(config),
+                state_space=environment.state_space,
+                action_space=environment.action_space,
+            )
+            self.agent_sessions.append(agent.graph_executor.session)
+
+            if experiment_num == 0 and self.load_model_file:
+                logging.info("Loading model data from file: {}".format(self.load_model))
+                agent.load_model(self.load_model_file)
+
+            if num_environments > 1:
+                sub_environments = iter(environment.sub_environments())
+                runner = SingleThreadedWorker(
+                    env_spec=lambda: next(sub_environments),
+                    agent=agent,
+                    num_environments=num_environments
+                )
+            else:
+                runner = SingleThreadedWorker(
+                    agent=agent,
+                    environment=environment
+                )
+
+            environment.reset()
+            agent.reset_buffers()
+
+            try:
+                if limits['max_timesteps']:
+                    runner.execute_timesteps(num_timesteps=limits['max_timesteps'],
+                                             max_timesteps_per_episode=max_episode_timesteps)
+                elif limits['max_episodes']:
+                    runner.execute_episodes(num_episodes=limits['max_episodes'],
+                                            max_timesteps_per_episode=max_episode_timesteps)
+                else:
+                    # Only limited by time
+                    runner.execute_timesteps(num_timesteps=sys.maxsize, max_timesteps_per_episode=max_episode_timesteps)
+            except StopExperiment:
+                logging.info("Stopping experiment after {:d} episodes.".format(len(environment.episode_rewards)))
+                # The worker was interrupted, so its statistics are incomplete
+                return environment.get_results()
+            finally:
+                # Release graph and session, so the backend can be reset for the next experiment
+                agent.terminate()
+
+            if num_environments > 1:
+                # Episode results of all sub-environments are recorded by the wrapper
+                return environment.get_results()
+
+            results = dict(
+                episode_rewards=runner.episode_rewards,
+                episode_timesteps=runner.episode_steps,
+                episode_end_times=runner.episode_durations
+            )
+            results.update(environment.get_timing_results())
+
+            return results
+        finally:
+            for extra_environment in extra_environments:
+                extra_environment.close()
@@ -0,0 +1,103 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+TensorFlow backend state handling, shared by the TensorFlow based library runners.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import tensorflow as tf
+
+from rl_benchmark.util import backend_threads
+
+
+def initialize_backend():
+    """
+    Initialize the TensorFlow runtime (devices, thread pools) by opening a session on an empty graph.
+
+    Returns:
+
+    """
+    with tf.Session(graph=tf.Graph()):
+        pass
+
+
+def reset_backend():
+    """
+    Replace the default graph, dropping all operations and variables of previous agents.
+
+    Returns:
+
+    """
+    tf.reset_default_graph()
+
+
+def session_closed(session):
+    """
+    Args:
+        session: `tf.Session` or monitored session of an agent
+
+    Returns: Boolean indicating whether the session was closed
+
+    """
+    if isinstance(session, tf.Session):
+        return session._closed
+    # Monitored sessions drop the wrapped session when closed
+    return session._tf_sess() is None
+
+
+def verify_backend_reset(sessions=()):
+    """
+    Args:
+        sessions: sessions of previous agents
+
+    Returns: Boolean indicating whether all sessions of previous agents were closed and the default graph is empty
+
+    """
+    return all(session_closed(session) for session in sessions) and \
+        len(tf.get_default_graph().get_operations()) == 0
+
+
+def seed_backend(seed):
+    """
+    Set the graph-level random seed of the default graph.
+
+    Args:
+        seed: integer seed
+
+    Returns:
+
+    """
+    tf.set_random_seed(seed)
+
+
+def session_config(cpus):
+    """
+    Session thread pool settings for a CPU budget.
+
+    Args:
+        cpus: number of CPUs
+
+    Returns: dict of `tf.ConfigProto` fields
+
+    """
+    threads = backend_threads(cpus)
+    return dict(
+        intra_op_parallelism_threads=threads['intra_op_threads'],
+        inter_op_parallelism_threads=threads['inter_op_threads']
+    )
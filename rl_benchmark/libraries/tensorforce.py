@@ -25,6 +25,8 @@ import logging
 
 from copy import copy
 
+import tensorflow as tf
+
 from tensorforce.agents import Agent
 from tensorforce.execution import Runner
 from tensorforce.contrib.openai_gym import OpenAIGym
@@ -33,6 +35,70 @@ from tensorflow import __version__ as tensorflow_version
 from tensorforce import __version__ as tensorforce_version
 
 from rl_benchmark.benchmark.runner.benchmark_runner import BenchmarkRunner
+from rl_benchmark.benchmark.runner.speed_benchmark import SpeedAgent
+from rl_benchmark.benchmark.wrapper.environment_wrapper import StopExperiment
+from rl_benchmark.benchmark.wrapper.results_wrapper import ResultsWrapper
+from rl_benchmark.libraries import tensorflow_backend
+
+
+class TensorForceEnvironmentWrapper(ResultsWrapper):
+    """
+    Tensorforce's runner keeps track of episode results itself, so this wrapper only records step timing and
+    raises `StopExperiment` once the deadline has passed.
+    """
+    def reset(self):
+        # The runner resets the environment at the start of every episode (also after max_episode_timesteps)
+        if self.episode_timestep > 0:
+            self.timer.finish_episode()
+
+        return super(TensorForceEnvironmentWrapper, self).reset()
+
+    def execute(self, *args, **kwargs):
+        self.timestep += 1
+        self.episode_timestep += 1
+
+        result = self.timed_step(self.env.execute, *args, **kwargs)
+
+        if self.deadline_passed():
+            raise StopExperiment()
+
+        return result
+
+    def get_timing_results(self):
+        # Record timing of the last episode, which is not followed by a reset
+        if self.episode_timestep > 0:
+            self.timer.finish_episode()
+            self.episode_timestep = 0
+
+        return super(TensorForceEnvironmentWrapper, self).get_timing_results()
+
+
+class TensorForceSpeedAgent(SpeedAgent):
+    """
+    Drives a Tensorforce agent step by step for speed benchmarks. Tensorforce agents update from within `observe`.
+    """
+    def __init__(self, agent, environment):
+        self.agent = agent
+        self.environment = environment
+
+    def reset(self):
+        state = self.environment.reset()
+        self.agent.reset()
+        return state
+
+    def act(self, state, learn=True):
+        # Independent actions are not recorded for `observe`
+        return self.agent.act(states=state, deterministic=not learn, independent=not learn)
+
+    def step(self, action):
+        state, terminal, reward = self.environment.execute(action)
+        return state, reward, terminal
+
+    def observe(self, reward, terminal, next_state):
+        self.agent.observe(terminal=terminal, reward=reward)
+
+    def close(self):
+        self.agent.close()
 
 
 class TensorForceBenchmarkRunner(BenchmarkRunner):
@@ -46,6 +112,9 @@ class TensorForceBenchmarkRunner(BenchmarkRunner):
 
         self.environment_callback = None
 
+        # Sessions of agents created since the last backend reset, see `verify_backend_reset()`
+        self.agent_sessions = list()
+
     def make_environment(self):
         """
         Create environment.
@@ -65,23 +134,83 @@ class TensorForceBenchmarkRunner(BenchmarkRunner):
 
         return environment
 
+    @classmethod
+    def initialize_backend(cls):
+        tensorflow_backend.initialize_backend()
+
+    def reset_backend(self):
+        tensorflow_backend.reset_backend()
+
+    def verify_backend_reset(self):
+        sessions, self.agent_sessions = self.agent_sessions, list()
+        return tensorflow_backend.verify_backend_reset(sessions)
+
+    def seed_backend(self, seed):
+        tensorflow_backend.seed_backend(seed)
+
+    def limit_agent_threads(self, config):
+        """
+        Limit the agent's session thread pools to the CPU budget, unless the config sets a session config.
+
+        Args:
+            config: agent config
+
+        Returns: agent config
+
+        """
+        if not self.cpus_per_experiment:
+            return config
+
+        execution = dict(type='single', session_config=None, distributed_spec=None)
+        execution.update(config.get('execution') or dict())
+        if execution['session_config'] is None:
+            execution['session_config'] = tf.ConfigProto(**tensorflow_backend.session_config(self.cpus_per_experiment))
+        config['execution'] = execution
+        return config
+
+    def create_speed_agent(self, environment, config):
+        config = self.limit_agent_threads(copy(config))
+        network_spec = config.pop('network')
+
+        agent = Agent.from_spec(
+            spec=config,
+            kwargs=dict(
+                states=environment.states,
+                actions=environment.actions,
+                network=network_spec
+            )
+        )
+
+        return TensorForceSpeedAgent(agent, environment)
+
     def run_experiment(self, environment, experiment_num=0):
+        environment = TensorForceEnvironmentWrapper(environment)
+
         config = copy(self.config)
 
-        max_episodes = config.pop('max_episodes', None)
-        max_timesteps = config.pop('max_timesteps', None)
+        # The runner enforces the primary limit, other limits are checked in `episode_finished` or by the wrapper
+        for key in ('max_episodes', 'max_timesteps', 'max_seconds'):
+            config.pop(key, None)
+        limits = self.run_limits()
         max_episode_timesteps = config.pop('max_episode_timesteps')
 
+        config.pop('stop_criterion', None)  # checked in `episode_finished`
+
+        num_environments = config.pop('num_environments', 1)
+        if num_environments > 1:
+            logging.warning("The tensorforce runner only supports a single environment, ignoring num_environments.")
+
         network_spec = config.pop('network')
 
         agent = Agent.from_spec(
-            spec=config,
+            spec=self.limit_agent_threads(config),
             kwargs=dict(
                 states=environment.states,
                 actions=environment.actions,
                 network=network_spec
             )
         )
+        self.agent_sessions.append(agent.model.session)
 
         if experiment_num == 0 and self.history_data:
             logging.info("Attaching history data to runner")
@@ -105,12 +234,23 @@ class TensorForceBenchmarkRunner(BenchmarkRunner):
         environment.reset()
         agent.reset()
 
-        runner.run(episodes=max_episodes, timesteps=max_timesteps, max_episode_timesteps=max_episode_timesteps,
-                   episode_finished=self.episode_finished)
+        environment.deadline = self.deadline
 
-        return dict(
-            initial_reset_time=0,
+        try:
+            runner.run(episodes=limits['max_episodes'], timesteps=limits['max_timesteps'],
+                       max_episode_timesteps=max_episode_timesteps, episode_finished=self.episode_finished)
+        except StopExperiment:
+            # Results of the interrupted episode are not recorded by the runner
+            logging.info("Stopping experiment after {:d} episodes.".format(len(runner.episode_rewards)))
+        finally:
+            # Release graph and session, so the backend can be reset for the next experiment
+            agent.close()
+
+        results = dict(
             episode_rewards=runner.episode_rewards,
             episode_timesteps=runner.episode_timesteps,
             episode_end_times=runner.episode_times
         )
+        results.update(environment.get_timing_results())
+
+        return results
@@ -0,0 +1,30 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from rl_benchmark.microbenchmark.data_paths import benchmark_data_paths, make_benchmark_data
+from rl_benchmark.microbenchmark.environment_wrapper import benchmark_environment_wrapper
+from rl_benchmark.microbenchmark.timing import format_time, time_function
+
+__all__ = ['benchmark_data_paths', 'benchmark_environment_wrapper', 'format_time', 'make_benchmark_data',
+           'time_function']
+
+microbenchmarks = dict(
+    data_paths=benchmark_data_paths,
+    environment_wrapper=benchmark_environment_wrapper
+)
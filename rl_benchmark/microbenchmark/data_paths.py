@@ -0,0 +1,233 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Microbenchmarks of the data paths (hashing, result transforms, database, cache and plotting) on synthetic benchmarks.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import itertools
+import logging
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from six.moves import xrange
+
+from rl_benchmark.analyze.transform import rewards_by_episode, rewards_by_second, rewards_by_timestep, to_timeseries
+from rl_benchmark.data import BenchmarkData
+from rl_benchmark.db import Cache, LocalDatabase
+from rl_benchmark.microbenchmark.timing import time_function
+
+
+# (experiments, episodes per experiment), the largest size holds 10^6 episodes
+default_sizes = ((10, 1000), (100, 1000), (100, 10000))
+
+transform_targets = (
+    ('episodes', rewards_by_episode),
+    ('timesteps', rewards_by_timestep),
+    ('seconds', rewards_by_second)
+)
+
+
+def make_experiment(episodes, random_state):
+    """
+    Create synthetic experiment data. Episode lengths, rewards and durations are random, with rewards increasing over
+    the run like a learning curve.
+
+    Args:
+        episodes: number of episodes
+        random_state: `np.random.RandomState` object
+
+    Returns: experiment data dict (as returned by `BenchmarkRunner`)
+
+    """
+    progress = np.linspace(0.0, 1.0, episodes)
+    episode_timesteps = (10 + 190 * progress * random_state.uniform(0.5, 1.0, episodes)).astype(np.int32)
+    episode_rewards = episode_timesteps + random_state.normal(0.0, 1.0, episodes)
+    episode_end_times = episode_timesteps * random_state.uniform(1e-4, 2e-4, episodes)
+
+    return dict(
+        results=dict(
+            episode_rewards=episode_rewards,
+            episode_timesteps=episode_timesteps,
+            episode_end_times=episode_end_times
+        ),
+        metadata=dict(
+            agent='synthetic',
+            episodes=episodes,
+            timesteps=None,
+            seconds=None,
+            max_episode_timesteps=200,
+            environment_domain='synthetic',
+            environment_name='Synthetic-v0',
+            rl_library='null',
+            rl_library_version='0',
+            rl_backend='none',
+            rl_backend_version='0',
+            start_time=0,
+            end_time=int(episode_end_times.sum()),
+            hardware=dict(hardware_hash='synthetic', cpu_model='synthetic', cpu_count=1)
+        ),
+        config=dict(
+            type='synthetic',
+            max_episodes=episodes,
+            network=[dict(type='dense', size=64), dict(type='dense', size=64)]
+        )
+    )
+
+
+def make_benchmark_data(experiments, episodes, seed=0):
+    """
+    Create a synthetic benchmark. All experiments share config and metadata, so they have the same benchmark hash.
+
+    Args:
+        experiments: number of experiments
+        episodes: number of episodes per experiment
+        seed: random seed
+
+    Returns: `BenchmarkData` object
+
+    """
+    random_state = np.random.RandomState(seed)
+    return BenchmarkData([make_experiment(episodes, random_state) for _ in xrange(experiments)])
+
+
+def benchmark_data_paths(sizes=default_sizes, repeat=3):
+    """
+    Time the data paths on synthetic benchmarks of different sizes. Cases are named `<path>_<experiments>x<episodes>`:
+
+    - `hash`, `hash_v1`: `ExperimentData.hash` of all experiments (current and version 1 experiment hash)
+    - `extended_results`: `ExperimentData.extended_results` of all experiments
+    - `min_x_<var>`: `BenchmarkData.min_x`
+    - `as_matrix`: `BenchmarkData.as_matrix`
+    - `db_save`, `db_get`: `LocalDatabase.save_benchmark` (to an empty database) and `LocalDatabase.get_benchmark`
+    - `cache_save`, `cache_get`: `Cache.save` and `Cache.get`
+    - `file_save`, `file_get`: `BenchmarkData.to_file` and `BenchmarkData.from_file` (memory-mapped)
+    - `to_timeseries_<var>`: `to_timeseries` as called by `ResultPlotter`
+    - `plot_<var>`: `ResultPlotter.plot_reward_by_*` (only if seaborn and matplotlib are installed)
+
+    Args:
+        sizes: list of (experiments, episodes per experiment) tuples
+        repeat: number of repetitions
+
+    Returns: dict containing timing results (seconds per call), with the benchmark size
+
+    """
+    results = dict()
+    for experiments, episodes in sizes:
+        benchmark_data = make_benchmark_data(experiments, episodes)
+
+        temp_path = tempfile.mkdtemp(prefix='rl_benchmark_microbenchmark_')
+        try:
+            timings = time_data_paths(benchmark_data, temp_path, repeat)
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
+
+        for name, timing in timings.items():
+            timing['experiments'] = experiments
+            timing['episodes'] = episodes
+            results['{}_{:d}x{:d}'.format(name, experiments, episodes)] = timing
+
+    return results
+
+
+def time_data_paths(benchmark_data, temp_path, repeat):
+    experiment_list = list(benchmark_data)
+    results = dict()
+
+    def hash_all(version=None):
+        # Hashes are cached, so time computing them
+        for experiment_data in experiment_list:
+            experiment_data.reset_columns()
+            experiment_data.hash(version)
+
+    def extended_results_all():
+        # Columns are cached, so time computing them
+        for experiment_data in experiment_list:
+            experiment_data.reset_columns()
+            experiment_data.extended_results()
+
+    results['hash'] = time_function(hash_all, repeat=repeat)
+    results['hash_v1'] = time_function(lambda: hash_all(1), repeat=repeat)
+    results['extended_results'] = time_function(extended_results_all, repeat=repeat)
+
+    for var, _ in transform_targets:
+        results['min_x_{}'.format(var)] = time_function(lambda: benchmark_data.min_x(var), repeat=repeat)
+
+    results['as_matrix'] = time_function(benchmark_data.as_matrix, repeat=repeat)
+
+    # Each save goes to a new database, otherwise all experiments are rejected as duplicates
+    db_files = (os.path.join(temp_path, 'benchmarks_{:d}.db'.format(i)) for i in itertools.count())
+    results['db_save'] = time_function(lambda: LocalDatabase(next(db_files)).save_benchmark(benchmark_data),
+                                       repeat=repeat)
+
+    db = LocalDatabase(next(db_files))
+    _, benchmark_hash, _ = benchmark_data[0].hash()
+    db.save_benchmark(benchmark_data)
+    results['db_get'] = time_function(lambda: db.get_benchmark(benchmark_hash), repeat=repeat)
+
+    cache = Cache(os.path.join(temp_path, 'cache'))
+    results['cache_save'] = time_function(lambda: cache.save(benchmark_data, benchmark_hash), repeat=repeat)
+    results['cache_get'] = time_function(lambda: cache.get(benchmark_hash), repeat=repeat)
+
+    benchmark_file = os.path.join(temp_path, 'benchmark.rlb')
+    results['file_save'] = time_function(lambda: benchmark_data.to_file(benchmark_file), repeat=repeat)
+    results['file_get'] = time_function(lambda: BenchmarkData.from_file(benchmark_file), repeat=repeat)
+
+    for var, target in transform_targets:
+        cut_x = benchmark_data.min_x(var)
+        results['to_timeseries_{}'.format(var)] = time_function(
+            lambda: to_timeseries(benchmark_data, target=target, cut_x=cut_x, smooth=10), repeat=repeat)
+
+    results.update(time_plot_paths(benchmark_data, repeat))
+
+    return results
+
+
+def time_plot_paths(benchmark_data, repeat):
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        from rl_benchmark.analyze.plotter import ResultPlotter
+    except ImportError as e:
+        logging.warning("Skipping plot microbenchmarks: {}".format(e))
+        return dict()
+
+    plotter = ResultPlotter()
+    plotter.add_benchmark(benchmark_data, 'synthetic')
+
+    results = dict()
+    for var, plot in (('episodes', plotter.plot_reward_by_episode),
+                      ('timesteps', plotter.plot_reward_by_timestep),
+                      ('seconds', plotter.plot_reward_by_second)):
+        def plot_figure():
+            figure, ax = plt.subplots()
+            plot(ax=ax)
+            plt.close(figure)
+
+        try:
+            results['plot_{}'.format(var)] = time_function(plot_figure, repeat=repeat)
+        except AttributeError as e:
+            # Plotting uses APIs removed in recent pandas/seaborn versions (`DataFrame.append`, `sns.tsplot`)
+            logging.warning("Skipping plot microbenchmark {}: {}".format(var, e))
+
+    return results
@@ -0,0 +1,94 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Microbenchmark of attribute forwarding in `EnvironmentWrapper`.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from six.moves import xrange
+
+from rl_benchmark.benchmark.wrapper import EnvironmentWrapper
+from rl_benchmark.microbenchmark.timing import time_function
+
+
+class CounterEnvironment(object):
+    """
+    Environment whose step does (almost) nothing, so forwarding overhead dominates.
+    """
+    def __init__(self):
+        self.timestep = 0
+
+    def reset(self):
+        self.timestep = 0
+        return 0
+
+    def step(self, action):
+        self.timestep += 1
+        return self.timestep, 0.0, False, None
+
+
+class ForwardingWrapper(object):
+    """
+    Wrapper forwarding every attribute lookup with `__getattr__`, without binding (for comparison).
+    """
+    def __init__(self, env):
+        self.env = env
+
+    def __getattr__(self, item):
+        return getattr(self.env, item)
+
+
+def wrap(environment, wrapper_class, depth):
+    for _ in xrange(depth):
+        environment = wrapper_class(environment)
+    return environment
+
+
+def benchmark_environment_wrapper(steps=100000, repeat=5, depths=(1, 3)):
+    """
+    Compare the time of a forwarded `step` call on wrapper chains of different depths with calling `step` on the
+    raw environment. Overheads are the difference in time per step.
+
+    Args:
+        steps: number of steps per repetition
+        repeat: number of repetitions
+        depths: wrapper chain depths to measure
+
+    Returns: dict containing timing results (seconds per step) and overheads
+
+    """
+    def time_steps(environment):
+        def step_loop():
+            for _ in xrange(steps):
+                environment.step(0)
+
+        timing = time_function(step_loop, repeat=repeat)
+        for key in ('best', 'median', 'mean'):
+            timing[key] /= steps
+        return timing
+
+    results = dict(raw=time_steps(CounterEnvironment()))
+    for depth in depths:
+        for name, wrapper_class in (('environment_wrapper', EnvironmentWrapper),
+                                    ('forwarding_wrapper', ForwardingWrapper)):
+            timing = time_steps(wrap(CounterEnvironment(), wrapper_class, depth))
+            timing['overhead'] = timing['best'] - results['raw']['best']
+            results['{}_{:d}'.format(name, depth)] = timing
+
+    return results
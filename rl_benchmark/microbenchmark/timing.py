@@ -0,0 +1,73 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Timing helpers for microbenchmarks.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import time
+
+import numpy as np
+
+from six.moves import xrange
+
+
+def time_function(function, number=1, repeat=5):
+    """
+    Time a function. Like `timeit.repeat`, but returns summary statistics of the time per call.
+
+    Args:
+        function: function without arguments
+        number: number of calls per repetition
+        repeat: number of repetitions
+
+    Returns: dict containing best, median and mean seconds per call, and the number of calls per repetition
+
+    """
+    times = list()
+    for _ in xrange(repeat):
+        start_time = time.perf_counter()
+        for _ in xrange(number):
+            function()
+        times.append((time.perf_counter() - start_time) / number)
+
+    times = np.array(times)
+    return dict(
+        best=float(times.min()),
+        median=float(np.median(times)),
+        mean=float(times.mean()),
+        number=number,
+        repeat=repeat
+    )
+
+
+def format_time(seconds):
+    """
+    Format a duration with a unit fitting its magnitude.
+
+    Args:
+        seconds: duration in seconds
+
+    Returns: string, e.g. `12.3 us`
+
+    """
+    for unit, factor in (('s', 1.0), ('ms', 1e-3), ('us', 1e-6)):
+        if abs(seconds) >= factor:
+            return "{:.1f} {}".format(seconds / factor, unit)
+    return "{:.1f} ns".format(seconds * 1e9)
@@ -0,0 +1,191 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from rl_benchmark.data import BenchmarkData, BenchmarkFile, ExperimentData
+from rl_benchmark.db.local_db import LocalDatabase
+
+
+def make_experiment(num_episodes, seed=0):
+    """
+    Args:
+        num_episodes: number of episodes
+        seed: random seed for the episode results
+
+    Returns: `ExperimentData` object with list results, as stored in the database
+
+    """
+    random = np.random.RandomState(seed)
+    return ExperimentData(dict(
+        metadata=dict(
+            agent='test',
+            environment_domain='test',
+            environment_name='test-v0',
+            rl_library='test',
+            rl_library_version='0.1',
+            rl_backend='none',
+            rl_backend_version='0.1',
+            start_time=1,
+            end_time=2
+        ),
+        config=dict(type='test_agent', learning_rate=0.01),
+        results=dict(
+            episode_rewards=random.normal(size=num_episodes).tolist(),
+            episode_timesteps=random.randint(1, 100, size=num_episodes).tolist(),
+            episode_end_times=np.cumsum(random.uniform(0.5, 1.5, size=num_episodes)).tolist(),
+            seed=seed
+        )
+    ))
+
+
+class TestBenchmarkFile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'benchmark.rlb')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        benchmark_data = BenchmarkData([make_experiment(10, seed=1), make_experiment(0, seed=2)])
+        benchmark_data[0]['results']['observations'] = np.arange(12, dtype=np.float32).reshape(3, 4)
+
+        self.assertEqual(benchmark_data.to_file(self.filename), 2)
+        self.assertTrue(BenchmarkFile.is_benchmark_file(self.filename))
+
+        loaded = BenchmarkData.from_file(self.filename)
+        self.assertEqual(len(loaded), 2)
+        for experiment_data, loaded_data in zip(benchmark_data, loaded):
+            self.assertEqual(loaded_data['metadata'], experiment_data['metadata'])
+            self.assertEqual(loaded_data['config'], experiment_data['config'])
+            self.assertEqual(loaded_data['results']['seed'], experiment_data['results']['seed'])
+            for name in BenchmarkFile.COLUMN_DTYPES:
+                if name in experiment_data['results']:
+                    np.testing.assert_array_equal(loaded_data['results'][name], experiment_data['results'][name])
+            self.assertEqual(loaded_data.hash(), experiment_data.hash())
+
+        # Non-empty columns are read-only views of the memory-mapped file
+        rewards = loaded[0]['results']['episode_rewards']
+        self.assertIsInstance(rewards.base, np.memmap)
+        self.assertFalse(rewards.flags.writeable)
+
+        observations = loaded[0]['results']['observations']
+        self.assertEqual(observations.dtype, np.float32)
+        np.testing.assert_array_equal(observations, benchmark_data[0]['results']['observations'])
+
+        self.assertEqual(len(loaded[1]['results']['episode_rewards']), 0)
+
+    def test_file_object(self):
+        benchmark_data = BenchmarkData([make_experiment(5)])
+        benchmark_data.to_file(self.filename)
+
+        with open(self.filename, 'rb') as fp:
+            loaded = BenchmarkData.from_file(fp)
+            np.testing.assert_array_equal(loaded[0].column('rewards'), benchmark_data[0].column('rewards'))
+
+
+class TestExperimentHash(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db = LocalDatabase(localdb_path=os.path.join(self.directory, 'benchmarks.db'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_hash_versions_resolve(self):
+        # Store the experiment like a database written before hash version 2
+        old_experiment = make_experiment(20)
+        old_experiment.hash_version = 1
+        v1_hash = old_experiment.hash()[0]
+        self.db.save_benchmark([old_experiment])
+
+        experiment_data = make_experiment(20)
+        v2_hash = experiment_data.hash()[0]
+        self.assertNotEqual(v1_hash, v2_hash)
+        self.assertEqual(experiment_data.hash(1)[0], v1_hash)
+        self.assertEqual(experiment_data.hash()[1:], experiment_data.hash(1)[1:])
+
+        # The current hash resolves to the stored version 1 hash, and is not saved twice
+        self.assertEqual(self.db.find_experiment_hash(experiment_data), v1_hash)
+        result = self.db.save_benchmark([experiment_data])
+        self.assertEqual(result['added_experiments'], [])
+        self.assertEqual(result['duplicate_experiment_hashes'], [v1_hash])
+
+        # Experiments stored with the current version resolve to their own hash
+        new_experiment = make_experiment(20, seed=3)
+        self.db.save_benchmark([new_experiment])
+        self.assertEqual(self.db.find_experiment_hash(make_experiment(20, seed=3)), new_experiment.hash()[0])
+
+        stored = self.db.get_experiment(v1_hash)
+        self.assertEqual(stored.hash(1)[0], v1_hash)
+        self.assertEqual(stored.hash()[0], v2_hash)
+
+    def test_hash_of_typed_results(self):
+        # Arrays (as read from benchmark files) and lists (as stored in the database) hash the same
+        experiment_data = make_experiment(15)
+        typed_data = ExperimentData(experiment_data)
+        typed_data['results'] = dict((name, np.asarray(value)) for name, value in experiment_data['results'].items())
+
+        self.assertEqual(typed_data.hash(), experiment_data.hash())
+        self.assertEqual(typed_data.hash(1), experiment_data.hash(1))
+
+
+class TestBenchmarkMatrix(unittest.TestCase):
+    def setUp(self):
+        self.benchmark_data = BenchmarkData([make_experiment(num_episodes, seed=seed)
+                                             for seed, num_episodes in enumerate((7, 12, 3, 12))])
+        self.matrix = self.benchmark_data.as_matrix()
+
+    def test_shape(self):
+        self.assertEqual(self.matrix.shape, (4, 12))
+        np.testing.assert_array_equal(self.matrix.lengths, [7, 12, 3, 12])
+        np.testing.assert_array_equal(self.matrix.count()[[0, 2, 3, 6, 7, 11]], [4, 4, 3, 3, 2, 2])
+
+    def test_min_x(self):
+        for var in ('episodes', 'timesteps', 'seconds'):
+            self.assertEqual(self.matrix.min_x(var), self.benchmark_data.min_x(var))
+        self.assertEqual(self.matrix.min_x('timesteps').dtype, np.int64)
+
+    def test_mean(self):
+        for var in ('rewards', 'timesteps', 'seconds'):
+            expected = [np.mean([experiment_data.column(var)[episode] for experiment_data in self.benchmark_data
+                                 if len(experiment_data.column(var)) > episode])
+                        for episode in range(self.matrix.shape[1])]
+            np.testing.assert_allclose(self.matrix.mean(var), expected)
+
+    def test_truncate(self):
+        truncated = self.matrix.truncate()
+        self.assertEqual(truncated.shape, (4, 3))
+        self.assertTrue(truncated.mask.all())
+        self.assertEqual(truncated.min_x('episodes'), self.matrix.min_x('episodes'))
+
+    def test_empty_experiment(self):
+        self.benchmark_data.append(make_experiment(0))
+        with self.assertRaises(ValueError):
+            self.benchmark_data.as_matrix().min_x('episodes')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,8 +25,26 @@ import logging
 import os
 
 
+def json_default(obj):
+    """
+    Serialize numpy arrays (e.g. episode results) and numpy scalars with `json.dumps(..., default=json_default)`.
+    Arrays are written as lists, so the JSON output (and hashes) are the same as for the equivalent lists.
+
+    Args:
+        obj: object `json` can't serialize
+
+    Returns: JSON-serializable object
+
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError("Object of type {} is not JSON serializable".format(type(obj).__name__))
+
+
 def hash_object(obj):
-    json_str = json.dumps(obj, sort_keys=True)
+    json_str = json.dumps(obj, sort_keys=True, default=json_default)
     hash_str = hashlib.sha1(json_str.encode('utf8')).hexdigest()
     return str(hash_str)
 
@@ -59,6 +77,24 @@ def load_config_file(filename, config_folder=None):
     return None
 
 
+def backend_threads(cpus):
+    """
+    Thread pool sizes of an experiment with a budget of `cpus` CPUs. Ops run on an intra-op pool of `cpus` threads,
+    independent ops are scheduled by an inter-op pool of at most two threads, so the pools don't oversubscribe the
+    budget.
+
+    Args:
+        cpus: number of CPUs
+
+    Returns: dict containing `intra_op_threads` and `inter_op_threads`
+
+    """
+    return dict(
+        intra_op_threads=cpus,
+        inter_op_threads=min(2, cpus)
+    )
+
+
 def n_step_average(data, n):
     """
     Average data over n steps.
@@ -0,0 +1,175 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+
+"""
+Distributed RL benchmark sweeps.
+
+Usage:
+
+```bash
+# On the coordinator host (stores results in its local benchmark database)
+python benchmark_cluster.py coordinator --configs <config> [<config> ...] --gym-ids <gym_id> [<gym_id> ...] --rl-libraries <rl_library> [<rl_library> ...] [--experiments num_experiments] [--seed seed] [--ledger <file>] [--host host] [--port port] [--authkey key] [--lease-timeout seconds]
+
+# On each worker host
+python benchmark_cluster.py worker --host <coordinator_host> [--port port] [--authkey key] [--cpus-per-experiment num_cpus] [--worker-index index]
+
+# Coordinator and workers on localhost (test mode)
+python benchmark_cluster.py local --configs <config> [<config> ...] --gym-ids <gym_id> [<gym_id> ...] --rl-libraries <rl_library> [<rl_library> ...] [--workers num_workers] ...
+```
+
+Jobs are the same as in `benchmark_sweep.py`, and the coordinator uses the same job ledger, so sweeps can be resumed
+and switched between local and distributed execution.
+
+The coordinator resolves config files and sends them along with the jobs, so workers only need rl_benchmark and the
+RL libraries installed. Workers send heartbeats while running a job. If a worker stops sending heartbeats for
+`lease-timeout` seconds or disconnects, its job is handed to another worker.
+
+`authkey` authenticates workers (default: the `RL_BENCHMARK_AUTHKEY` environment variable). Messages are pickles, so
+anyone who knows the key can run code on the coordinator. Connections are not encrypted. If the coordinator is started
+without a key, it generates a random one and logs it, pass it to the workers. Workers require a key.
+
+`cpus-per-experiment` pins each worker to its own set of CPUs. Workers on the same host need distinct
+`worker-index` values (0, 1, ...), otherwise they share the same CPUs. Local workers are indexed automatically.
+
+`host` is the interface the coordinator listens on. It defaults to localhost, pass the address of an interface (or
+`0.0.0.0`) to accept workers from other hosts.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import logging
+import os
+import sys
+
+from rl_benchmark import default_config_file as DEFAULT_CONFIG_FILE
+from rl_benchmark.benchmark.runner import JobCoordinator, JobWorker, SweepRunner
+from rl_benchmark.benchmark.runner.job_queue import DEFAULT_PORT, generate_authkey, run_local
+from rl_benchmark.db import LocalDatabase
+from rl_benchmark.cli.util import load_config
+
+
+logging.basicConfig(level=logging.INFO)
+root_logger = logging.getLogger('')
+root_logger.setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('mode', choices=['coordinator', 'worker', 'local'], help="process role")
+    parser.add_argument('-c', '--configs', nargs='+', help="Algorithm names (config files)")
+    parser.add_argument('-g', '--gym-ids', nargs='+', help="IDs of the gym environments")
+    parser.add_argument('-R', '--rl-libraries', nargs='+', default=['rlgraph'],
+                        help="RL libraries to run benchmarks on.")
+    parser.add_argument('-x', '--experiments', default=1, type=int,
+                        help="number of experiments per combination")
+    parser.add_argument('-s', '--seed', default=None, type=int,
+                        help="random seed of the first experiment of each combination")
+    parser.add_argument('-w', '--workers', default=1, type=int, help="number of worker processes (local mode)")
+    parser.add_argument('-l', '--ledger', default=None, help="job ledger file")
+    parser.add_argument('-H', '--host', default=None,
+                        help="coordinator host (worker) or interface to listen on (coordinator, default localhost)")
+    parser.add_argument('-p', '--port', default=DEFAULT_PORT, type=int, help="coordinator port")
+    parser.add_argument('-k', '--authkey', default=os.environ.get('RL_BENCHMARK_AUTHKEY'),
+                        help="shared key to authenticate workers (default: RL_BENCHMARK_AUTHKEY, coordinator "
+                             "generates a random key if unset)")
+    parser.add_argument('-L', '--lease-timeout', default=120.0, type=float,
+                        help="seconds without heartbeat after which a job is requeued")
+    parser.add_argument('--cpus-per-experiment', default=None, type=int,
+                        help="pin the worker to this many CPUs and limit its thread pools (worker, local)")
+    parser.add_argument('-i', '--worker-index', default=0, type=int,
+                        help="index of the worker on its host, workers with a CPU budget are pinned to disjoint CPUs "
+                             "by index (worker)")
+    parser.add_argument('-C', '--config-file', default=DEFAULT_CONFIG_FILE,
+                        help="config file (for database configuration)")
+
+    args = parser.parse_args()
+
+    root = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+    config_folder = os.path.join(root, 'configs')
+    output_folder = os.path.join(root, 'benchmarks')
+    authkey = args.authkey.encode('utf-8') if args.authkey else None
+
+    if args.mode == 'worker':
+        if not args.host:
+            logger.error("Worker mode requires the coordinator --host.")
+            return 1
+        if not authkey:
+            logger.error("Worker mode requires the coordinator --authkey (or RL_BENCHMARK_AUTHKEY).")
+            return 1
+
+        worker = JobWorker((args.host, args.port), authkey=authkey, config_folder=config_folder,
+                           output_folder=output_folder, cpus_per_experiment=args.cpus_per_experiment,
+                           worker_index=args.worker_index)
+        executed_jobs = worker.run()
+        logger.info("Executed {:d} jobs.".format(executed_jobs))
+        return 0
+
+    if not args.configs or not args.gym_ids:
+        logger.error("Coordinator and local mode require --configs and --gym-ids.")
+        return 1
+
+    ledger_file = args.ledger
+    if not ledger_file:
+        if not os.path.isdir(output_folder):
+            os.makedirs(output_folder)
+        ledger_file = os.path.join(output_folder, 'sweep.ledger')
+
+    config = load_config(args.config_file, default_config_file=DEFAULT_CONFIG_FILE)
+    local_db = LocalDatabase(**config)
+
+    sweep_runner = SweepRunner(
+        configs=args.configs,
+        gym_ids=args.gym_ids,
+        rl_libraries=args.rl_libraries,
+        db=local_db,
+        ledger_file=ledger_file,
+        experiments=args.experiments,
+        config_folder=config_folder,
+        output_folder=output_folder,
+        seed=args.seed,
+        cpus_per_experiment=args.cpus_per_experiment if args.mode == 'local' else None
+    )
+
+    if args.mode == 'local':
+        sweep_info = run_local(sweep_runner, workers=args.workers, authkey=authkey,
+                               lease_timeout=args.lease_timeout)
+    else:
+        if not authkey:
+            authkey = generate_authkey()
+            logger.info("Generated authkey, start workers with --authkey {}".format(authkey.decode('utf-8')))
+        coordinator = JobCoordinator(sweep_runner, address=(args.host or '127.0.0.1', args.port), authkey=authkey,
+                                     lease_timeout=args.lease_timeout)
+        sweep_info = coordinator.serve()
+
+    logger.info("Completed {:d} jobs, {:d} jobs failed.".format(
+        len(sweep_info['completed_jobs']), len(sweep_info['failed_jobs'])))
+    logger.info("Job ledger: {}".format(ledger_file))
+
+    if sweep_info['failed_jobs']:
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
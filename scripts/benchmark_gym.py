@@ -19,7 +19,7 @@ RL benchmarking.
 Usage:
 
 ```bash
-python benchmark_gym.py [--rl rl_library] [--output output] [--experiments num_experiments] [--append] [--model <path>] [--save-model <num_episodes>] [--load-model <path>] [--history <file>] [--history-episodes <num_episodes>] [--load-history <file>] <algorithm> <gym_id>
+python benchmark_gym.py [--rl rl_library] [--output output] [--experiments num_experiments] [--workers num_workers] [--cpus-per-experiment num_cpus] [--environment-backend backend] [--profile] [--append] [--model <path>] [--save-model <num_episodes>] [--load-model <path>] [--history <file>] [--history-episodes <num_episodes>] [--load-history <file>] <algorithm> <gym_id>
 ```
 
 `algorithm` specifies which config file to use. You can pass the path to a valid json config file, or a string
@@ -27,9 +27,25 @@ indicating which prepared config to use (e.g. `dqn2015`).
 
 `gym_id` should be a valid [OpenAI gym ID](https://gym.openai.com/envs)
 
-`rl_library` should be the library you want to use for benchmarking (e.g. rlgraph).
+`rl_library` should be the library you want to use for benchmarking (e.g. rlgraph). The `null` library measures the
+overhead of the benchmark harness (see README).
 
-`output` is an optional parameter to set the output (pickle) file. If omitted, output will be saved in `./benchmarks`.
+`workers` is an optional parameter to distribute the experiments over a pool of worker processes. Each worker creates
+its own environment and agent. If omitted, experiments run one after another.
+
+`cpus-per-experiment` is an optional CPU budget per experiment. Each worker is pinned to its own set of CPUs, and BLAS,
+OpenMP and TensorFlow thread pools are limited to the budget, so parallel experiments don't oversubscribe the machine.
+The effective settings are stored in the experiment metadata.
+
+`environment-backend` is an optional parameter stating where environments are run. `local` (default) runs them in the
+benchmark process, `subprocess` runs each environment in a child process and transfers observations via shared memory,
+which helps with expensive environments (e.g. Atari). Can't be combined with `workers`.
+
+`profile` is an optional parameter to sample the Python stacks of each experiment in a background thread. The profile is
+written in collapsed stack format (usable with flamegraph.pl or speedscope) to the output folder, and a summary of
+the functions with the most self time is stored in the experiment metadata.
+
+`output` is an optional parameter to set the output (benchmark) file. If omitted, output will be saved in `./benchmarks`.
 
 `append` is an optional parameter which indicates if data should be appended to an existing output file.
 
@@ -43,7 +59,9 @@ model will not be saved.
 `load-model <path>` states from which path to load the model (only for the first experiment, if more than one
 experiment should run). If omitted, it does not load a model.
 
-`history <file>` states the file where the history of the run should be periodically saved. If omitted, history will
+`history <file>` states the file where the history of the run should be periodically saved. The history is written to
+an append-only binary episode log, so each save only writes the episodes finished since the last save. When running
+experiments on several workers, each experiment writes to `<file>.<experiment number>`. If omitted, history will
 not be saved.
 
 `history-episodes <num_episodes>` states after how many episodes the history should be saved. If 0 or omitted,
@@ -52,18 +70,26 @@ history will not be saved.
 `load-history <file>` states from which path to load the the run history (only for the first experiment, if more than one
 experiment should run). If omitted, it does not load a history.
 
-The resulting output file is a pickled python list, where each item is a dict containing benchmark data.
+The resulting output file is a binary benchmark file (see `rl_benchmark.data.BenchmarkFile`), which can be loaded with
+`BenchmarkData.from_file`. It contains a list of experiments, where each item is a dict containing benchmark data.
 
 The dict has the following keys:
 
-* `episode_rewards`: list containing observed total rewards for each episode.
-* `episode_timesteps`: list containing total timesteps for each episode.
-* `initial_reset_time`: integer indicating starting timestamp (usually 0).
-* `episode_end_times`: list containing observed end times relativ to `initial_reset_time` (not working at the moment).
+* `episode_rewards`: array (float64) containing observed total rewards for each episode.
+* `episode_timesteps`: array (int32) containing total timesteps for each episode.
+* `initial_reset_time`: seconds spent in the initial environment reset.
+* `episode_end_times`: array (float64) containing the observed duration of each episode in seconds.
+* `episode_environment_times`: list containing the time spent in environment steps for each episode.
+* `episode_agent_times`: list containing the time spent between environment steps (agent act/observe/update)
+  for each episode.
+* `timing`: dict containing total environment, agent, callback and reset times, and p50/p90/p99/max latencies of
+  environment steps and agent steps. Only every `sample_interval`-th step is timed in detail, so latencies are
+  those of the sampled steps, and environment and agent times are estimated from them (see `StepTimer`).
 * `info`: dict containing meta information about the experiment:
     * `agent`: Agent (algorithm) used in the experiment.
     * `episodes`: Episode count configuration item.
     * `max_timesteps`: Max timesteps configuration item.
+    * `seconds`: Max seconds (wall-clock limit) configuration item.
     * `environment_name`: Environment name configuration item.
 * `config`: `Configuration` object containing the original configuration passed to the benchmarking script.
 
@@ -101,6 +127,15 @@ def main():
     parser.add_argument('gym_id', help="ID of the gym environment")
     parser.add_argument('-x', '--experiments', default=1, type=int,
                         help="number of times to run the benchmark")
+    parser.add_argument('-w', '--workers', default=1, type=int,
+                        help="number of worker processes to distribute experiments over")
+    parser.add_argument('--cpus-per-experiment', default=None, type=int,
+                        help="pin experiments to this many CPUs each and limit their thread pools")
+    parser.add_argument('-B', '--environment-backend', default='local', choices=['local', 'subprocess'],
+                        help="run environments in the benchmark process or in child processes")
+    parser.add_argument('--profile', action='store_true', default=False,
+                        help="sample Python stacks of each experiment and save a flamegraph-compatible profile")
+    parser.add_argument('--profile-interval', default=0.01, type=float, help="profiler sampling interval in seconds")
     parser.add_argument('-C', '--config-file', default=DEFAULT_CONFIG_FILE,
                         help="config file (for database configuration)")
     parser.add_argument('-D', '--no-db-store', action='store_true', default=False,
@@ -108,9 +143,9 @@ def main():
     parser.add_argument('-P', '--push', action='store_true', default=False,
                         help="Push results to web database.")
     parser.add_argument('-R', '--rl_library', default='rlgraph', help="RL library to run benchmark on.")
-    parser.add_argument('-o', '--output', help="output file (pickle pkl)")
+    parser.add_argument('-o', '--output', help="output file (benchmark file)")
     parser.add_argument('-a', '--append', action='store_true', default=False,
-                        help="Append data to existing pickle file?")
+                        help="Append data to existing output file?")
     parser.add_argument('-f', '--force', action='store_true', default=False,
                         help="Overwrite possible existing output file?")
     parser.add_argument('-m', '--model', default=None, help="model path")
@@ -130,7 +165,12 @@ def main():
         logger.error("No such library: {} (choose one of {}).".format(args.rl_library, ', '.join(libraries.keys())))
         return 1
 
-    rl_library_class = libraries[args.rl_library]
+    try:
+        # Only imports the selected library (and its backend)
+        rl_library_class = libraries[args.rl_library]
+    except ImportError as e:
+        logger.error("Could not import library {}: {}".format(args.rl_library, e))
+        return 1
 
     benchmark_runner = rl_library_class(
         config_folder=os.path.join(root, 'configs'),
@@ -151,11 +191,11 @@ def main():
         if args.output == '-':
             # Set output file name
             if args.algorithm.endswith('.json'):
-                output_path = os.path.join(benchmark_runner.output_folder, '{}_{}.pkl'.format(
+                output_path = os.path.join(benchmark_runner.output_folder, '{}_{}.rlb'.format(
                     args.algorithm.replace('.', '_').replace('/', '__'), args.gym_id
                 ))
             else:
-                output_path = os.path.join(benchmark_runner.output_folder, '{}_{}.pkl'.format(
+                output_path = os.path.join(benchmark_runner.output_folder, '{}_{}.rlb'.format(
                     args.algorithm, args.gym_id
                 ))
         else:
@@ -173,9 +213,14 @@ def main():
         benchmark_runner.load_history(args.load_history)
 
     benchmark_runner.set_environment('openai_gym', args.gym_id)
+    benchmark_runner.set_environment_backend(args.environment_backend)
+    benchmark_runner.set_cpu_budget(args.cpus_per_experiment)
 
     benchmark_runner.run(
         experiments=args.experiments,
+        workers=args.workers,
+        profile=args.profile,
+        profile_interval=args.profile_interval,
         save_history_episodes=args.history_episodes,
         save_history_file=args.history,
         save_model_episodes=args.save_model,
@@ -0,0 +1,135 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+RL speed benchmarking.
+
+Usage:
+
+```bash
+python benchmark_speed.py [--rl_library rl_library] [--steps num_steps] [--warmup-steps num_steps] [--trials num_trials] [--environment-backend backend] [--no-db-store] <algorithm> <gym_id>
+```
+
+`algorithm` specifies which config file to use (see `benchmark_gym.py`). Run limits (`max_episodes`,
+`max_timesteps`, `max_seconds`) in the config are ignored, `max_episode_timesteps` limits episode length.
+
+`gym_id` should be a valid [OpenAI gym ID](https://gym.openai.com/envs)
+
+`rl_library` should be the library you want to use for benchmarking (e.g. rlgraph).
+
+`steps` is the number of timed steps per trial and phase. Each trial runs `steps` steps acting only (no exploration,
+no learning) and `steps` steps acting, observing and updating.
+
+`warmup-steps` is the number of untimed steps before the first trial.
+
+`trials` is the number of trials.
+
+Results contain three throughput figures per trial:
+
+* `act_only`: agent actions per second (time spent in the agent's act call).
+* `observe_update`: agent observations per second, including updates (time spent in the agent's observe call).
+* `end_to_end`: environment steps per second of the complete act/step/observe loop.
+
+Results are stored as speed benchmarks in the local benchmark database, separate from learning benchmarks.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import logging
+import os
+import sys
+
+from rl_benchmark import default_config_file as DEFAULT_CONFIG_FILE
+from rl_benchmark.benchmark.runner.speed_benchmark import speed_modes
+from rl_benchmark.db import LocalDatabase
+from rl_benchmark.cli.util import load_config
+from rl_benchmark.libraries import libraries
+
+
+logging.basicConfig(level=logging.INFO)
+root_logger = logging.getLogger('')
+root_logger.setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('algorithm', help="Algorithm name (config file)")
+    parser.add_argument('gym_id', help="ID of the gym environment")
+    parser.add_argument('-R', '--rl_library', default='rlgraph', help="RL library to run benchmark on.")
+    parser.add_argument('-n', '--steps', default=10000, type=int, help="number of timed steps per trial and phase")
+    parser.add_argument('-W', '--warmup-steps', default=1000, type=int,
+                        help="number of untimed steps before the first trial")
+    parser.add_argument('-t', '--trials', default=5, type=int, help="number of trials")
+    parser.add_argument('-B', '--environment-backend', default='local', choices=['local', 'subprocess'],
+                        help="run environments in the benchmark process or in child processes")
+    parser.add_argument('-C', '--config-file', default=DEFAULT_CONFIG_FILE,
+                        help="config file (for database configuration)")
+    parser.add_argument('-D', '--no-db-store', action='store_true', default=False,
+                        help="Don't save results into local benchmark database.")
+
+    args = parser.parse_args()
+
+    root = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+
+    if not args.rl_library in libraries:
+        logger.error("No such library: {} (choose one of {}).".format(args.rl_library, ', '.join(libraries.keys())))
+        return 1
+
+    try:
+        # Only imports the selected library (and its backend)
+        rl_library_class = libraries[args.rl_library]
+    except ImportError as e:
+        logger.error("Could not import library {}: {}".format(args.rl_library, e))
+        return 1
+
+    benchmark_runner = rl_library_class(
+        config_folder=os.path.join(root, 'configs'),
+        output_folder=os.path.join(root, 'benchmarks')
+    )
+
+    if not benchmark_runner.load_config(args.algorithm):
+        logger.error("Config not found: {}".format(args.algorithm))
+        return 1
+
+    benchmark_runner.set_environment('openai_gym', args.gym_id)
+    benchmark_runner.set_environment_backend(args.environment_backend)
+
+    speed_data = benchmark_runner.run_speed(steps=args.steps, warmup_steps=args.warmup_steps, trials=args.trials)
+
+    for mode in speed_modes:
+        summary = speed_data['results']['summary'][mode]
+        logger.info("{}: {:.1f} steps/s (std {:.1f}, min {:.1f}, max {:.1f})".format(
+            mode, summary['mean'], summary['std'], summary['min'], summary['max']))
+
+    if not args.no_db_store:
+        config = load_config(args.config_file, default_config_file=DEFAULT_CONFIG_FILE)
+        local_db = LocalDatabase(**config)
+        save_info = benchmark_runner.save_speed_results_db(db=local_db)
+        logger.info("Saved results to local database:")
+        logger.info("Benchmark hash: {}".format(save_info['benchmark_hash']))
+        logger.info("Speed hash: {}".format(save_info['speed_hash']))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+RL benchmark sweeps.
+
+Usage:
+
+```bash
+python benchmark_sweep.py --configs <config> [<config> ...] --gym-ids <gym_id> [<gym_id> ...] --rl-libraries <rl_library> [<rl_library> ...] [--experiments num_experiments] [--seed seed] [--workers num_workers] [--cpus-per-experiment num_cpus] [--ledger <file>]
+```
+
+`configs` is a list of config names or config file paths (see `benchmark_gym.py`).
+
+`gym-ids` is a list of valid [OpenAI gym IDs](https://gym.openai.com/envs)
+
+`rl-libraries` is a list of RL libraries to run the benchmarks on (e.g. rlgraph).
+
+`experiments` is the number of experiments to run for each (config, gym_id, rl_library) combination.
+
+`seed` is the random seed of the first experiment of each combination, experiment `i` uses `seed + i`. If omitted,
+experiments are not seeded.
+
+`workers` is the number of worker processes. Each worker keeps its library imported across jobs.
+
+`cpus-per-experiment` pins each worker to its own set of CPUs and limits its BLAS, OpenMP and TensorFlow thread pools
+to that many threads.
+
+`ledger` is the job ledger file. Finished jobs are recorded there, so running the same sweep again continues where
+an interrupted sweep stopped. If omitted, the ledger is saved in `./benchmarks/sweep.ledger`.
+
+Results of every finished experiment are stored in the local benchmark database.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import logging
+import os
+import sys
+
+from rl_benchmark import default_config_file as DEFAULT_CONFIG_FILE
+from rl_benchmark.benchmark.runner import SweepRunner
+from rl_benchmark.db import LocalDatabase
+from rl_benchmark.cli.util import load_config
+
+
+logging.basicConfig(level=logging.INFO)
+root_logger = logging.getLogger('')
+root_logger.setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-c', '--configs', nargs='+', required=True, help="Algorithm names (config files)")
+    parser.add_argument('-g', '--gym-ids', nargs='+', required=True, help="IDs of the gym environments")
+    parser.add_argument('-R', '--rl-libraries', nargs='+', default=['rlgraph'],
+                        help="RL libraries to run benchmarks on.")
+    parser.add_argument('-x', '--experiments', default=1, type=int,
+                        help="number of experiments per combination")
+    parser.add_argument('-s', '--seed', default=None, type=int,
+                        help="random seed of the first experiment of each combination")
+    parser.add_argument('-w', '--workers', default=1, type=int, help="number of worker processes")
+    parser.add_argument('--cpus-per-experiment', default=None, type=int,
+                        help="pin workers to this many CPUs each and limit their thread pools")
+    parser.add_argument('-l', '--ledger', default=None, help="job ledger file")
+    parser.add_argument('-C', '--config-file', default=DEFAULT_CONFIG_FILE,
+                        help="config file (for database configuration)")
+
+    args = parser.parse_args()
+
+    root = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+    output_folder = os.path.join(root, 'benchmarks')
+
+    ledger_file = args.ledger
+    if not ledger_file:
+        if not os.path.isdir(output_folder):
+            os.makedirs(output_folder)
+        ledger_file = os.path.join(output_folder, 'sweep.ledger')
+
+    config = load_config(args.config_file, default_config_file=DEFAULT_CONFIG_FILE)
+    local_db = LocalDatabase(**config)
+
+    sweep_runner = SweepRunner(
+        configs=args.configs,
+        gym_ids=args.gym_ids,
+        rl_libraries=args.rl_libraries,
+        db=local_db,
+        ledger_file=ledger_file,
+        experiments=args.experiments,
+        config_folder=os.path.join(root, 'configs'),
+        output_folder=output_folder,
+        seed=args.seed,
+        cpus_per_experiment=args.cpus_per_experiment
+    )
+
+    sweep_info = sweep_runner.run(workers=args.workers)
+
+    logger.info("Completed {:d} jobs, {:d} jobs failed.".format(
+        len(sweep_info['completed_jobs']), len(sweep_info['failed_jobs'])))
+    logger.info("Job ledger: {}".format(ledger_file))
+
+    if sweep_info['failed_jobs']:
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
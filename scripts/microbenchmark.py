@@ -0,0 +1,160 @@
+# Copyright 2018 The RLgraph project. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Microbenchmarks of rl_benchmark internals.
+
+Usage:
+
+```bash
+python microbenchmark.py [--output <file>] [--compare <file>] [--tolerance <fraction>] [<benchmark> ...]
+```
+
+`benchmark` is a list of microbenchmarks to run (e.g. `environment_wrapper`, `data_paths`). If omitted, all
+microbenchmarks run.
+
+`output` is an optional JSON file the results are written to, along with the rl_benchmark version, git commit and
+hardware fingerprint.
+
+`compare` is an optional JSON file of earlier results (e.g. of another commit). Cases whose best time is more than
+`tolerance` (default 0.1, i.e. 10%) slower than in that file are reported as regressions, and the script exits with
+status 1.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+from rl_benchmark import __version__ as rl_benchmark_version
+from rl_benchmark.benchmark.runner.resource_monitor import hardware_fingerprint
+from rl_benchmark.microbenchmark import format_time, microbenchmarks
+
+
+logging.basicConfig(level=logging.INFO)
+root_logger = logging.getLogger('')
+root_logger.setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def git_commit():
+    """
+    Returns: commit hash of the rl_benchmark checkout, or None if not in a git repository
+
+    """
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode('utf8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(results, baseline_results, tolerance):
+    """
+    Compare best times with earlier results.
+
+    Args:
+        results: dict of microbenchmark results
+        baseline_results: dict of earlier microbenchmark results
+        tolerance: fraction a case may be slower before it counts as a regression
+
+    Returns: list of regressed (benchmark, case) tuples
+
+    """
+    regressions = list()
+    for name, cases in sorted(results.items()):
+        for case, timing in sorted(cases.items()):
+            baseline_timing = baseline_results.get(name, dict()).get(case)
+            if not baseline_timing:
+                continue
+
+            ratio = timing['best'] / baseline_timing['best']
+            regressed = ratio > 1.0 + tolerance
+            logger.info("{}/{}: {} (was {}, {:.2f}x){}".format(
+                name, case, format_time(timing['best']), format_time(baseline_timing['best']), ratio,
+                ' REGRESSION' if regressed else ''))
+
+            if regressed:
+                regressions.append((name, case))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('benchmarks', nargs='*', help="microbenchmarks to run (default: all)")
+    parser.add_argument('-o', '--output', default=None, help="output file (json)")
+    parser.add_argument('-c', '--compare', default=None, help="earlier output file to compare with (json)")
+    parser.add_argument('-t', '--tolerance', type=float, default=0.1,
+                        help="fraction a case may be slower than in the compared file")
+
+    args = parser.parse_args()
+
+    benchmark_names = args.benchmarks or sorted(microbenchmarks.keys())
+    for name in benchmark_names:
+        if name not in microbenchmarks:
+            logger.error("No such microbenchmark: {} (choose from {}).".format(
+                name, ', '.join(sorted(microbenchmarks.keys()))))
+            return 1
+
+    results = dict()
+    for name in benchmark_names:
+        logger.info("Running microbenchmark {}".format(name))
+        results[name] = microbenchmarks[name]()
+
+        for case, timing in sorted(results[name].items()):
+            logger.info("{}: {} (best){}".format(
+                case, format_time(timing['best']),
+                ", overhead {}".format(format_time(timing['overhead'])) if 'overhead' in timing else ''))
+
+    if args.output:
+        output = dict(
+            metadata=dict(
+                rl_benchmark_version=rl_benchmark_version,
+                git_commit=git_commit(),
+                time=int(time.time()),
+                hardware=hardware_fingerprint()
+            ),
+            results=results
+        )
+        with open(args.output, 'w') as fp:
+            json.dump(output, fp, sort_keys=True, indent=2)
+        logger.info("Saved results to {}".format(args.output))
+
+    if args.compare:
+        with open(args.compare, 'r') as fp:
+            baseline = json.load(fp)
+
+        regressions = compare_results(results, baseline['results'], args.tolerance)
+        if regressions:
+            logger.error("{:d} cases regressed: {}".format(
+                len(regressions), ', '.join('{}/{}'.format(name, case) for name, case in regressions)))
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
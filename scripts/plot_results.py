@@ -22,8 +22,9 @@ Usage:
 python plot_results.py [--output output] [--show-episodes] [--show-timesteps] [--show-seconds] [--input <file> <name>] [--input <file> <name> ...]
 ```
 
-`input` expects two parameters. `file` points to a pickle file (pkl) containing experiment data (e.g. created by
-running `benchmark.py`). `name` is a string containing the label for the plot. You can state multiple input files.
+`input` expects two parameters. `file` points to a benchmark file (or legacy pickle file) containing experiment data
+(e.g. created by running `benchmark.py`). `name` is a string containing the label for the plot. You can state multiple
+input files.
 
 `output` is an optional parameter to set the output image file. If omitted, output will be saved as `./output.png`.
 